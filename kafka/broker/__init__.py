@@ -1,5 +1,66 @@
 from .server import run_broker
-from .command import Produce, RecordContents
-from .response import ProduceResponse
+from .command import (
+    Produce,
+    RecordContents,
+    OffsetCommit,
+    TopicOffset,
+    JoinGroup,
+    MemberAssignment,
+    SyncGroup,
+    Heartbeat,
+    LeaveGroup,
+)
+from .response import (
+    ProduceResponse,
+    MetadataResponse,
+    TopicMetadata,
+    InitProducerIdResponse,
+    FetchedRecord,
+    FetchResponse,
+    LazyFetchedRecord,
+    LazyFetchResponse,
+    PartitionResult,
+    OffsetCommitResponse,
+    PartitionOffset,
+    OffsetFetchResponse,
+    GroupMember,
+    JoinGroupResponse,
+    SyncGroupResponse,
+    HeartbeatResponse,
+    LeaveGroupResponse,
+)
+from .query import Fetch, Metadata, OffsetFetch, TopicPartition
 
-__all__ = ["run_broker", "Produce", "RecordContents", "ProduceResponse"]
+__all__ = [
+    "run_broker",
+    "Produce",
+    "RecordContents",
+    "ProduceResponse",
+    "Metadata",
+    "MetadataResponse",
+    "TopicMetadata",
+    "InitProducerIdResponse",
+    "Fetch",
+    "FetchedRecord",
+    "FetchResponse",
+    "LazyFetchedRecord",
+    "LazyFetchResponse",
+    "OffsetCommit",
+    "TopicOffset",
+    "PartitionResult",
+    "OffsetCommitResponse",
+    "OffsetFetch",
+    "TopicPartition",
+    "PartitionOffset",
+    "OffsetFetchResponse",
+    "JoinGroup",
+    "MemberAssignment",
+    "SyncGroup",
+    "Heartbeat",
+    "LeaveGroup",
+    "GroupMember",
+    "JoinGroupResponse",
+    "SyncGroupResponse",
+    "HeartbeatResponse",
+    "LeaveGroupResponse",
+]
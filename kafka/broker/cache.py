@@ -0,0 +1,146 @@
+import collections
+import contextlib
+import itertools
+from collections.abc import Iterator
+from pathlib import Path
+from typing import BinaryIO
+
+from kafka.broker import log
+
+
+class TailCache:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        # least recently used partition first; each holds a contiguous run of
+        # encoded records that ends at the partition's log end offset
+        self._tails: collections.OrderedDict[
+            tuple[str, int], collections.deque[tuple[int, bytes]]
+        ] = collections.OrderedDict()
+
+    def append(self, tp: tuple[str, int], records: list[log.Record]) -> None:
+        tail = self._tails.setdefault(tp, collections.deque())
+        for record in records:
+            payload = record.payload
+            tail.append((record.offset, payload))
+            self.size += len(payload)
+        self._tails.move_to_end(tp)
+        self._evict()
+
+    def _evict(self) -> None:
+        # the oldest records of the least recently used partition go first
+        while self.size > self.max_bytes and self._tails:
+            tp, tail = next(iter(self._tails.items()))
+            _, payload = tail.popleft()
+            self.size -= len(payload)
+            if not tail:
+                del self._tails[tp]
+
+    def read(
+        self, tp: tuple[str, int], offset: int, max_bytes: int
+    ) -> list[bytes] | None:
+        if (tail := self._tails.get(tp)) is None or not (
+            tail[0][0] <= offset <= tail[-1][0]
+        ):
+            return None
+        self._tails.move_to_end(tp)
+        result = []
+        total_size = 0
+        for _, payload in itertools.islice(tail, offset - tail[0][0], None):
+            # the first record is always returned, as in FSLogStorage.list_logs
+            if result and total_size + len(payload) > max_bytes:
+                break
+            result.append(payload)
+            total_size += len(payload)
+        return result
+
+    def drop(self, tp: tuple[str, int]) -> None:
+        if (tail := self._tails.pop(tp, None)) is not None:
+            self.size -= sum(len(payload) for _, payload in tail)
+
+
+class FetchCache:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: collections.OrderedDict[
+            tuple[str, int, int, int], list[bytes]
+        ] = collections.OrderedDict()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key: tuple[str, int, int, int]) -> list[bytes] | None:
+        if (records := self._entries.get(key)) is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return list(records)
+
+    def put(self, key: tuple[str, int, int, int], records: list[bytes]) -> None:
+        entry_size = sum(len(payload) for payload in records)
+        if key in self._entries or entry_size > self.max_bytes:
+            return
+        self._entries[key] = list(records)
+        self.size += entry_size
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= sum(len(payload) for payload in evicted)
+
+    def drop(self, tp: tuple[str, int]) -> None:
+        for key in [key for key in self._entries if key[:2] == tp]:
+            self.size -= sum(len(payload) for payload in self._entries.pop(key))
+
+
+class FileHandleCache:
+    def __init__(self, max_open_files: int):
+        self.max_open_files = max_open_files
+        self.hits = 0
+        self.misses = 0
+        # least recently used first
+        self._handles: collections.OrderedDict[Path, BinaryIO] = (
+            collections.OrderedDict()
+        )
+        self._refs: collections.Counter[Path] = collections.Counter()
+
+    @property
+    def open_files(self) -> int:
+        return len(self._handles)
+
+    @contextlib.contextmanager
+    def open(self, path: Path) -> Iterator[BinaryIO]:
+        if (handle := self._handles.get(path)) is None:
+            self.misses += 1
+            # one handle serves both appends and reads of a segment file
+            handle = path.open("a+b")
+            self._handles[path] = handle
+        else:
+            self.hits += 1
+        self._handles.move_to_end(path)
+        self._refs[path] += 1
+        try:
+            self._evict()
+            yield handle
+        finally:
+            self._refs[path] -= 1
+            if not self._refs[path]:
+                del self._refs[path]
+            self._evict()
+
+    def _evict(self) -> None:
+        # handles in use are never closed, so the budget can be exceeded
+        # until they are released
+        for path in [path for path in self._handles if path not in self._refs]:
+            if len(self._handles) <= self.max_open_files:
+                break
+            self._handles.pop(path).close()
+
+    def close(self) -> None:
+        for handle in self._handles.values():
+            handle.close()
+        self._handles.clear()
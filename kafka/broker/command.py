@@ -1,11 +1,14 @@
 import json
 import time
-from typing import Self
+from typing import Literal, Self
 
 import pydantic
 from pydantic import Field
 
-from kafka import message
+from kafka import constants, message
+from kafka.broker.query import TopicPartition
+from kafka.compression import CompressionType
+from kafka.serialization import WireBytes
 
 
 class CreateTopic(pydantic.BaseModel):
@@ -31,10 +34,10 @@ class CreateTopics(pydantic.BaseModel):
 
 
 class RecordContents(pydantic.BaseModel):
-    value: str
-    key: str | None
+    value: WireBytes
+    key: WireBytes | None
     timestamp: int | None
-    headers: dict[str, str]
+    headers: dict[str, WireBytes]
 
     @property
     def serialized(self) -> bytes:
@@ -44,20 +47,58 @@ class RecordContents(pydantic.BaseModel):
 class Produce(pydantic.BaseModel):
     topic: str
     partition: int
-    records: list[RecordContents] = Field(min_length=1)
+    producer_id: int = constants.NO_PRODUCER_ID
+    producer_epoch: int = constants.NO_PRODUCER_EPOCH
+    base_sequence: int = constants.NO_SEQUENCE
+    acks: Literal[-1, 0, 1] = 1
+    records: list[RecordContents] = Field(default_factory=list)
+    # a compressed batch carries its records as one base64 encoded blob
+    compression_type: CompressionType = CompressionType.NONE
+    record_count: int = 0
+    compressed_records: str | None = None
+
+    @pydantic.model_validator(mode="after")
+    def should_have_records(self) -> Self:
+        if self.compression_type == CompressionType.NONE:
+            if not self.records:
+                raise ValueError("Produce command must have at least one record")
+        elif self.compressed_records is None or self.record_count < 1:
+            raise ValueError(
+                "Compressed produce command must have compressed_records "
+                "and a positive record_count"
+            )
+        return self
+
+    @property
+    def is_idempotent(self) -> bool:
+        return self.producer_id != constants.NO_PRODUCER_ID
+
+    @property
+    def is_compressed(self) -> bool:
+        return self.compression_type != CompressionType.NONE
+
+    @property
+    def num_records(self) -> int:
+        return self.record_count if self.is_compressed else len(self.records)
+
+    @property
+    def last_sequence(self) -> int:
+        return self.base_sequence + self.num_records - 1
 
     @property
     def serialized(self) -> bytes:
-        return json.dumps(self.model_dump(mode="json")).encode("utf-8")
+        return json.dumps(self.model_dump(mode="json", exclude_defaults=True)).encode(
+            "utf-8"
+        )
 
     @classmethod
     def from_message(cls, msg: message.Message) -> Self:
         if msg.headers.api_key != message.MessageType.PRODUCE:
             raise ValueError("Message is not of type PRODUCE")
         params = json.loads(msg.payload.decode("utf-8"))
-        if params.get("records") is None:
+        if params.get("records") is None and params.get("compressed_records") is None:
             raise ValueError("Produce command must have a 'records' field")
-        for idx, record in enumerate(params["records"]):
+        for idx, record in enumerate(params.get("records", [])):
             if record.get("timestamp") is None:
                 record["timestamp"] = int(time.time())
             params["records"][idx] = record
@@ -74,8 +115,95 @@ class OffsetCommit(pydantic.BaseModel):
     group_id: str
     topics: list[TopicOffset] = Field(min_length=1)
 
+    @property
+    def serialized(self) -> bytes:
+        return self.model_dump_json().encode("utf-8")
+
     @classmethod
     def from_message(cls, msg: message.Message) -> Self:
         if msg.headers.api_key != message.MessageType.OFFSET_COMMIT:
             raise ValueError("Message is not of type OFFSET_COMMIT")
         return cls.model_validate_json(msg.payload.decode("utf-8"))
+
+
+class InitProducerId(pydantic.BaseModel):
+    @classmethod
+    def from_message(cls, msg: message.Message) -> Self:
+        if msg.headers.api_key != message.MessageType.INIT_PRODUCER_ID:
+            raise ValueError("Message is not of type INIT_PRODUCER_ID")
+        return cls.model_validate_json(msg.payload.decode("utf-8") or "{}")
+
+
+class JoinGroup(pydantic.BaseModel):
+    group_id: str
+    # None asks the coordinator to assign a new member id
+    member_id: str | None = None
+    session_timeout_ms: int = Field(gt=0)
+    topics: list[str] = Field(min_length=1)
+    assignors: list[str] = Field(min_length=1)
+    # lets cooperative assignors keep partitions where they already are
+    owned_partitions: list[TopicPartition] = Field(default_factory=list)
+
+    @property
+    def serialized(self) -> bytes:
+        return self.model_dump_json().encode("utf-8")
+
+    @classmethod
+    def from_message(cls, msg: message.Message) -> Self:
+        if msg.headers.api_key != message.MessageType.JOIN_GROUP:
+            raise ValueError("Message is not of type JOIN_GROUP")
+        return cls.model_validate_json(msg.payload.decode("utf-8"))
+
+
+class MemberAssignment(pydantic.BaseModel):
+    member_id: str
+    partitions: list[TopicPartition]
+
+
+class SyncGroup(pydantic.BaseModel):
+    group_id: str
+    generation_id: int
+    member_id: str
+    # only the leader sends the assignments of the whole group
+    assignments: list[MemberAssignment] = Field(default_factory=list)
+
+    @property
+    def serialized(self) -> bytes:
+        return self.model_dump_json().encode("utf-8")
+
+    @classmethod
+    def from_message(cls, msg: message.Message) -> Self:
+        if msg.headers.api_key != message.MessageType.SYNC_GROUP:
+            raise ValueError("Message is not of type SYNC_GROUP")
+        return cls.model_validate_json(msg.payload.decode("utf-8"))
+
+
+class Heartbeat(pydantic.BaseModel):
+    group_id: str
+    generation_id: int
+    member_id: str
+
+    @property
+    def serialized(self) -> bytes:
+        return self.model_dump_json().encode("utf-8")
+
+    @classmethod
+    def from_message(cls, msg: message.Message) -> Self:
+        if msg.headers.api_key != message.MessageType.HEARTBEAT:
+            raise ValueError("Message is not of type HEARTBEAT")
+        return cls.model_validate_json(msg.payload.decode("utf-8"))
+
+
+class LeaveGroup(pydantic.BaseModel):
+    group_id: str
+    member_id: str
+
+    @property
+    def serialized(self) -> bytes:
+        return self.model_dump_json().encode("utf-8")
+
+    @classmethod
+    def from_message(cls, msg: message.Message) -> Self:
+        if msg.headers.api_key != message.MessageType.LEAVE_GROUP:
+            raise ValueError("Message is not of type LEAVE_GROUP")
+        return cls.model_validate_json(msg.payload.decode("utf-8"))
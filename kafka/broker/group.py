@@ -0,0 +1,201 @@
+import enum
+import time
+import uuid
+from collections.abc import Callable
+
+from kafka import constants
+from kafka.broker import command
+from kafka.error import (
+    IllegalGenerationError,
+    InconsistentGroupProtocolError,
+    RebalanceInProgressError,
+    UnknownMemberIdError,
+)
+
+
+class GroupState(enum.StrEnum):
+    EMPTY = "empty"
+    PREPARING_REBALANCE = "preparing_rebalance"
+    COMPLETING_REBALANCE = "completing_rebalance"
+    STABLE = "stable"
+
+
+class Member:
+    def __init__(
+        self,
+        member_id: str,
+        session_timeout_ms: int,
+        topics: list[str],
+        assignors: list[str],
+        owned_partitions: list[tuple[str, int]],
+        last_seen: float,
+    ):
+        self.member_id = member_id
+        self.session_timeout_ms = session_timeout_ms
+        self.topics = topics
+        self.assignors = assignors
+        self.owned_partitions = owned_partitions
+        self.last_seen = last_seen
+        # whether the member has rejoined for the generation being prepared
+        self.joined = False
+
+    def is_expired(self, now: float) -> bool:
+        return now - self.last_seen > self.session_timeout_ms / 1000
+
+
+class Group:
+    def __init__(self, group_id: str):
+        self.group_id = group_id
+        self.state = GroupState.EMPTY
+        self.generation_id = constants.NO_GENERATION_ID
+        self.members: dict[str, Member] = {}
+        self.leader_id: str | None = None
+        self.assignor: str | None = None
+        self.assignments: dict[str, list[tuple[str, int]]] = {}
+
+    def prepare_rebalance(self) -> None:
+        self.state = GroupState.PREPARING_REBALANCE
+        self.assignments = {}
+        for member in self.members.values():
+            member.joined = False
+
+    def remove_members(self, member_ids: list[str]) -> None:
+        for member_id in member_ids:
+            del self.members[member_id]
+        if self.members:
+            self.prepare_rebalance()
+        else:
+            self.state = GroupState.EMPTY
+            self.leader_id = None
+            self.assignor = None
+            self.assignments = {}
+
+    def common_assignors(self, members: list[Member]) -> list[str]:
+        # preference order follows the first member's list
+        return [
+            name
+            for name in members[0].assignors
+            if all(name in member.assignors for member in members[1:])
+        ]
+
+    def complete_join(self) -> None:
+        members = list(self.members.values())
+        self.generation_id += 1
+        self.assignor = self.common_assignors(members)[0]
+        if self.leader_id not in self.members:
+            self.leader_id = members[0].member_id
+        self.state = GroupState.COMPLETING_REBALANCE
+
+
+class GroupCoordinator:
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.groups: dict[str, Group] = {}
+
+    def _expire_members(self, group: Group) -> None:
+        # sessions are checked lazily whenever the group is touched
+        now = self.clock()
+        if expired := [
+            member_id
+            for member_id, member in group.members.items()
+            if member.is_expired(now)
+        ]:
+            group.remove_members(expired)
+
+    def _member(self, group_id: str, member_id: str) -> tuple[Group, Member]:
+        if (group := self.groups.get(group_id)) is not None:
+            self._expire_members(group)
+            if (member := group.members.get(member_id)) is not None:
+                member.last_seen = self.clock()
+                return group, member
+        raise UnknownMemberIdError(
+            f"Member {member_id} is not part of group {group_id}"
+        )
+
+    def join(self, cmd: command.JoinGroup) -> str:
+        group = self.groups.setdefault(cmd.group_id, Group(cmd.group_id))
+        self._expire_members(group)
+        if cmd.member_id is None:
+            member_id = f"{cmd.group_id}-{uuid.uuid4().hex}"
+        elif cmd.member_id in group.members:
+            member_id = cmd.member_id
+        else:
+            raise UnknownMemberIdError(
+                f"Member {cmd.member_id} is not part of group {cmd.group_id}"
+            )
+        member = group.members.get(member_id)
+        owned_partitions = [(tp.topic, tp.partition) for tp in cmd.owned_partitions]
+        # a cooperative member rejoins with fewer partitions after revoking
+        # some, which needs another rebalance to hand them out
+        if (
+            member is None
+            or member.topics != cmd.topics
+            or member.assignors != cmd.assignors
+            or member.owned_partitions != owned_partitions
+        ):
+            member = Member(
+                member_id=member_id,
+                session_timeout_ms=cmd.session_timeout_ms,
+                topics=cmd.topics,
+                assignors=cmd.assignors,
+                owned_partitions=owned_partitions,
+                last_seen=self.clock(),
+            )
+            others = [m for m in group.members.values() if m.member_id != member_id]
+            if not group.common_assignors([member, *others]):
+                raise InconsistentGroupProtocolError(
+                    f"Member {member_id} supports none of the assignors of group "
+                    f"{cmd.group_id}"
+                )
+            group.members[member_id] = member
+            if group.state != GroupState.PREPARING_REBALANCE:
+                group.prepare_rebalance()
+        member.last_seen = self.clock()
+        if group.state == GroupState.PREPARING_REBALANCE:
+            member.joined = True
+            # the last member to rejoin completes the generation
+            if all(m.joined for m in group.members.values()):
+                group.complete_join()
+        return member_id
+
+    def sync(self, cmd: command.SyncGroup) -> list[tuple[str, int]] | None:
+        group, _ = self._member(cmd.group_id, cmd.member_id)
+        if group.state == GroupState.PREPARING_REBALANCE:
+            raise RebalanceInProgressError(
+                f"Group {cmd.group_id} is rebalancing; rejoin the group"
+            )
+        if cmd.generation_id != group.generation_id:
+            raise IllegalGenerationError(
+                f"Generation {cmd.generation_id} is not the current generation "
+                f"{group.generation_id} of group {cmd.group_id}"
+            )
+        if (
+            group.state == GroupState.COMPLETING_REBALANCE
+            and cmd.member_id == group.leader_id
+        ):
+            group.assignments = {
+                assignment.member_id: [
+                    (tp.topic, tp.partition) for tp in assignment.partitions
+                ]
+                for assignment in cmd.assignments
+            }
+            group.state = GroupState.STABLE
+        if group.state == GroupState.STABLE:
+            return group.assignments.get(cmd.member_id, [])
+        return None
+
+    def heartbeat(self, cmd: command.Heartbeat) -> None:
+        group, _ = self._member(cmd.group_id, cmd.member_id)
+        if group.state == GroupState.PREPARING_REBALANCE:
+            raise RebalanceInProgressError(
+                f"Group {cmd.group_id} is rebalancing; rejoin the group"
+            )
+        if cmd.generation_id != group.generation_id:
+            raise IllegalGenerationError(
+                f"Generation {cmd.generation_id} is not the current generation "
+                f"{group.generation_id} of group {cmd.group_id}"
+            )
+
+    def leave(self, cmd: command.LeaveGroup) -> None:
+        group, _ = self._member(cmd.group_id, cmd.member_id)
+        group.remove_members([cmd.member_id])
@@ -1,12 +1,20 @@
 import json
+import time
 
-from kafka import message
-from kafka.broker import command, log, query, storage
+from kafka import constants, message
+from kafka.broker import command, group, log, query, storage
 from kafka.error import (
     InvalidAdminCommandError,
     PartitionNotFoundError,
     InvalidOffsetError,
     ExceedSegmentSizeError,
+    OutOfOrderSequenceError,
+    InvalidProducerEpochError,
+    InvalidRecordError,
+    IllegalGenerationError,
+    InconsistentGroupProtocolError,
+    UnknownMemberIdError,
+    RebalanceInProgressError,
 )
 
 
@@ -51,37 +59,105 @@ def create_topics(
     )
 
 
-def produce(req: message.Message, log_storage: storage.FSLogStorage) -> message.Message:
+def produce(
+    req: message.Message,
+    log_storage: storage.FSLogStorage,
+    producer_state_storage: storage.FSProducerStateStorage,
+) -> message.Message | None:
     cmd = command.Produce.from_message(req)
-    records = log.Record.from_produce_command(cmd)
     result = {
-        "base_offset": log_storage.partitions[(cmd.topic, cmd.partition)].leo,
-        "error_message": None,
+        "topic": cmd.topic,
+        "partition": cmd.partition,
+        "timestamp": int(time.time()),
     }
     try:
-        for record in records:
-            log_storage.append_log(record)
+        duplicate_offset = (
+            producer_state_storage.duplicate_offset(cmd) if cmd.is_idempotent else None
+        )
+        if duplicate_offset is not None:
+            base_offset = duplicate_offset
+        else:
+            if (
+                partition := log_storage.partitions.get((cmd.topic, cmd.partition))
+            ) is None:
+                raise PartitionNotFoundError(
+                    f"Partition {cmd.topic}-{cmd.partition} does not exist"
+                )
+            base_offset = partition.leo
+            if cmd.is_compressed:
+                log_storage.append_batch(log.RecordBatch.from_produce_command(cmd))
+            else:
+                for record in log.Record.from_produce_command(cmd):
+                    log_storage.append_log(record)
+            if cmd.is_idempotent:
+                producer_state_storage.update(cmd, base_offset)
         result |= {
-            "topic": cmd.topic,
-            "partition": cmd.partition,
+            "base_offset": base_offset,
             "error_code": 0,
+            "error_message": None,
         }
     except PartitionNotFoundError as exc:
-        result = {
-            "topic": cmd.topic,
-            "partition": cmd.partition,
+        result |= {
             "error_code": 11,
             "base_offset": -1,
             "error_message": str(exc),
         }
+    except OutOfOrderSequenceError as exc:
+        result |= {
+            "error_code": 45,
+            "base_offset": -1,
+            "error_message": str(exc),
+        }
+    except InvalidProducerEpochError as exc:
+        result |= {
+            "error_code": 47,
+            "base_offset": -1,
+            "error_message": str(exc),
+        }
+    except InvalidRecordError as exc:
+        result |= {
+            "error_code": 87,
+            "base_offset": -1,
+            "error_message": str(exc),
+        }
+    except OSError as exc:
+        result |= {
+            "error_code": 56,
+            "base_offset": -1,
+            "error_message": str(exc),
+        }
     except Exception as exc:
-        result = {
-            "topic": cmd.topic,
-            "partition": cmd.partition,
+        result |= {
             "error_code": -1,
             "base_offset": -1,
             "error_message": str(exc),
         }
+    if cmd.acks == 0:
+        return None
+    return message.Message(
+        headers=req.headers,
+        payload=json.dumps(result).encode("utf-8"),
+    )
+
+
+def init_producer_id(
+    req: message.Message, producer_state_storage: storage.FSProducerStateStorage
+) -> message.Message:
+    command.InitProducerId.from_message(req)
+    try:
+        result = {
+            "producer_id": producer_state_storage.init_producer_id(),
+            "producer_epoch": 0,
+            "error_code": 0,
+            "error_message": None,
+        }
+    except Exception as exc:
+        result = {
+            "producer_id": constants.NO_PRODUCER_ID,
+            "producer_epoch": constants.NO_PRODUCER_EPOCH,
+            "error_code": -1,
+            "error_message": str(exc),
+        }
     return message.Message(
         headers=req.headers,
         payload=json.dumps(result).encode("utf-8"),
@@ -97,7 +173,6 @@ def offset_commit(
     for committed_offset in committed_offsets:
         try:
             committed_offset_storage.update(committed_offset)
-            committed_offset_storage.commit()
             result = {
                 "topic": committed_offset.topic,
                 "partition": committed_offset.partition,
@@ -120,49 +195,131 @@ def offset_commit(
             }
         finally:
             results.append(result)
+    if any(result["error_code"] == 0 for result in results):
+        # one offsets log append covers every partition in the request
+        try:
+            committed_offset_storage.commit()
+        except Exception as exc:
+            for result in results:
+                if result["error_code"] == 0:
+                    result |= {"error_code": -1, "error_message": str(exc)}
     return message.Message(
         headers=req.headers,
         payload=json.dumps({"topics": results}).encode("utf-8"),
     )
 
 
-def fetch(req: message.Message, log_storage: storage.FSLogStorage) -> message.Message:
-    qry = query.Fetch.from_message(req)
+def offset_fetch(
+    req: message.Message, committed_offset_storage: storage.FSCommittedOffsetStorage
+) -> message.Message:
+    qry = query.OffsetFetch.from_message(req)
+    # answered from the in-memory cache; the offsets log is never read here
     result = {
-        "topic": qry.topic,
-        "partition": qry.partition,
+        "topics": [
+            {
+                "topic": tp.topic,
+                "partition": tp.partition,
+                "offset": committed_offset_storage.cache.get(
+                    (qry.group_id, tp.topic, tp.partition),
+                    constants.NO_COMMITTED_OFFSET,
+                ),
+            }
+            for tp in qry.partitions
+        ],
         "error_code": 0,
         "error_message": None,
-        "records": [],
+    }
+    return message.Message(
+        headers=req.headers,
+        payload=json.dumps(result).encode("utf-8"),
+    )
+
+
+def group_error_code(exc: Exception) -> int:
+    match exc:
+        case IllegalGenerationError():
+            return 22
+        case InconsistentGroupProtocolError():
+            return 23
+        case UnknownMemberIdError():
+            return 25
+        case RebalanceInProgressError():
+            return 27
+        case _:
+            return -1
+
+
+def join_group(
+    req: message.Message, group_coordinator: group.GroupCoordinator
+) -> message.Message:
+    cmd = command.JoinGroup.from_message(req)
+    result = {
+        "generation_id": constants.NO_GENERATION_ID,
+        "member_id": cmd.member_id,
+        "leader_id": None,
+        "assignor": None,
+        "members": [],
     }
     try:
-        records = log_storage.list_logs(qry)
-        result["records"] = [
-            r.model_dump(exclude={"topic", "partition"}) for r in records
-        ]
-    except PartitionNotFoundError as exc:
-        result = {
-            "topic": qry.topic,
-            "partition": qry.partition,
-            "error_code": 21,
-            "error_message": str(exc),
-            "records": [],
-        }
-    except (InvalidOffsetError, ExceedSegmentSizeError) as exc:
+        member_id = group_coordinator.join(cmd)
+        joined_group = group_coordinator.groups[cmd.group_id]
+        result["member_id"] = member_id
+        if joined_group.state == group.GroupState.PREPARING_REBALANCE:
+            # handlers can't block, so the member polls until everyone rejoined
+            result |= {
+                "error_code": 27,
+                "error_message": f"Group {cmd.group_id} is waiting for members",
+            }
+        else:
+            result |= {
+                "generation_id": joined_group.generation_id,
+                "leader_id": joined_group.leader_id,
+                "assignor": joined_group.assignor,
+                "members": [
+                    {
+                        "member_id": member.member_id,
+                        "topics": member.topics,
+                        "owned_partitions": [
+                            {"topic": topic, "partition": partition}
+                            for topic, partition in member.owned_partitions
+                        ],
+                    }
+                    for member in joined_group.members.values()
+                ]
+                if member_id == joined_group.leader_id
+                else [],
+                "error_code": 0,
+                "error_message": None,
+            }
+    except Exception as exc:
+        result |= {"error_code": group_error_code(exc), "error_message": str(exc)}
+    return message.Message(
+        headers=req.headers,
+        payload=json.dumps(result).encode("utf-8"),
+    )
+
+
+def sync_group(
+    req: message.Message, group_coordinator: group.GroupCoordinator
+) -> message.Message:
+    cmd = command.SyncGroup.from_message(req)
+    try:
+        partitions = group_coordinator.sync(cmd)
         result = {
-            "topic": qry.topic,
-            "partition": qry.partition,
-            "error_code": 20,
-            "error_message": str(exc),
-            "records": [],
+            "partitions": None
+            if partitions is None
+            else [
+                {"topic": topic, "partition": partition}
+                for topic, partition in partitions
+            ],
+            "error_code": 0,
+            "error_message": None,
         }
     except Exception as exc:
         result = {
-            "topic": qry.topic,
-            "partition": qry.partition,
-            "error_code": -1,
+            "partitions": None,
+            "error_code": group_error_code(exc),
             "error_message": str(exc),
-            "records": [],
         }
     return message.Message(
         headers=req.headers,
@@ -170,6 +327,64 @@ def fetch(req: message.Message, log_storage: storage.FSLogStorage) -> message.Me
     )
 
 
+def heartbeat(
+    req: message.Message, group_coordinator: group.GroupCoordinator
+) -> message.Message:
+    cmd = command.Heartbeat.from_message(req)
+    try:
+        group_coordinator.heartbeat(cmd)
+        result = {"error_code": 0, "error_message": None}
+    except Exception as exc:
+        result = {"error_code": group_error_code(exc), "error_message": str(exc)}
+    return message.Message(
+        headers=req.headers,
+        payload=json.dumps(result).encode("utf-8"),
+    )
+
+
+def leave_group(
+    req: message.Message, group_coordinator: group.GroupCoordinator
+) -> message.Message:
+    cmd = command.LeaveGroup.from_message(req)
+    try:
+        group_coordinator.leave(cmd)
+        result = {"error_code": 0, "error_message": None}
+    except Exception as exc:
+        result = {"error_code": group_error_code(exc), "error_message": str(exc)}
+    return message.Message(
+        headers=req.headers,
+        payload=json.dumps(result).encode("utf-8"),
+    )
+
+
+def fetch(req: message.Message, log_storage: storage.FSLogStorage) -> message.Message:
+    qry = query.Fetch.from_message(req)
+    result = {
+        "topic": qry.topic,
+        "partition": qry.partition,
+        "error_code": 0,
+        "error_message": None,
+    }
+    records: list[bytes] = []
+    try:
+        records = log_storage.list_encoded_logs(qry)
+    except PartitionNotFoundError as exc:
+        result |= {"error_code": 21, "error_message": str(exc)}
+    except (InvalidOffsetError, ExceedSegmentSizeError) as exc:
+        result |= {"error_code": 20, "error_message": str(exc)}
+    except Exception as exc:
+        result |= {"error_code": -1, "error_message": str(exc)}
+    # records come already encoded, so they are spliced in as they are
+    head = json.dumps(result).encode("utf-8")[:-1] + b', "records": ['
+    payload = head + b",".join(records) + b"]}"
+    # max_bytes counts stored entries, so the JSON response can still outgrow
+    # a frame; trailing records are left for the client's next fetch
+    while len(payload) > constants.PAYLOAD_SIZE_LIMIT and records:
+        records.pop()
+        payload = head + b",".join(records) + b"]}"
+    return message.Message(headers=req.headers, payload=payload)
+
+
 def list_topics(
     req: message.Message, log_storage: storage.FSLogStorage
 ) -> message.Message:
@@ -183,3 +398,24 @@ def list_topics(
         headers=req.headers,
         payload=json.dumps(result).encode("utf-8"),
     )
+
+
+def metadata(
+    req: message.Message, log_storage: storage.FSLogStorage
+) -> message.Message:
+    qry = query.Metadata.from_message(req)
+    partition_counts = log_storage.partition_counts()
+    topics = qry.topics if qry.topics is not None else list(partition_counts)
+    result = {
+        "topics": [
+            {"name": topic, "num_partitions": partition_counts[topic]}
+            for topic in topics
+            if topic in partition_counts
+        ],
+        "error_code": 0,
+        "error_message": None,
+    }
+    return message.Message(
+        headers=req.headers,
+        payload=json.dumps(result).encode("utf-8"),
+    )
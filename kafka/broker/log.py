@@ -1,21 +1,27 @@
 from typing import Self
+import base64
 import json
+import lzma
+import time
+import zlib
 
 import pydantic
 from pydantic import Field
 
-from kafka import constants
+from kafka import compression, constants
 from kafka.broker import command
-from kafka.error import InvalidOffsetError
+from kafka.compression import CompressionType
+from kafka.serialization import WireBytes
+from kafka.error import InvalidOffsetError, InvalidRecordError
 
 
 class Record(pydantic.BaseModel):
     topic: str
     partition: int
-    value: str
-    key: str | None
+    value: WireBytes
+    key: WireBytes | None
     timestamp: int
-    headers: dict[str, str]
+    headers: dict[str, WireBytes]
     offset: int | None
 
     @property
@@ -31,9 +37,14 @@ class Record(pydantic.BaseModel):
         data = self.model_dump_json(exclude={"topic", "partition"})
         return f"{len(data):0{constants.PAYLOAD_LENGTH_WIDTH}d}{data}".encode("utf-8")
 
+    @property
+    def payload(self) -> bytes:
+        # the stored entry, which is also how a FETCH response carries it
+        return self.bin[constants.PAYLOAD_LENGTH_WIDTH :]
+
     @property
     def size(self) -> int:
-        return len(self.bin[constants.PAYLOAD_LENGTH_WIDTH :])
+        return len(self.payload)
 
     @classmethod
     def from_produce_command(cls, cmd: command.Produce) -> list[Self]:
@@ -75,6 +86,107 @@ class Record(pydantic.BaseModel):
         ).encode("utf-8")
 
 
+class RecordBatch(pydantic.BaseModel):
+    topic: str
+    partition: int
+    base_offset: int | None
+    record_count: int
+    timestamp: int
+    compression_type: CompressionType
+    records: str
+
+    @property
+    def partition_name(self) -> str:
+        return f"{self.topic}-{self.partition}"
+
+    @property
+    def bin(self) -> bytes:
+        if self.base_offset is None:
+            raise InvalidOffsetError(
+                "Base offset must be set before converting to binary format"
+            )
+        data = self.model_dump_json(exclude={"topic", "partition"})
+        return f"{len(data):0{constants.PAYLOAD_LENGTH_WIDTH}d}{data}".encode("utf-8")
+
+    @property
+    def size(self) -> int:
+        return len(self.bin[constants.PAYLOAD_LENGTH_WIDTH :])
+
+    @classmethod
+    def from_produce_command(cls, cmd: command.Produce) -> Self:
+        return cls(
+            topic=cmd.topic,
+            partition=cmd.partition,
+            base_offset=None,
+            record_count=cmd.record_count,
+            timestamp=int(time.time()),
+            compression_type=cmd.compression_type,
+            records=cmd.compressed_records,
+        )
+
+    def batch_at(self, base_offset: int) -> Self:
+        if self.base_offset is not None:
+            raise InvalidOffsetError(
+                "Base offset is already set, cannot move the batch to a different offset"
+            )
+        return self.model_copy(deep=True, update={"base_offset": base_offset})
+
+    def index_entry(self, position: int) -> bytes:
+        return (
+            f"{self.base_offset:0{constants.LOG_RECORD_OFFSET_WIDTH}d}"
+            f"{position:0{constants.LOG_RECORD_POSITION_WIDTH}d}"
+        ).encode("utf-8")
+
+    def unpack(self) -> list[Record]:
+        try:
+            contents = json.loads(
+                compression.decompress(
+                    base64.b64decode(self.records), self.compression_type
+                )
+            )
+            records = [
+                Record(
+                    topic=self.topic,
+                    partition=self.partition,
+                    value=content["value"],
+                    key=content["key"],
+                    timestamp=content["timestamp"] or self.timestamp,
+                    headers=content["headers"],
+                    offset=None if self.base_offset is None else self.base_offset + idx,
+                )
+                for idx, content in enumerate(contents)
+            ]
+        except (
+            EOFError,
+            KeyError,
+            OSError,
+            TypeError,
+            ValueError,
+            lzma.LZMAError,
+            zlib.error,
+        ) as exc:
+            raise InvalidRecordError(
+                f"Cannot decode {self.compression_type} batch: {exc}"
+            ) from exc
+        # offsets are assigned from record_count, so a mismatch would leave gaps
+        if len(records) != self.record_count:
+            raise InvalidRecordError(
+                f"Batch declares {self.record_count} records "
+                f"but contains {len(records)}"
+            )
+        return records
+
+
+def records_from_log(topic: str, partition: int, record_data: bytes) -> list[Record]:
+    entry = json.loads(record_data.decode("utf-8")) | {
+        "topic": topic,
+        "partition": partition,
+    }
+    if "compression_type" in entry:
+        return RecordBatch.model_validate(entry).unpack()
+    return [Record.model_validate(entry)]
+
+
 class Segment(pydantic.BaseModel):
     base_offset: int
 
@@ -107,8 +219,41 @@ class Partition(pydantic.BaseModel):
             deep=True, update={"segments": self.segments + [new_segment]}
         )
 
-    def commit_record(self) -> Self:
-        return self.model_copy(deep=True, update={"leo": self.leo + 1})
+    def commit_record(self, record_count: int = 1) -> Self:
+        return self.model_copy(deep=True, update={"leo": self.leo + record_count})
+
+
+class BatchMetadata(pydantic.BaseModel):
+    first_sequence: int
+    last_sequence: int
+    base_offset: int
+
+
+class ProducerStateEntry(pydantic.BaseModel):
+    producer_id: int
+    producer_epoch: int
+    batches: list[BatchMetadata] = Field(default_factory=list)
+
+    @property
+    def last_sequence(self) -> int:
+        if not self.batches:
+            return constants.NO_SEQUENCE
+        return self.batches[-1].last_sequence
+
+    def find_batch(
+        self, first_sequence: int, last_sequence: int
+    ) -> BatchMetadata | None:
+        for batch in self.batches:
+            if (batch.first_sequence, batch.last_sequence) == (
+                first_sequence,
+                last_sequence,
+            ):
+                return batch
+        return None
+
+    def append_batch(self, batch: BatchMetadata) -> Self:
+        batches = [*self.batches, batch][-constants.PRODUCER_STATE_WINDOW_SIZE :]
+        return self.model_copy(deep=True, update={"batches": batches})
 
 
 class CommittedOffset(pydantic.BaseModel):
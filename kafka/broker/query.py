@@ -15,8 +15,46 @@ class Fetch(pydantic.BaseModel):
     def partition_dirname(self) -> str:
         return f"{self.topic}-{self.partition}"
 
+    @property
+    def serialized(self) -> bytes:
+        return self.model_dump_json().encode("utf-8")
+
     @classmethod
     def from_message(cls, msg: message.Message) -> Self:
         if msg.headers.api_key != message.MessageType.FETCH:
             raise ValueError("Message is not of type FETCH")
         return cls.model_validate_json(msg.payload.decode("utf-8"))
+
+
+class Metadata(pydantic.BaseModel):
+    topics: list[str] | None = None
+
+    @property
+    def serialized(self) -> bytes:
+        return self.model_dump_json().encode("utf-8")
+
+    @classmethod
+    def from_message(cls, msg: message.Message) -> Self:
+        if msg.headers.api_key != message.MessageType.METADATA:
+            raise ValueError("Message is not of type METADATA")
+        return cls.model_validate_json(msg.payload.decode("utf-8") or "{}")
+
+
+class TopicPartition(pydantic.BaseModel):
+    topic: str
+    partition: int
+
+
+class OffsetFetch(pydantic.BaseModel):
+    group_id: str
+    partitions: list[TopicPartition] = pydantic.Field(min_length=1)
+
+    @property
+    def serialized(self) -> bytes:
+        return self.model_dump_json().encode("utf-8")
+
+    @classmethod
+    def from_message(cls, msg: message.Message) -> Self:
+        if msg.headers.api_key != message.MessageType.OFFSET_FETCH:
+            raise ValueError("Message is not of type OFFSET_FETCH")
+        return cls.model_validate_json(msg.payload.decode("utf-8"))
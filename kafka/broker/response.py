@@ -1,8 +1,14 @@
+import base64
+import functools
+import json
 import time
-from typing import Self
+from typing import Any, Self
 
 import pydantic
 
+from kafka.broker.query import TopicPartition
+from kafka.serialization import WireBytes
+
 
 class ProduceResponse(pydantic.BaseModel):
     topic: str
@@ -43,3 +49,198 @@ class ProduceResponse(pydantic.BaseModel):
             error_code=error_code,
             error_message=error_message,
         )
+
+
+class TopicMetadata(pydantic.BaseModel):
+    name: str
+    num_partitions: int
+
+
+class MetadataResponse(pydantic.BaseModel):
+    topics: list[TopicMetadata]
+    error_code: int
+    error_message: str | None = None
+
+    @classmethod
+    def deserialize(cls, data: bytes) -> Self:
+        return cls.model_validate_json(data.decode("utf-8"))
+
+
+class InitProducerIdResponse(pydantic.BaseModel):
+    producer_id: int
+    producer_epoch: int
+    error_code: int
+    error_message: str | None = None
+
+    @classmethod
+    def deserialize(cls, data: bytes) -> Self:
+        return cls.model_validate_json(data.decode("utf-8"))
+
+
+class FetchedRecord(pydantic.BaseModel):
+    value: WireBytes
+    key: WireBytes | None
+    timestamp: int
+    headers: dict[str, WireBytes]
+    offset: int
+
+
+class FetchResponse(pydantic.BaseModel):
+    topic: str
+    partition: int
+    error_code: int
+    error_message: str | None = None
+    records: list[FetchedRecord]
+
+    @classmethod
+    def deserialize(cls, data: bytes) -> Self:
+        return cls.model_validate_json(data.decode("utf-8"))
+
+
+def wire_size(encoded: str) -> int:
+    # the decoded length follows from the base64 length and its padding
+    return len(encoded) * 3 // 4 - encoded.endswith("=") - encoded.endswith("==")
+
+
+class LazyFetchedRecord:
+    """값과 헤더는 처음 읽을 때 base64를 디코딩한다."""
+
+    def __init__(self, entry: dict[str, Any]):
+        self._entry = entry
+        self.offset: int = entry["offset"]
+        self.timestamp: int = entry["timestamp"]
+
+    @functools.cached_property
+    def key(self) -> bytes | None:
+        if (key := self._entry["key"]) is None:
+            return None
+        return base64.b64decode(key, validate=True)
+
+    @functools.cached_property
+    def value(self) -> bytes:
+        return base64.b64decode(self._entry["value"], validate=True)
+
+    @functools.cached_property
+    def headers(self) -> dict[str, bytes]:
+        return {
+            name: base64.b64decode(value, validate=True)
+            for name, value in self._entry["headers"].items()
+        }
+
+    @property
+    def size(self) -> int:
+        return (
+            wire_size(self._entry["value"])
+            + wire_size(self._entry["key"] or "")
+            + sum(wire_size(value) for value in self._entry["headers"].values())
+        )
+
+
+class LazyFetchResponse:
+    """FETCH 응답을 레코드 단위로 지연 디코딩해서 보여준다."""
+
+    def __init__(
+        self,
+        topic: str,
+        partition: int,
+        error_code: int,
+        error_message: str | None,
+        records: list[LazyFetchedRecord],
+    ):
+        self.topic = topic
+        self.partition = partition
+        self.error_code = error_code
+        self.error_message = error_message
+        self.records = records
+
+    @classmethod
+    def deserialize(cls, data: bytes) -> Self:
+        response = json.loads(data.decode("utf-8"))
+        return cls(
+            topic=response["topic"],
+            partition=response["partition"],
+            error_code=response["error_code"],
+            error_message=response.get("error_message"),
+            records=[LazyFetchedRecord(entry) for entry in response["records"]],
+        )
+
+
+class PartitionResult(pydantic.BaseModel):
+    topic: str
+    partition: int
+    error_code: int
+    error_message: str | None = None
+
+
+class OffsetCommitResponse(pydantic.BaseModel):
+    topics: list[PartitionResult]
+
+    @classmethod
+    def deserialize(cls, data: bytes) -> Self:
+        return cls.model_validate_json(data.decode("utf-8"))
+
+
+class PartitionOffset(pydantic.BaseModel):
+    topic: str
+    partition: int
+    offset: int
+
+
+class OffsetFetchResponse(pydantic.BaseModel):
+    topics: list[PartitionOffset]
+    error_code: int
+    error_message: str | None = None
+
+    @classmethod
+    def deserialize(cls, data: bytes) -> Self:
+        return cls.model_validate_json(data.decode("utf-8"))
+
+
+class GroupMember(pydantic.BaseModel):
+    member_id: str
+    topics: list[str]
+    owned_partitions: list[TopicPartition] = pydantic.Field(default_factory=list)
+
+
+class JoinGroupResponse(pydantic.BaseModel):
+    generation_id: int
+    member_id: str | None
+    leader_id: str | None
+    assignor: str | None
+    # filled in only for the leader, which computes the assignment
+    members: list[GroupMember]
+    error_code: int
+    error_message: str | None = None
+
+    @classmethod
+    def deserialize(cls, data: bytes) -> Self:
+        return cls.model_validate_json(data.decode("utf-8"))
+
+
+class SyncGroupResponse(pydantic.BaseModel):
+    # None until the leader has sent the assignment of this generation
+    partitions: list[TopicPartition] | None
+    error_code: int
+    error_message: str | None = None
+
+    @classmethod
+    def deserialize(cls, data: bytes) -> Self:
+        return cls.model_validate_json(data.decode("utf-8"))
+
+
+class HeartbeatResponse(pydantic.BaseModel):
+    error_code: int
+    error_message: str | None = None
+
+    @classmethod
+    def deserialize(cls, data: bytes) -> Self:
+        return cls.model_validate_json(data.decode("utf-8"))
+
+
+class LeaveGroupResponse(pydantic.BaseModel):
+    error_code: int
+    error_message: str | None = None
+
+    @classmethod
+    def deserialize(cls, data: bytes) -> Self:
+        return cls.model_validate_json(data.decode("utf-8"))
@@ -7,17 +7,17 @@ from kafka.error import UnknownMessageTypeError
 class Router:
     def __init__(self):
         self._handlers: dict[
-            message.MessageType, Callable[[message.Message], message.Message]
+            message.MessageType, Callable[[message.Message], message.Message | None]
         ] = {}
 
     def register(
         self,
         msg_type: message.MessageType,
-        handler: Callable[[message.Message], message.Message],
+        handler: Callable[[message.Message], message.Message | None],
     ) -> None:
         self._handlers[msg_type] = handler
 
-    def route(self, req: message.Message) -> message.Message:
+    def route(self, req: message.Message) -> message.Message | None:
         if (handler := self._handlers.get(req.headers.api_key)) is None:
             raise UnknownMessageTypeError(
                 f"No handler registered for API key: {req.headers.api_key}"
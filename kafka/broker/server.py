@@ -5,19 +5,20 @@ from kafka.broker import handler
 
 import asyncio
 import functools
+import json
 
-from kafka.broker import storage
+from kafka.broker import group, storage
+from kafka.writer import CoalescingWriter
 
 
 async def handle_client(
-    reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    log_storage: storage.FSLogStorage,
+    committed_offset_storage: storage.FSCommittedOffsetStorage,
+    producer_state_storage: storage.FSProducerStateStorage,
+    group_coordinator: group.GroupCoordinator,
 ) -> None:
-    log_storage = storage.FSLogStorage.load_from_root(
-        Path("tmp"), constants.LOG_FILE_SIZE_LIMIT
-    )
-    committed_offset_storage = storage.FSCommittedOffsetStorage.load_from_root(
-        Path("tmp")
-    )
     router = Router()
     router.register(
         message.MessageType.CREATE_TOPICS,
@@ -25,7 +26,11 @@ async def handle_client(
     )
     router.register(
         message.MessageType.PRODUCE,
-        functools.partial(handler.produce, log_storage=log_storage),
+        functools.partial(
+            handler.produce,
+            log_storage=log_storage,
+            producer_state_storage=producer_state_storage,
+        ),
     )
     router.register(
         message.MessageType.FETCH,
@@ -37,14 +42,49 @@ async def handle_client(
             handler.offset_commit, committed_offset_storage=committed_offset_storage
         ),
     )
+    router.register(
+        message.MessageType.OFFSET_FETCH,
+        functools.partial(
+            handler.offset_fetch, committed_offset_storage=committed_offset_storage
+        ),
+    )
     router.register(
         message.MessageType.LIST_TOPICS,
         functools.partial(handler.list_topics, log_storage=log_storage),
     )
+    router.register(
+        message.MessageType.METADATA,
+        functools.partial(handler.metadata, log_storage=log_storage),
+    )
+    router.register(
+        message.MessageType.INIT_PRODUCER_ID,
+        functools.partial(
+            handler.init_producer_id, producer_state_storage=producer_state_storage
+        ),
+    )
+    router.register(
+        message.MessageType.JOIN_GROUP,
+        functools.partial(handler.join_group, group_coordinator=group_coordinator),
+    )
+    router.register(
+        message.MessageType.SYNC_GROUP,
+        functools.partial(handler.sync_group, group_coordinator=group_coordinator),
+    )
+    router.register(
+        message.MessageType.HEARTBEAT,
+        functools.partial(handler.heartbeat, group_coordinator=group_coordinator),
+    )
+    router.register(
+        message.MessageType.LEAVE_GROUP,
+        functools.partial(handler.leave_group, group_coordinator=group_coordinator),
+    )
     message_parser = parser.MessageParser(reader)
+    writer = CoalescingWriter(writer)
     try:
         async for msg in message_parser:
-            resp = router.route(msg)
+            # requests that expect no acknowledgement return no response
+            if (resp := router.route(msg)) is None:
+                continue
             writer.write(resp.serialized)
             await writer.drain()
     except asyncio.CancelledError:
@@ -55,8 +95,42 @@ async def handle_client(
         await writer.wait_closed()
 
 
+async def report_cache_metrics(log_storage: storage.FSLogStorage) -> None:
+    while True:
+        await asyncio.sleep(constants.CACHE_METRICS_INTERVAL_MS / 1000)
+        print(f"Cache metrics: {json.dumps(log_storage.cache_metrics())}")
+
+
 async def run_broker():
-    server = await asyncio.start_server(handle_client, "localhost", 8000)
+    # storages and the group coordinator are shared by every connection so
+    # producer state, log end offsets and group membership stay consistent
+    root_path = Path("tmp")
+    log_storage = storage.FSLogStorage.load_from_root(
+        root_path, constants.LOG_FILE_SIZE_LIMIT
+    )
+    producer_state_storage = storage.FSProducerStateStorage.load_from_root(root_path)
+    server = await asyncio.start_server(
+        functools.partial(
+            handle_client,
+            log_storage=log_storage,
+            committed_offset_storage=storage.FSCommittedOffsetStorage.load_from_root(
+                root_path
+            ),
+            producer_state_storage=producer_state_storage,
+            group_coordinator=group.GroupCoordinator(),
+        ),
+        "localhost",
+        8000,
+    )
 
-    async with server:
-        await server.serve_forever()
+    # partitions load on first use; the rest are read in the background
+    warm_up = asyncio.create_task(log_storage.warm_up())
+    metrics = asyncio.create_task(report_cache_metrics(log_storage))
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        warm_up.cancel()
+        metrics.cancel()
+        log_storage.close()
+        producer_state_storage.close()
@@ -1,11 +1,81 @@
+import asyncio
+import collections
 import json
+import os
 import re
 from pathlib import Path
-from typing import Self, ClassVar
+from collections.abc import Iterator, MutableMapping
+from typing import BinaryIO, ClassVar, Self
 
 from kafka import constants
-from kafka.broker import log, query
-from kafka.error import InvalidAdminCommandError, PartitionNotFoundError
+from kafka.broker import cache, command, log, query
+from kafka.error import (
+    InvalidAdminCommandError,
+    InvalidProducerEpochError,
+    OutOfOrderSequenceError,
+    PartitionNotFoundError,
+)
+
+
+def load_partition(partition_path: Path) -> log.Partition | None:
+    topic_name, partition_num = partition_path.name.split("-")
+    base_offsets = sorted(int(p.stem) for p in partition_path.glob("*.log"))
+    if not base_offsets:
+        return None
+    segments = [log.Segment(base_offset=offset) for offset in base_offsets]
+    with (partition_path / segments[-1].log).open("rb") as log_file:
+        record_count = 0
+        while payload_size_str := log_file.read(constants.PAYLOAD_LENGTH_WIDTH):
+            payload_size = int(payload_size_str)
+            payload_data = json.loads(log_file.read(payload_size))
+            # a compressed batch is stored as one entry spanning many offsets
+            record_count += payload_data.get("record_count", 1)
+        log_end_offset = segments[-1].base_offset + record_count
+    return log.Partition(
+        topic=topic_name,
+        num=int(partition_num),
+        segments=segments,
+        leo=log_end_offset,
+    )
+
+
+class PartitionMap(MutableMapping[tuple[str, int], log.Partition]):
+    def __init__(
+        self,
+        loaded: dict[tuple[str, int], log.Partition] | None = None,
+        unloaded: dict[tuple[str, int], Path] | None = None,
+    ):
+        self._loaded = dict(loaded or {})
+        # partition directories listed at startup but not read yet
+        self.unloaded = dict(unloaded or {})
+
+    def __getitem__(self, key: tuple[str, int]) -> log.Partition:
+        if (partition_path := self.unloaded.get(key)) is not None:
+            # kept listed until it is read, so a partition that can't be loaded
+            # keeps failing instead of silently disappearing
+            partition = load_partition(partition_path)
+            del self.unloaded[key]
+            # a directory without segments isn't a partition
+            if partition is not None:
+                self._loaded[key] = partition
+        return self._loaded[key]
+
+    def __setitem__(self, key: tuple[str, int], partition: log.Partition) -> None:
+        self.unloaded.pop(key, None)
+        self._loaded[key] = partition
+
+    def __delitem__(self, key: tuple[str, int]) -> None:
+        if self.unloaded.pop(key, None) is None:
+            del self._loaded[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._loaded or key in self.unloaded
+
+    def __iter__(self) -> Iterator[tuple[str, int]]:
+        return iter([*self._loaded, *self.unloaded])
+
+    def __len__(self) -> int:
+        return len(self._loaded) + len(self.unloaded)
 
 
 class FSLogStorage:
@@ -17,44 +87,81 @@ class FSLogStorage:
         self,
         root_path: Path,
         log_file_size_limit: int,
-        partitions: dict[tuple[str, int], log.Partition],
+        partitions: dict[tuple[str, int], log.Partition] | PartitionMap,
+        tail_cache_size: int = constants.TAIL_CACHE_SIZE,
+        fetch_cache_size: int = constants.FETCH_CACHE_SIZE,
+        max_open_files: int = constants.MAX_OPEN_SEGMENT_FILES,
     ):
         self.root_path = root_path
         self.log_file_size_limit = log_file_size_limit
-        self.partitions = partitions
+        self.partitions = (
+            partitions
+            if isinstance(partitions, PartitionMap)
+            else PartitionMap(loaded=partitions)
+        )
+        # recently appended records, shared by every consumer at the log end
+        self.tail_cache = cache.TailCache(tail_cache_size)
+        # repeated reads of sealed segments; a size of 0 disables it
+        self.fetch_cache = cache.FetchCache(fetch_cache_size)
+        # open segment and index files shared by the append and fetch paths
+        self.file_handles = cache.FileHandleCache(max_open_files)
+        # where each sequential reader's next fetch is expected to start
+        self._next_fetch_offsets: collections.OrderedDict[
+            tuple[str, int, int], None
+        ] = collections.OrderedDict()
         if not root_path.exists():
             root_path.mkdir(parents=True, exist_ok=True)
 
     @classmethod
-    def load_from_root(cls, root_path: Path, log_file_size_limit: int) -> Self:
-        partitions = []
-        for partition_path in root_path.glob("*-*"):
-            topic_name, partition_num = partition_path.name.split("-")
-            base_offsets = sorted(int(p.stem) for p in partition_path.glob("*.log"))
-            if not base_offsets:
-                continue
-            segments = [log.Segment(base_offset=offset) for offset in base_offsets]
-            with (partition_path / segments[-1].log).open("rb") as log_file:
-                records = []
-                while payload_size_str := log_file.read(constants.PAYLOAD_LENGTH_WIDTH):
-                    payload_size = int(payload_size_str)
-                    payload_data = log_file.read(payload_size).decode("utf-8")
-                    records.append(payload_data)
-                log_end_offset = segments[-1].base_offset + len(records)
-            partitions.append(
-                log.Partition(
-                    topic=topic_name,
-                    num=int(partition_num),
-                    segments=segments,
-                    leo=log_end_offset,
-                )
-            )
+    def load_from_root(
+        cls,
+        root_path: Path,
+        log_file_size_limit: int,
+        tail_cache_size: int = constants.TAIL_CACHE_SIZE,
+        fetch_cache_size: int = constants.FETCH_CACHE_SIZE,
+        max_open_files: int = constants.MAX_OPEN_SEGMENT_FILES,
+    ) -> Self:
+        # only the directory listing is read here; each partition's segments
+        # and log end offset are recovered when it is first used
+        unloaded = {}
+        if root_path.exists():
+            with os.scandir(root_path) as entries:
+                for entry in entries:
+                    if not entry.is_dir() or "-" not in entry.name:
+                        continue
+                    # segments are never deleted, so one stat tells a partition
+                    # from a directory whose creation never finished; METADATA
+                    # mustn't report partitions that produce and fetch reject
+                    if not os.path.exists(
+                        os.path.join(entry.path, log.Segment(base_offset=0).log)
+                    ):
+                        continue
+                    topic_name, partition_num = entry.name.split("-")
+                    unloaded[(topic_name, int(partition_num))] = Path(entry.path)
         return cls(
             root_path=root_path,
             log_file_size_limit=log_file_size_limit,
-            partitions={(p.topic, p.num): p for p in partitions},
+            partitions=PartitionMap(unloaded=unloaded),
+            tail_cache_size=tail_cache_size,
+            fetch_cache_size=fetch_cache_size,
+            max_open_files=max_open_files,
         )
 
+    async def warm_up(self) -> None:
+        # the most recently written partitions are the likeliest to be used
+        for key in sorted(
+            self.partitions.unloaded,
+            key=lambda key: self.partitions.unloaded[key].stat().st_mtime,
+            reverse=True,
+        ):
+            try:
+                self.partitions.get(key)
+            except Exception as exc:
+                # left unloaded, so requests for it report the same error
+                print(f"Failed to load partition {key[0]}-{key[1]}: {exc!r}")
+            # yield between partitions so requests are served meanwhile
+            await asyncio.sleep(0)
+
     def init_partition(self, topic_name: str, partition_num: int) -> None:
         partition_path = self.root_path / f"{topic_name}-{partition_num}"
         if not partition_path.exists():
@@ -70,6 +177,8 @@ class FSLogStorage:
             segments=[new_segment],
             leo=0,
         )
+        self.tail_cache.drop((topic_name, partition_num))
+        self.fetch_cache.drop((topic_name, partition_num))
 
     def init_topic(self, topic_name: str, num_partitions: int) -> None:
         if num_partitions <= 0:
@@ -92,29 +201,73 @@ class FSLogStorage:
         ):
             self.init_partition(topic_name=topic_name, partition_num=partition_num)
 
-    def append_log(self, record: log.Record) -> None:
-        if (partition := self.partitions.get((record.topic, record.partition))) is None:
-            raise PartitionNotFoundError(
-                f"Partition {record.partition_name} does not exist"
-            )
+    def _append_entry(
+        self,
+        partition: log.Partition,
+        entry: log.Record | log.RecordBatch,
+        records: list[log.Record],
+    ) -> None:
         partition_path = self.root_path / partition.name
         log_path = partition_path / partition.active_segment.log
         index_path = partition_path / partition.active_segment.index
-        new_record = record.record_at(partition.leo)
-        new_record_binary = new_record.bin
-        current_log_file_size = log_path.stat().st_size + len(new_record_binary)
+        entry_binary = entry.bin
+        current_log_file_size = log_path.stat().st_size + len(entry_binary)
         if current_log_file_size > self.log_file_size_limit:
             partition = partition.roll()
             log_path = partition_path / partition.active_segment.log
             index_path = partition_path / partition.active_segment.index
             log_path.touch()
             index_path.touch()
-        with log_path.open("ab") as log_file:
-            position = log_file.tell()
-            log_file.write(new_record_binary)
-        with index_path.open("ab") as index_file:
-            index_file.write(new_record.index_entry(position))
-        self.partitions[(partition.topic, partition.num)] = partition.commit_record()
+        with self.file_handles.open(log_path) as log_file:
+            position = log_file.seek(0, os.SEEK_END)
+            log_file.write(entry_binary)
+            log_file.flush()
+        with self.file_handles.open(index_path) as index_file:
+            index_file.write(entry.index_entry(position))
+            index_file.flush()
+        record_count = entry.record_count if isinstance(entry, log.RecordBatch) else 1
+        self.partitions[(partition.topic, partition.num)] = partition.commit_record(
+            record_count
+        )
+        # encoded once here instead of on every fetch that reads it back
+        self.tail_cache.append((partition.topic, partition.num), records)
+
+    def append_log(self, record: log.Record) -> None:
+        if (partition := self.partitions.get((record.topic, record.partition))) is None:
+            raise PartitionNotFoundError(
+                f"Partition {record.partition_name} does not exist"
+            )
+        entry = record.record_at(partition.leo)
+        self._append_entry(partition, entry, [entry])
+
+    def append_batch(self, batch: log.RecordBatch) -> None:
+        if (partition := self.partitions.get((batch.topic, batch.partition))) is None:
+            raise PartitionNotFoundError(
+                f"Partition {batch.partition_name} does not exist"
+            )
+        new_batch = batch.batch_at(partition.leo)
+        # decoded before anything is written, so a corrupt batch or a wrong
+        # record_count never reaches the log or moves the log end offset; the
+        # decoded records then fill the tail cache without a second pass
+        records = new_batch.unpack()
+        if new_batch.size > constants.PAYLOAD_SIZE_LIMIT:
+            # too large for one log entry, so fall back to storing each record
+            for record in records:
+                self._append_entry(
+                    self.partitions[(batch.topic, batch.partition)], record, [record]
+                )
+            return
+        self._append_entry(partition, new_batch, records)
+
+    @staticmethod
+    def _read_index(index_file: BinaryIO) -> Iterator[tuple[int, int]]:
+        while index_entry := index_file.read(
+            constants.LOG_RECORD_OFFSET_WIDTH + constants.LOG_RECORD_POSITION_WIDTH
+        ):
+            yield (
+                int(index_entry[: constants.LOG_RECORD_OFFSET_WIDTH]),
+                int(index_entry[constants.LOG_RECORD_OFFSET_WIDTH :]),
+            )
 
     def list_logs(self, qry: query.Fetch) -> list[log.Record]:
         if (partition := self.partitions.get((qry.topic, qry.partition))) is None:
@@ -126,70 +279,182 @@ class FSLogStorage:
             s for s in partition.segments if s.base_offset > qry.offset
         ]
         read_targets = partition.segments[-(1 + len(over_start_offset)) :]
+        # a fetch that starts where an earlier one ended comes from a reader
+        # scanning the log in order
+        fetch_key = (qry.topic, qry.partition, qry.offset)
+        sequential = fetch_key in self._next_fetch_offsets
+        self._next_fetch_offsets.pop(fetch_key, None)
         total_record_size = 0
         result = []
         for segment in read_targets:
             log_path = partition_path / segment.log
             index_path = partition_path / segment.index
-            with index_path.open("rb") as index_file:
-                with log_path.open("rb") as log_file:
-                    while total_record_size < qry.max_bytes:
-                        index_entry = index_file.read(
-                            constants.LOG_RECORD_OFFSET_WIDTH
-                            + constants.LOG_RECORD_POSITION_WIDTH
-                        )
-                        if not index_entry:
-                            break
-                        offset, pos = (
-                            int(index_entry[: constants.LOG_RECORD_OFFSET_WIDTH]),
-                            int(index_entry[constants.LOG_RECORD_OFFSET_WIDTH :]),
-                        )
-                        if offset < qry.offset:
+            with self.file_handles.open(index_path) as index_file:
+                with self.file_handles.open(log_path) as log_file:
+                    index_file.seek(0)
+                    index_entries = self._read_index(index_file)
+                    current = next(index_entries, None)
+                    while current is not None:
+                        _, pos = current
+                        current = next(index_entries, None)
+                        # an entry may be a batch, so it ends where the next one begins
+                        if current is not None and current[0] <= qry.offset:
                             continue
                         log_file.seek(pos)
                         record_size_str = log_file.read(constants.PAYLOAD_LENGTH_WIDTH)
                         if not record_size_str:
                             break
                         record_size = int(record_size_str)
-                        record = log.Record.from_log(
+                        for record in log.records_from_log(
                             topic=partition.topic,
                             partition=partition.num,
                             record_data=log_file.read(record_size),
-                        )
-                        if total_record_size + record.size > qry.max_bytes:
-                            break
-                        result.append(record)
-                        total_record_size += record.size
+                        ):
+                            if record.offset < qry.offset:
+                                continue
+                            # the first record is always returned so a record larger
+                            # than max_bytes can't stall the consumer
+                            if (
+                                result
+                                and total_record_size + record.size > qry.max_bytes
+                            ):
+                                if sequential and segment != partition.active_segment:
+                                    self._read_ahead(log_file)
+                                self._track_fetch(qry, result)
+                                return result
+                            result.append(record)
+                            total_record_size += record.size
 
+        self._track_fetch(qry, result)
         return result
 
+    def _track_fetch(self, qry: query.Fetch, result: list[log.Record]) -> None:
+        if not result:
+            return
+        next_key = (qry.topic, qry.partition, result[-1].offset + 1)
+        self._next_fetch_offsets[next_key] = None
+        if len(self._next_fetch_offsets) > constants.READ_AHEAD_MAX_READERS:
+            self._next_fetch_offsets.popitem(last=False)
+
+    @staticmethod
+    def _read_ahead(log_file: BinaryIO) -> None:
+        # the kernel reads the next chunk in the background, so the reader's
+        # next fetch finds it in the page cache instead of waiting on disk
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(
+                log_file.fileno(),
+                log_file.tell(),
+                constants.READ_AHEAD_SIZE,
+                os.POSIX_FADV_WILLNEED,
+            )
+
+    def list_encoded_logs(self, qry: query.Fetch) -> list[bytes]:
+        if (partition := self.partitions.get((qry.topic, qry.partition))) is None:
+            raise PartitionNotFoundError(
+                f"Partition {qry.topic}-{qry.partition} does not exist"
+            )
+        if qry.offset >= partition.leo:
+            return []
+        if (
+            cached := self.tail_cache.read(
+                (qry.topic, qry.partition), qry.offset, qry.max_bytes
+            )
+        ) is not None:
+            return cached
+        key = (qry.topic, qry.partition, qry.offset, qry.max_bytes)
+        if (cached := self.fetch_cache.get(key)) is not None:
+            return cached
+        records = self.list_logs(qry)
+        encoded = [record.payload for record in records]
+        # the read stopped at max_bytes short of the active segment, so only
+        # sealed segments, which never change, went into it
+        if records and records[-1].offset + 1 < partition.active_segment.base_offset:
+            self.fetch_cache.put(key, encoded)
+        return encoded
+
+    def cache_metrics(self) -> dict[str, int | float]:
+        return {
+            "fetch_cache_hits": self.fetch_cache.hits,
+            "fetch_cache_misses": self.fetch_cache.misses,
+            "fetch_cache_hit_rate": self.fetch_cache.hit_rate,
+            "fetch_cache_bytes": self.fetch_cache.size,
+            "tail_cache_bytes": self.tail_cache.size,
+            "file_handle_hits": self.file_handles.hits,
+            "file_handle_misses": self.file_handles.misses,
+            "open_files": self.file_handles.open_files,
+        }
+
+    def close(self) -> None:
+        self.file_handles.close()
+
     def list_topics(self) -> list[str]:
         return list({topic for topic, _ in self.partitions.keys()})
 
+    def partition_counts(self) -> dict[str, int]:
+        return dict(collections.Counter(topic for topic, _ in self.partitions.keys()))
+
 
 class FSCommittedOffsetStorage:
     key_delimiter: ClassVar[str] = ":"
 
-    def __init__(self, root_path: Path, cache: dict[tuple[str, str, int], int]):
+    def __init__(
+        self,
+        root_path: Path,
+        cache: dict[tuple[str, str, int], int],
+        log_entries: int = 0,
+        compaction_threshold: int = constants.COMMITTED_OFFSET_COMPACTION_THRESHOLD,
+    ):
         self.root_path = root_path
         self.cache: dict[tuple[str, str, int], int] = cache
+        # entries appended to the offsets log since the last snapshot
+        self.log_entries = log_entries
+        self.compaction_threshold = compaction_threshold
+        self._pending: dict[tuple[str, str, int], int] = {}
 
     @classmethod
-    def load_from_root(cls, root_path: Path) -> Self:
+    def load_from_root(
+        cls,
+        root_path: Path,
+        compaction_threshold: int = constants.COMMITTED_OFFSET_COMPACTION_THRESHOLD,
+    ) -> Self:
         chk_file_path = root_path / constants.COMMITTED_OFFSET_FILE_NAME
+        cache = {}
         if not chk_file_path.exists():
-            cache = {}
             chk_file_path.touch()
             with chk_file_path.open("wb") as chk_file:
                 chk_file.write(json.dumps(cache).encode("utf-8"))
-            return cls(root_path=root_path, cache=cache)
         with chk_file_path.open("rb") as chk_file:
             data = json.loads(chk_file.read().decode("utf-8"))
-            cache = {}
             for key, value in data.items():
                 group_id, topic, partition = key.split(cls.key_delimiter)
                 cache[(group_id, topic, int(partition))] = int(value)
-        return cls(root_path=root_path, cache=cache)
+        log_entries = 0
+        log_file_path = root_path / constants.COMMITTED_OFFSET_LOG_FILE_NAME
+        if log_file_path.exists():
+            with log_file_path.open("r+b") as log_file:
+                complete_size = 0
+                for line in log_file:
+                    # a torn write from a crash leaves a partial last line, which
+                    # is cut off so later commits don't append after it
+                    if not line.endswith(b"\n"):
+                        log_file.truncate(complete_size)
+                        break
+                    complete_size += len(line)
+                    committed_offset = log.CommittedOffset.model_validate_json(line)
+                    cache[
+                        (
+                            committed_offset.group_id,
+                            committed_offset.topic,
+                            committed_offset.partition,
+                        )
+                    ] = committed_offset.offset
+                    log_entries += 1
+        return cls(
+            root_path=root_path,
+            cache=cache,
+            log_entries=log_entries,
+            compaction_threshold=compaction_threshold,
+        )
 
     def update(self, committed_offset: log.CommittedOffset) -> None:
         key = (
@@ -205,12 +470,172 @@ class FSCommittedOffsetStorage:
                 f"Offset {committed_offset.offset} is not greater than the current offset {self.cache[key]} for {key}"
             )
         self.cache[key] = committed_offset.offset
+        self._pending[key] = committed_offset.offset
 
     def commit(self) -> None:
+        if not self._pending:
+            return
+        entries = b"".join(
+            log.CommittedOffset(
+                group_id=group_id, topic=topic, partition=partition, offset=offset
+            )
+            .model_dump_json()
+            .encode("utf-8")
+            + b"\n"
+            for (group_id, topic, partition), offset in self._pending.items()
+        )
+        with (self.root_path / constants.COMMITTED_OFFSET_LOG_FILE_NAME).open(
+            "ab"
+        ) as log_file:
+            log_file.write(entries)
+        self.log_entries += len(self._pending)
+        self._pending.clear()
+        # the snapshot costs O(all offsets), so it is only taken once the log
+        # has grown past both the threshold and the snapshot itself
+        if self.log_entries >= max(self.compaction_threshold, len(self.cache)):
+            self.compact()
+
+    def compact(self) -> None:
         chk_file_path = self.root_path / constants.COMMITTED_OFFSET_FILE_NAME
         persisted_cache = {
             f"{group_id}{self.key_delimiter}{topic}{self.key_delimiter}{partition}": offset
             for (group_id, topic, partition), offset in self.cache.items()
         }
-        with chk_file_path.open("w") as chk_file:
-            json.dump(persisted_cache, chk_file, ensure_ascii=True)
+        tmp_path = chk_file_path.with_name(f"{chk_file_path.name}.tmp")
+        with tmp_path.open("w") as tmp_file:
+            json.dump(persisted_cache, tmp_file, ensure_ascii=True)
+        os.replace(tmp_path, chk_file_path)
+        # replaying a log the snapshot already covers is harmless, so a crash
+        # before the truncate below loses nothing
+        (self.root_path / constants.COMMITTED_OFFSET_LOG_FILE_NAME).open("wb").close()
+        self.log_entries = 0
+
+
+class FSProducerStateStorage:
+    def __init__(
+        self,
+        root_path: Path,
+        next_producer_id: int,
+        entries: dict[tuple[str, int], dict[int, log.ProducerStateEntry]],
+        snapshot_interval: int = constants.PRODUCER_STATE_SNAPSHOT_INTERVAL,
+    ):
+        self.root_path = root_path
+        self.next_producer_id = next_producer_id
+        self.entries = entries
+        self.snapshot_interval = snapshot_interval
+        # batches recorded per partition since its snapshot was last written
+        self.unsnapshotted: dict[tuple[str, int], int] = {}
+
+    @classmethod
+    def load_from_root(
+        cls,
+        root_path: Path,
+        snapshot_interval: int = constants.PRODUCER_STATE_SNAPSHOT_INTERVAL,
+    ) -> Self:
+        producer_id_path = root_path / constants.PRODUCER_ID_FILE_NAME
+        next_producer_id = (
+            int(producer_id_path.read_text()) if producer_id_path.exists() else 0
+        )
+        # each partition's snapshot is read when the partition is first produced to
+        return cls(
+            root_path=root_path,
+            next_producer_id=next_producer_id,
+            entries={},
+            snapshot_interval=snapshot_interval,
+        )
+
+    def partition_entries(
+        self, topic: str, partition: int
+    ) -> dict[int, log.ProducerStateEntry]:
+        if (entries := self.entries.get((topic, partition))) is not None:
+            return entries
+        snapshot_path = (
+            self.root_path
+            / f"{topic}-{partition}"
+            / constants.PRODUCER_STATE_SNAPSHOT_FILE_NAME
+        )
+        entries = {}
+        if snapshot_path.exists():
+            for state in json.loads(snapshot_path.read_text()):
+                entry = log.ProducerStateEntry.model_validate(state)
+                entries[entry.producer_id] = entry
+        self.entries[(topic, partition)] = entries
+        return entries
+
+    @staticmethod
+    def _replace(path: Path, data: str) -> None:
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        tmp_path.write_text(data)
+        os.replace(tmp_path, path)
+
+    def init_producer_id(self) -> int:
+        producer_id = self.next_producer_id
+        self.next_producer_id += 1
+        self._replace(
+            self.root_path / constants.PRODUCER_ID_FILE_NAME,
+            str(self.next_producer_id),
+        )
+        return producer_id
+
+    def duplicate_offset(self, cmd: command.Produce) -> int | None:
+        entry = self.partition_entries(cmd.topic, cmd.partition).get(cmd.producer_id)
+        if entry is None or cmd.producer_epoch > entry.producer_epoch:
+            expected_sequence = 0
+        elif cmd.producer_epoch < entry.producer_epoch:
+            raise InvalidProducerEpochError(
+                f"Producer {cmd.producer_id} epoch {cmd.producer_epoch} is older "
+                f"than the current epoch {entry.producer_epoch}"
+            )
+        elif (
+            batch := entry.find_batch(cmd.base_sequence, cmd.last_sequence)
+        ) is not None:
+            return batch.base_offset
+        else:
+            expected_sequence = entry.last_sequence + 1
+        if cmd.base_sequence != expected_sequence:
+            raise OutOfOrderSequenceError(
+                f"Producer {cmd.producer_id} sent sequence {cmd.base_sequence} "
+                f"to {cmd.topic}-{cmd.partition}, expected {expected_sequence}"
+            )
+        return None
+
+    def update(self, cmd: command.Produce, base_offset: int) -> None:
+        partition_entries = self.partition_entries(cmd.topic, cmd.partition)
+        entry = partition_entries.get(cmd.producer_id)
+        if entry is None or entry.producer_epoch != cmd.producer_epoch:
+            entry = log.ProducerStateEntry(
+                producer_id=cmd.producer_id, producer_epoch=cmd.producer_epoch
+            )
+        partition_entries[cmd.producer_id] = entry.append_batch(
+            log.BatchMetadata(
+                first_sequence=cmd.base_sequence,
+                last_sequence=cmd.last_sequence,
+                base_offset=base_offset,
+            )
+        )
+        key = (cmd.topic, cmd.partition)
+        self.unsnapshotted[key] = self.unsnapshotted.get(key, 0) + 1
+        # the snapshot is rewritten every snapshot_interval batches instead of on
+        # every produce. A crash loses the batches recorded since then: a retry
+        # of one of them is appended again, and the producer's next batch gets
+        # OutOfOrderSequence until the producer takes a new producer id
+        if self.unsnapshotted[key] >= self.snapshot_interval:
+            self.snapshot(cmd.topic, cmd.partition)
+
+    def snapshot(self, topic: str, partition: int) -> None:
+        self._replace(
+            self.root_path
+            / f"{topic}-{partition}"
+            / constants.PRODUCER_STATE_SNAPSHOT_FILE_NAME,
+            json.dumps(
+                [
+                    state.model_dump(mode="json")
+                    for state in self.partition_entries(topic, partition).values()
+                ]
+            ),
+        )
+        self.unsnapshotted.pop((topic, partition), None)
+
+    def close(self) -> None:
+        for topic, partition in list(self.unsnapshotted):
+            self.snapshot(topic, partition)
@@ -0,0 +1,32 @@
+import bz2
+import enum
+import gzip
+import lzma
+from collections.abc import Callable
+
+
+class CompressionType(enum.StrEnum):
+    NONE = "none"
+    GZIP = "gzip"
+    LZMA = "lzma"
+    BZ2 = "bz2"
+
+
+_CODECS: dict[
+    CompressionType, tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]
+] = {
+    CompressionType.NONE: (bytes, bytes),
+    CompressionType.GZIP: (gzip.compress, gzip.decompress),
+    CompressionType.LZMA: (lzma.compress, lzma.decompress),
+    CompressionType.BZ2: (bz2.compress, bz2.decompress),
+}
+
+
+def compress(data: bytes, compression_type: CompressionType) -> bytes:
+    compressor, _ = _CODECS[compression_type]
+    return compressor(data)
+
+
+def decompress(data: bytes, compression_type: CompressionType) -> bytes:
+    _, decompressor = _CODECS[compression_type]
+    return decompressor(data)
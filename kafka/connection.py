@@ -4,6 +4,7 @@ from types import TracebackType
 from typing import IO, Self
 
 from kafka.error import BrokerConnectionError
+from kafka.writer import CoalescingWriter
 
 
 class BrokerConnection:
@@ -11,7 +12,7 @@ class BrokerConnection:
         self.host = host
         self.port = port
         self._reader: asyncio.StreamReader | None = None
-        self._writer: asyncio.StreamWriter | None = None
+        self._writer: CoalescingWriter | None = None
         self._buf: IO[bytes] = io.BytesIO()
 
     @property
@@ -21,7 +22,7 @@ class BrokerConnection:
     async def connect(self) -> None:
         reader, writer = await asyncio.open_connection(self.host, self.port)
         self._reader = reader
-        self._writer = writer
+        self._writer = CoalescingWriter(writer)
 
     async def close(self) -> None:
         if not self.is_connected:
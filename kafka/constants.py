@@ -2,10 +2,31 @@ CORRELATION_ID_WIDTH = 4
 API_KEY_WIDTH = 2
 PAYLOAD_LENGTH_WIDTH = 4
 HEADER_WIDTH = CORRELATION_ID_WIDTH + API_KEY_WIDTH + PAYLOAD_LENGTH_WIDTH
+PAYLOAD_SIZE_LIMIT = 10**PAYLOAD_LENGTH_WIDTH - 1
+
+WRITE_HIGH_WATER_MARK = 64 * 1024  # 64 KB
 
 LOG_FILENAME_LENGTH = 20
 LOG_FILE_SIZE_LIMIT = 1024**3  # 1 GB
 LOG_RECORD_OFFSET_WIDTH = 8
 LOG_RECORD_POSITION_WIDTH = 8
+TAIL_CACHE_SIZE = 8 * 1024**2  # 8 MB
+FETCH_CACHE_SIZE = 16 * 1024**2  # 16 MB
+READ_AHEAD_SIZE = 1024**2  # 1 MB
+READ_AHEAD_MAX_READERS = 1024
+MAX_OPEN_SEGMENT_FILES = 1024
+CACHE_METRICS_INTERVAL_MS = 60 * 1000
 
 COMMITTED_OFFSET_FILE_NAME = "committed_offsets.chk"
+COMMITTED_OFFSET_LOG_FILE_NAME = "committed_offsets.log"
+COMMITTED_OFFSET_COMPACTION_THRESHOLD = 1000
+NO_COMMITTED_OFFSET = -1
+NO_GENERATION_ID = -1
+
+NO_PRODUCER_ID = -1
+NO_PRODUCER_EPOCH = -1
+NO_SEQUENCE = -1
+PRODUCER_ID_FILE_NAME = "producer_ids.chk"
+PRODUCER_STATE_SNAPSHOT_FILE_NAME = "producer_state.snapshot"
+PRODUCER_STATE_WINDOW_SIZE = 5
+PRODUCER_STATE_SNAPSHOT_INTERVAL = 100
@@ -0,0 +1,157 @@
+import enum
+import itertools
+from typing import Protocol
+
+
+class RebalanceProtocol(enum.StrEnum):
+    # every member gives up all of its partitions before rejoining
+    EAGER = "eager"
+    # members keep their partitions and give up only the ones that move
+    COOPERATIVE = "cooperative"
+
+
+class PartitionAssignor(Protocol):
+    name: str
+    rebalance_protocol: RebalanceProtocol
+
+    def assign(
+        self,
+        partition_counts: dict[str, int],
+        subscriptions: dict[str, list[str]],
+        owned_partitions: dict[str, list[tuple[str, int]]] | None = None,
+    ) -> dict[str, list[tuple[str, int]]]:
+        """구독 정보와 멤버가 소유한 파티션으로 멤버별 할당 파티션을 계산한다."""
+        pass
+
+
+class RangeAssignor:
+    name = "range"
+    rebalance_protocol = RebalanceProtocol.EAGER
+
+    def assign(
+        self,
+        partition_counts: dict[str, int],
+        subscriptions: dict[str, list[str]],
+        owned_partitions: dict[str, list[tuple[str, int]]] | None = None,
+    ) -> dict[str, list[tuple[str, int]]]:
+        assignments: dict[str, list[tuple[str, int]]] = {
+            member_id: [] for member_id in subscriptions
+        }
+        for topic, num_partitions in sorted(partition_counts.items()):
+            members = sorted(
+                member_id
+                for member_id, topics in subscriptions.items()
+                if topic in topics
+            )
+            if not members:
+                continue
+            # each member takes a contiguous range; the first ones take one extra
+            quota, extra = divmod(num_partitions, len(members))
+            start = 0
+            for idx, member_id in enumerate(members):
+                length = quota + (1 if idx < extra else 0)
+                assignments[member_id].extend(
+                    (topic, partition) for partition in range(start, start + length)
+                )
+                start += length
+        return assignments
+
+
+class RoundRobinAssignor:
+    name = "roundrobin"
+    rebalance_protocol = RebalanceProtocol.EAGER
+
+    def assign(
+        self,
+        partition_counts: dict[str, int],
+        subscriptions: dict[str, list[str]],
+        owned_partitions: dict[str, list[tuple[str, int]]] | None = None,
+    ) -> dict[str, list[tuple[str, int]]]:
+        assignments: dict[str, list[tuple[str, int]]] = {
+            member_id: [] for member_id in subscriptions
+        }
+        members = itertools.cycle(sorted(subscriptions))
+        for topic, num_partitions in sorted(partition_counts.items()):
+            if not any(topic in topics for topics in subscriptions.values()):
+                continue
+            for partition in range(num_partitions):
+                # skip members that didn't subscribe to the topic
+                member_id = next(members)
+                while topic not in subscriptions[member_id]:
+                    member_id = next(members)
+                assignments[member_id].append((topic, partition))
+        return assignments
+
+
+class CooperativeStickyAssignor:
+    name = "cooperative-sticky"
+    rebalance_protocol = RebalanceProtocol.COOPERATIVE
+
+    def assign(
+        self,
+        partition_counts: dict[str, int],
+        subscriptions: dict[str, list[str]],
+        owned_partitions: dict[str, list[tuple[str, int]]] | None = None,
+    ) -> dict[str, list[tuple[str, int]]]:
+        owned_partitions = owned_partitions or {}
+        members = sorted(subscriptions)
+        assignments: dict[str, list[tuple[str, int]]] = {
+            member_id: [] for member_id in members
+        }
+        owners: dict[tuple[str, int], str] = {}
+        # keep every partition that is still valid where it already is
+        for member_id in members:
+            for topic, partition in owned_partitions.get(member_id, []):
+                if (
+                    topic in subscriptions[member_id]
+                    and partition < partition_counts.get(topic, 0)
+                    and (topic, partition) not in owners
+                ):
+                    owners[(topic, partition)] = member_id
+                    assignments[member_id].append((topic, partition))
+        for topic, num_partitions in sorted(partition_counts.items()):
+            for partition in range(num_partitions):
+                if (topic, partition) in owners:
+                    continue
+                candidates = [m for m in members if topic in subscriptions[m]]
+                if not candidates:
+                    continue
+                member_id = min(candidates, key=lambda m: len(assignments[m]))
+                owners[(topic, partition)] = member_id
+                assignments[member_id].append((topic, partition))
+        # move one partition at a time from the busiest member until balanced
+        moved = True
+        while moved:
+            moved = False
+            for donor in sorted(members, key=lambda m: -len(assignments[m])):
+                for receiver in sorted(members, key=lambda m: len(assignments[m])):
+                    if len(assignments[donor]) - len(assignments[receiver]) <= 1:
+                        break
+                    movable = [
+                        tp
+                        for tp in assignments[donor]
+                        if tp[0] in subscriptions[receiver]
+                    ]
+                    if movable:
+                        assignments[donor].remove(movable[-1])
+                        assignments[receiver].append(movable[-1])
+                        moved = True
+                        break
+                if moved:
+                    break
+        # a partition still owned elsewhere is handed over in a follow-up
+        # rebalance, once its current owner has revoked it
+        previous_owners = {
+            tp: member_id
+            for member_id, partitions in owned_partitions.items()
+            if member_id in assignments
+            for tp in partitions
+        }
+        return {
+            member_id: sorted(
+                tp
+                for tp in partitions
+                if previous_owners.get(tp, member_id) == member_id
+            )
+            for member_id, partitions in assignments.items()
+        }
@@ -0,0 +1,330 @@
+import asyncio
+import contextlib
+import time
+from collections.abc import Callable
+
+from kafka import broker, connection, constants, dispatcher, record, serialization
+from kafka.consumer import assignor, coordinator, fetcher, listener
+from kafka.error import (
+    IllegalGenerationError,
+    KafkaError,
+    RebalanceInProgressError,
+    UnknownMemberIdError,
+)
+
+
+class KafkaConsumer:
+    def __init__(
+        self,
+        broker_host: str,
+        broker_port: int,
+        correlation_id_factory: Callable[[], int],
+        max_partition_fetch_bytes: int = 4 * 1024,
+        fetch_min_bytes: int = 1,
+        fetch_max_wait_ms: int = 500,
+        key_deserializer: serialization.Deserializer = serialization.bytes_deserializer,
+        value_deserializer: serialization.Deserializer = serialization.bytes_deserializer,
+        group_id: str | None = None,
+        enable_auto_commit: bool = True,
+        auto_commit_interval_ms: int = 5 * 1000,
+        session_timeout_ms: int = 10 * 1000,
+        heartbeat_interval_ms: int = 3 * 1000,
+        retry_backoff_ms: int = 100,
+        partition_assignors: list[assignor.PartitionAssignor] | None = None,
+    ):
+        if not 0 < max_partition_fetch_bytes <= constants.PAYLOAD_SIZE_LIMIT:
+            raise ValueError(
+                "max_partition_fetch_bytes must be between 1 and "
+                f"{constants.PAYLOAD_SIZE_LIMIT} bytes"
+            )
+        self.broker_host = broker_host
+        self.broker_port = broker_port
+        self.correlation_id_factory = correlation_id_factory
+        self.max_partition_fetch_bytes = max_partition_fetch_bytes
+        self.fetch_min_bytes = fetch_min_bytes
+        self.fetch_max_wait_ms = fetch_max_wait_ms
+        self.key_deserializer = key_deserializer
+        self.value_deserializer = value_deserializer
+        self.group_id = group_id
+        self.enable_auto_commit = enable_auto_commit
+        self.auto_commit_interval_ms = auto_commit_interval_ms
+        self.session_timeout_ms = session_timeout_ms
+        self.heartbeat_interval_ms = heartbeat_interval_ms
+        self.retry_backoff_ms = retry_backoff_ms
+        self.partition_assignors = partition_assignors
+        self._subscription: list[str] = []
+        self._listener: listener.ConsumerRebalanceListener | None = None
+        self._rejoin_needed = asyncio.Event()
+        self._positions: dict[tuple[str, int], int] = {}
+        # assigned partitions that resume from the group's committed offset
+        self._awaiting_committed: set[tuple[str, int]] = set()
+        self._conn: connection.BrokerConnection | None = None
+        self._dispatcher: dispatcher.ResponseDispatcher | None = None
+        self._fetcher: fetcher.Fetcher | None = None
+        self._coordinator: coordinator.ConsumerCoordinator | None = None
+        self._wakeup = asyncio.Event()
+        self._fetched = asyncio.Event()
+        self._loop_task: asyncio.Task | None = None
+
+    @property
+    def is_connected(self) -> bool:
+        return (
+            self._conn is not None
+            and self._conn.is_connected
+            and self._dispatcher is not None
+            and self._fetcher is not None
+        )
+
+    async def loop(self) -> None:
+        async with connection.BrokerConnection(
+            self.broker_host, self.broker_port
+        ) as conn:
+            self._conn = conn
+            self._dispatcher = dispatcher.ResponseDispatcher(conn)
+            self._fetcher = fetcher.Fetcher(
+                conn=conn,
+                correlation_id_factory=self.correlation_id_factory,
+                response_dispatcher=self._dispatcher,
+                max_partition_fetch_bytes=self.max_partition_fetch_bytes,
+                fetch_min_bytes=self.fetch_min_bytes,
+                fetch_max_wait_ms=self.fetch_max_wait_ms,
+                on_fetch=self._on_fetch,
+            )
+            self._fetcher.assign(self._positions)
+            if self.group_id is not None:
+                self._coordinator = coordinator.ConsumerCoordinator(
+                    conn=conn,
+                    correlation_id_factory=self.correlation_id_factory,
+                    response_dispatcher=self._dispatcher,
+                    group_id=self.group_id,
+                    session_timeout_ms=self.session_timeout_ms,
+                    retry_backoff_ms=self.retry_backoff_ms,
+                    assignors=self.partition_assignors,
+                )
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(self._dispatch_loop())
+                tg.create_task(self._fetch_loop())
+                if self._coordinator is not None:
+                    tg.create_task(self._group_loop())
+                if self._coordinator is not None and self.enable_auto_commit:
+                    tg.create_task(self._auto_commit_loop())
+
+    def run_loop(self) -> asyncio.Task:
+        self._loop_task = asyncio.create_task(self.loop())
+        return self._loop_task
+
+    async def _dispatch_loop(self) -> None:
+        while True:
+            await self._dispatcher.dispatch()
+
+    async def _fetch_loop(self) -> None:
+        while True:
+            if self._awaiting_committed:
+                await self._resolve_committed_positions()
+            await self._fetcher.send_fetches()
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=self._fetcher.next_fetch_delay()
+                )
+            self._wakeup.clear()
+
+    async def _resolve_committed_positions(self) -> None:
+        # one lookup covers every partition assigned since the last one
+        partitions = list(self._awaiting_committed)
+        committed = await self._coordinator.fetch_committed(partitions)
+        for tp in partitions:
+            # a seek or reassignment during the lookup takes precedence
+            if tp in self._awaiting_committed:
+                self._awaiting_committed.discard(tp)
+                self._positions[tp] = committed.get(tp, 0)
+        self._fetcher.assign(self._positions)
+
+    async def _auto_commit_loop(self) -> None:
+        # one coalesced request per interval, however many records were consumed
+        while True:
+            await asyncio.sleep(self.auto_commit_interval_ms / 1000)
+            await self._coordinator.commit_async(self._positions)
+
+    async def _group_loop(self) -> None:
+        while True:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(
+                    self._rejoin_needed.wait(),
+                    timeout=self.heartbeat_interval_ms / 1000,
+                )
+            if self._rejoin_needed.is_set():
+                self._rejoin_needed.clear()
+                await self._rebalance()
+            elif self._coordinator.generation_id != constants.NO_GENERATION_ID:
+                try:
+                    await self._coordinator.heartbeat()
+                except (
+                    RebalanceInProgressError,
+                    IllegalGenerationError,
+                    UnknownMemberIdError,
+                ):
+                    self._rejoin_needed.set()
+
+    async def _revoke(self, partitions: list[tuple[str, int]]) -> None:
+        # commit before giving partitions up so the next owner resumes there
+        if self.enable_auto_commit and (
+            offsets := {
+                tp: offset for tp, offset in self._positions.items() if tp in partitions
+            }
+        ):
+            with contextlib.suppress(KafkaError):
+                await self._coordinator.commit(offsets)
+        if self._listener is not None and partitions:
+            await self._listener.on_partitions_revoked(partitions)
+        self._assign([tp for tp in self._assigned() if tp not in partitions])
+
+    async def _rebalance(self) -> None:
+        owned = self._assigned()
+        if self._coordinator.rebalance_protocol == assignor.RebalanceProtocol.EAGER:
+            await self._revoke(owned)
+            owned = []
+        assigned = await self._coordinator.ensure_active_group(
+            self._subscription, owned
+        )
+        # cooperative members give up only the partitions that moved, and
+        # rejoin so the group can hand those to their new owners
+        if revoked := [tp for tp in owned if tp not in assigned]:
+            await self._revoke(revoked)
+            self._rejoin_needed.set()
+        # retained partitions keep their position and prefetched records
+        added = [tp for tp in assigned if tp not in self.assignment()]
+        self._assign(assigned)
+        if self._listener is not None and added:
+            await self._listener.on_partitions_assigned(added)
+
+    def _on_fetch(self) -> None:
+        self._fetched.set()
+        self._wakeup.set()
+
+    def subscribe(
+        self,
+        topics: list[str],
+        rebalance_listener: listener.ConsumerRebalanceListener | None = None,
+    ) -> None:
+        if self.group_id is None:
+            raise ValueError("group_id is required to subscribe to topics")
+        if not topics:
+            raise ValueError("topics must not be empty")
+        self._subscription = list(topics)
+        self._listener = rebalance_listener
+        self._rejoin_needed.set()
+
+    def subscription(self) -> set[str]:
+        return set(self._subscription)
+
+    def assign(self, partitions: list[tuple[str, int]]) -> None:
+        if self._subscription:
+            raise ValueError("assign() can't be mixed with subscribe()")
+        self._assign(partitions)
+
+    def _assign(self, partitions: list[tuple[str, int]]) -> None:
+        positions = {}
+        for tp in partitions:
+            if tp in self._positions:
+                positions[tp] = self.position(tp)
+            elif self.group_id is None:
+                positions[tp] = 0
+        self._awaiting_committed = {tp for tp in partitions if tp not in positions}
+        self._positions = positions
+        if self._fetcher is not None:
+            self._fetcher.assign(self._positions)
+        self._wakeup.set()
+
+    def _assigned(self) -> list[tuple[str, int]]:
+        return [*self._positions, *sorted(self._awaiting_committed)]
+
+    def assignment(self) -> set[tuple[str, int]]:
+        return set(self._assigned())
+
+    def seek(self, tp: tuple[str, int], offset: int) -> None:
+        if tp not in self.assignment():
+            raise ValueError(f"Partition {tp[0]}-{tp[1]} is not assigned")
+        if offset < 0:
+            raise ValueError("offset must not be negative")
+        self._awaiting_committed.discard(tp)
+        self._positions[tp] = offset
+        if self._fetcher is not None:
+            if tp in self._fetcher.partitions:
+                self._fetcher.seek(tp, offset)
+            else:
+                self._fetcher.assign(self._positions)
+        self._wakeup.set()
+
+    def position(self, tp: tuple[str, int]) -> int:
+        if tp in self._awaiting_committed:
+            raise ValueError(
+                f"Partition {tp[0]}-{tp[1]} is waiting for its committed offset"
+            )
+        if tp not in self._positions:
+            raise ValueError(f"Partition {tp[0]}-{tp[1]} is not assigned")
+        if self._fetcher is not None:
+            return self._fetcher.partitions[tp].position
+        return self._positions[tp]
+
+    def _to_consumer_record(
+        self, tp: tuple[str, int], rec: broker.LazyFetchedRecord
+    ) -> record.ConsumerRecord:
+        return record.ConsumerRecord(
+            topic=tp[0],
+            partition=tp[1],
+            offset=rec.offset,
+            timestamp=rec.timestamp,
+            key=None if rec.key is None else self.key_deserializer(rec.key),
+            # values and headers are decoded only if the application reads them
+            load_value=lambda: self.value_deserializer(rec.value),
+            load_headers=lambda: rec.headers,
+        )
+
+    async def poll(
+        self, timeout_ms: int = 0, max_records: int = 500
+    ) -> list[record.ConsumerRecord]:
+        if not self.is_connected:
+            raise connection.BrokerConnectionError("Not connected to broker")
+        deadline = time.monotonic() + timeout_ms / 1000
+        while True:
+            self._fetched.clear()
+            if drained := self._fetcher.drain(max_records):
+                for tp, rec in drained:
+                    self._positions[tp] = rec.offset + 1
+                # freed buffer space lets the fetcher prefetch the next batch
+                self._wakeup.set()
+                return [self._to_consumer_record(tp, rec) for tp, rec in drained]
+            if (remaining := deadline - time.monotonic()) <= 0:
+                return []
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._fetched.wait(), timeout=remaining)
+
+    async def commit(self, offsets: dict[tuple[str, int], int] | None = None) -> None:
+        if not self.is_connected:
+            raise connection.BrokerConnectionError("Not connected to broker")
+        if self._coordinator is None:
+            raise ValueError("group_id is required to commit offsets")
+        await self._coordinator.commit(
+            dict(self._positions) if offsets is None else offsets
+        )
+
+    async def close(self) -> None:
+        try:
+            if (
+                self.is_connected
+                and self._coordinator is not None
+                and self.enable_auto_commit
+            ):
+                await self.commit()
+        finally:
+            # a failed final commit is still raised, but only once the consumer
+            # has left the group and its background tasks have stopped
+            if self.is_connected and self._coordinator is not None:
+                # leaving right away spares the group waiting out our session
+                with contextlib.suppress(KafkaError):
+                    await self._coordinator.leave_group()
+            if self._loop_task is not None:
+                self._loop_task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await self._loop_task
+                self._loop_task = None
@@ -0,0 +1,384 @@
+import asyncio
+import functools
+import json
+import sys
+from collections.abc import Callable
+
+from kafka import broker, connection, constants, dispatcher, message
+from kafka.consumer import assignor
+from kafka.error import (
+    IllegalGenerationError,
+    RebalanceInProgressError,
+    UnknownMemberIdError,
+    from_error_code,
+)
+
+
+class ConsumerCoordinator:
+    def __init__(
+        self,
+        conn: connection.BrokerConnection,
+        correlation_id_factory: Callable[[], int],
+        response_dispatcher: dispatcher.ResponseDispatcher,
+        group_id: str,
+        session_timeout_ms: int = 10 * 1000,
+        retry_backoff_ms: int = 100,
+        assignors: list[assignor.PartitionAssignor] | None = None,
+    ):
+        self.conn = conn
+        self.correlation_id_factory = correlation_id_factory
+        self.dispatcher = response_dispatcher
+        self.group_id = group_id
+        self.session_timeout_ms = session_timeout_ms
+        self.retry_backoff_ms = retry_backoff_ms
+        self.assignors = assignors or [assignor.RangeAssignor()]
+        self.member_id: str | None = None
+        self.generation_id = constants.NO_GENERATION_ID
+        # offsets that are committed or in flight, so unchanged ones aren't resent
+        self.committed: dict[tuple[str, int], int] = {}
+        self._pending_commits: set[asyncio.Future[bytes]] = set()
+
+    @property
+    def rebalance_protocol(self) -> assignor.RebalanceProtocol:
+        # cooperative only when whichever assignor the group picks supports it
+        if all(
+            a.rebalance_protocol == assignor.RebalanceProtocol.COOPERATIVE
+            for a in self.assignors
+        ):
+            return assignor.RebalanceProtocol.COOPERATIVE
+        return assignor.RebalanceProtocol.EAGER
+
+    def _split_commit(
+        self, offsets: dict[tuple[str, int], int]
+    ) -> list[dict[tuple[str, int], int]]:
+        empty_size = len(
+            broker.OffsetCommit.model_construct(
+                group_id=self.group_id, topics=[]
+            ).serialized
+        )
+        chunks: list[dict[tuple[str, int], int]] = [{}]
+        size = empty_size
+        for (topic, partition), offset in offsets.items():
+            entry_size = (
+                len(
+                    broker.TopicOffset(
+                        topic=topic, partition=partition, offset=offset
+                    ).model_dump_json()
+                )
+                + 1
+            )
+            # one request covers every partition unless it outgrows a frame
+            if chunks[-1] and size + entry_size > constants.PAYLOAD_SIZE_LIMIT:
+                chunks.append({})
+                size = empty_size
+            chunks[-1][(topic, partition)] = offset
+            size += entry_size
+        return chunks
+
+    async def commit_async(
+        self, offsets: dict[tuple[str, int], int]
+    ) -> list[asyncio.Future[bytes]]:
+        offsets = {
+            tp: offset
+            for tp, offset in offsets.items()
+            if self.committed.get(tp) != offset
+        }
+        if not offsets:
+            return []
+        self.committed |= offsets
+        futures = []
+        for chunk in self._split_commit(offsets):
+            correlation_id = self.correlation_id_factory()
+            msg = message.Message.offset_commit(
+                correlation_id=correlation_id,
+                payload=broker.OffsetCommit(
+                    group_id=self.group_id,
+                    topics=[
+                        broker.TopicOffset(
+                            topic=topic, partition=partition, offset=offset
+                        )
+                        for (topic, partition), offset in chunk.items()
+                    ],
+                ).serialized,
+            )
+            future = asyncio.Future()
+            self.dispatcher.link(correlation_id=correlation_id, future=future)
+            self._pending_commits.add(future)
+            future.add_done_callback(functools.partial(self._complete, chunk))
+            futures.append(future)
+            await self.conn.send(msg.serialized)
+        return futures
+
+    def _complete(
+        self, offsets: dict[tuple[str, int], int], future: asyncio.Future[bytes]
+    ) -> None:
+        self._pending_commits.discard(future)
+        if future.cancelled() or future.exception() is not None:
+            failed = list(offsets)
+        else:
+            response = broker.OffsetCommitResponse.deserialize(future.result())
+            failed = [
+                (result.topic, result.partition)
+                for result in response.topics
+                if result.error_code != 0
+            ]
+        for tp in failed:
+            # forget the offset so the next commit sends it again
+            if self.committed.get(tp) == offsets[tp]:
+                del self.committed[tp]
+
+    async def commit(self, offsets: dict[tuple[str, int], int]) -> None:
+        await self.commit_async(offsets)
+        # earlier async commits may carry offsets this call skipped as unchanged
+        pending = list(self._pending_commits)
+        if not pending:
+            return
+        results = await asyncio.gather(*pending, return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+            for partition_result in broker.OffsetCommitResponse.deserialize(
+                result
+            ).topics:
+                if partition_result.error_code != 0:
+                    raise from_error_code(
+                        partition_result.error_code,
+                        f"Offset commit for {partition_result.topic}-"
+                        f"{partition_result.partition} failed with error code "
+                        f"{partition_result.error_code}: "
+                        f"{partition_result.error_message}",
+                    )
+
+    def _split_fetch(
+        self, partitions: list[tuple[str, int]]
+    ) -> list[list[tuple[str, int]]]:
+        # responses outgrow their requests, so chunks are sized by the response
+        empty_size = max(
+            len(
+                broker.OffsetFetch.model_construct(
+                    group_id=self.group_id, partitions=[]
+                ).serialized
+            ),
+            len(json.dumps({"topics": [], "error_code": 0, "error_message": None})),
+        )
+        chunks: list[list[tuple[str, int]]] = [[]]
+        size = empty_size
+        for topic, partition in partitions:
+            entry_size = (
+                len(
+                    json.dumps(
+                        {"topic": topic, "partition": partition, "offset": sys.maxsize}
+                    )
+                )
+                + 2
+            )
+            if chunks[-1] and size + entry_size > constants.PAYLOAD_SIZE_LIMIT:
+                chunks.append([])
+                size = empty_size
+            chunks[-1].append((topic, partition))
+            size += entry_size
+        return chunks
+
+    async def fetch_committed(
+        self, partitions: list[tuple[str, int]]
+    ) -> dict[tuple[str, int], int]:
+        futures = []
+        for chunk in self._split_fetch(partitions):
+            correlation_id = self.correlation_id_factory()
+            msg = message.Message.offset_fetch(
+                correlation_id=correlation_id,
+                payload=broker.OffsetFetch(
+                    group_id=self.group_id,
+                    partitions=[
+                        broker.TopicPartition(topic=topic, partition=partition)
+                        for topic, partition in chunk
+                    ],
+                ).serialized,
+            )
+            future = asyncio.Future()
+            self.dispatcher.link(correlation_id=correlation_id, future=future)
+            futures.append(future)
+            await self.conn.send(msg.serialized)
+        committed = {}
+        for result in await asyncio.gather(*futures):
+            response = broker.OffsetFetchResponse.deserialize(result)
+            if response.error_code != 0:
+                raise from_error_code(
+                    response.error_code,
+                    f"Offset fetch for group {self.group_id} failed with error code "
+                    f"{response.error_code}: {response.error_message}",
+                )
+            for partition_offset in response.topics:
+                if partition_offset.offset != constants.NO_COMMITTED_OFFSET:
+                    committed[(partition_offset.topic, partition_offset.partition)] = (
+                        partition_offset.offset
+                    )
+        # the stored offsets supersede whatever an earlier owner left behind,
+        # and aren't committed again until the position moves
+        self.committed |= committed
+        return committed
+
+    async def _request(
+        self, build: Callable[[int, bytes], message.Message], payload: bytes
+    ) -> bytes:
+        correlation_id = self.correlation_id_factory()
+        future = asyncio.Future()
+        self.dispatcher.link(correlation_id=correlation_id, future=future)
+        await self.conn.send(build(correlation_id, payload).serialized)
+        return await future
+
+    def _raise_for_error(self, error_code: int, error_message: str | None) -> None:
+        if error_code == 0:
+            return
+        if error_code == 25:
+            self.member_id = None
+            self.generation_id = constants.NO_GENERATION_ID
+        raise from_error_code(
+            error_code,
+            f"Group {self.group_id} request failed with error code {error_code}: "
+            f"{error_message}",
+        )
+
+    async def _join_group(
+        self, topics: list[str], owned_partitions: list[tuple[str, int]]
+    ) -> broker.JoinGroupResponse:
+        while True:
+            response = broker.JoinGroupResponse.deserialize(
+                await self._request(
+                    message.Message.join_group,
+                    broker.JoinGroup(
+                        group_id=self.group_id,
+                        member_id=self.member_id,
+                        session_timeout_ms=self.session_timeout_ms,
+                        topics=topics,
+                        assignors=[a.name for a in self.assignors],
+                        owned_partitions=[
+                            broker.TopicPartition(topic=topic, partition=partition)
+                            for topic, partition in owned_partitions
+                        ],
+                    ).serialized,
+                )
+            )
+            try:
+                self._raise_for_error(response.error_code, response.error_message)
+            except RebalanceInProgressError:
+                # joined, but other members have yet to rejoin the generation
+                self.member_id = response.member_id
+                await asyncio.sleep(self.retry_backoff_ms / 1000)
+                continue
+            except UnknownMemberIdError:
+                continue
+            self.member_id = response.member_id
+            self.generation_id = response.generation_id
+            return response
+
+    async def _partition_counts(self, topics: list[str]) -> dict[str, int]:
+        response = broker.MetadataResponse.deserialize(
+            await self._request(
+                message.Message.metadata, broker.Metadata(topics=topics).serialized
+            )
+        )
+        self._raise_for_error(response.error_code, response.error_message)
+        return {topic.name: topic.num_partitions for topic in response.topics}
+
+    async def _assign_partitions(
+        self, response: broker.JoinGroupResponse
+    ) -> dict[str, list[tuple[str, int]]]:
+        partition_assignor = next(
+            a for a in self.assignors if a.name == response.assignor
+        )
+        subscriptions = {member.member_id: member.topics for member in response.members}
+        partition_counts = await self._partition_counts(
+            sorted({topic for topics in subscriptions.values() for topic in topics})
+        )
+        return partition_assignor.assign(
+            partition_counts,
+            subscriptions,
+            {
+                member.member_id: [
+                    (tp.topic, tp.partition) for tp in member.owned_partitions
+                ]
+                for member in response.members
+            },
+        )
+
+    async def _sync_group(
+        self, assignments: dict[str, list[tuple[str, int]]]
+    ) -> list[tuple[str, int]]:
+        while True:
+            response = broker.SyncGroupResponse.deserialize(
+                await self._request(
+                    message.Message.sync_group,
+                    broker.SyncGroup(
+                        group_id=self.group_id,
+                        generation_id=self.generation_id,
+                        member_id=self.member_id,
+                        assignments=[
+                            broker.MemberAssignment(
+                                member_id=member_id,
+                                partitions=[
+                                    broker.TopicPartition(
+                                        topic=topic, partition=partition
+                                    )
+                                    for topic, partition in partitions
+                                ],
+                            )
+                            for member_id, partitions in assignments.items()
+                        ],
+                    ).serialized,
+                )
+            )
+            self._raise_for_error(response.error_code, response.error_message)
+            if response.partitions is not None:
+                return [(tp.topic, tp.partition) for tp in response.partitions]
+            # the leader hasn't sent the assignment yet
+            await asyncio.sleep(self.retry_backoff_ms / 1000)
+
+    async def ensure_active_group(
+        self, topics: list[str], owned_partitions: list[tuple[str, int]]
+    ) -> list[tuple[str, int]]:
+        while True:
+            response = await self._join_group(topics, owned_partitions)
+            assignments = (
+                await self._assign_partitions(response)
+                if response.member_id == response.leader_id
+                else {}
+            )
+            try:
+                return await self._sync_group(assignments)
+            except (
+                RebalanceInProgressError,
+                IllegalGenerationError,
+                UnknownMemberIdError,
+            ):
+                # the group moved on while syncing; join the next generation
+                continue
+
+    async def heartbeat(self) -> None:
+        response = broker.HeartbeatResponse.deserialize(
+            await self._request(
+                message.Message.heartbeat,
+                broker.Heartbeat(
+                    group_id=self.group_id,
+                    generation_id=self.generation_id,
+                    member_id=self.member_id,
+                ).serialized,
+            )
+        )
+        self._raise_for_error(response.error_code, response.error_message)
+
+    async def leave_group(self) -> None:
+        if self.member_id is None:
+            return
+        member_id = self.member_id
+        self.member_id = None
+        self.generation_id = constants.NO_GENERATION_ID
+        response = broker.LeaveGroupResponse.deserialize(
+            await self._request(
+                message.Message.leave_group,
+                broker.LeaveGroup(
+                    group_id=self.group_id, member_id=member_id
+                ).serialized,
+            )
+        )
+        self._raise_for_error(response.error_code, response.error_message)
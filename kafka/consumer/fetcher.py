@@ -0,0 +1,180 @@
+import asyncio
+import collections
+import functools
+import time
+from collections.abc import Callable
+
+from kafka import broker, connection, dispatcher, message
+from kafka.error import KafkaError, from_error_code
+
+
+class PartitionState:
+    def __init__(self, position: int):
+        self.position = position
+        self.fetch_offset = position
+        self.records: collections.deque[broker.LazyFetchedRecord] = collections.deque()
+        self.buffered_bytes = 0
+        self.in_flight = False
+        self.idle_until = 0.0
+        self.error: KafkaError | None = None
+        # bumped on seek so responses to fetches sent before it are dropped
+        self.epoch = 0
+
+    def reset(self, position: int) -> None:
+        self.position = position
+        self.fetch_offset = position
+        self.records.clear()
+        self.buffered_bytes = 0
+        self.idle_until = 0.0
+        self.error = None
+        self.epoch += 1
+
+
+class Fetcher:
+    def __init__(
+        self,
+        conn: connection.BrokerConnection,
+        correlation_id_factory: Callable[[], int],
+        response_dispatcher: dispatcher.ResponseDispatcher,
+        max_partition_fetch_bytes: int = 4 * 1024,
+        fetch_min_bytes: int = 1,
+        fetch_max_wait_ms: int = 500,
+        on_fetch: Callable[[], None] | None = None,
+    ):
+        self.conn = conn
+        self.correlation_id_factory = correlation_id_factory
+        self.dispatcher = response_dispatcher
+        self.max_partition_fetch_bytes = max_partition_fetch_bytes
+        self.fetch_min_bytes = fetch_min_bytes
+        self.fetch_max_wait_ms = fetch_max_wait_ms
+        self.on_fetch = on_fetch
+        self.partitions: dict[tuple[str, int], PartitionState] = {}
+        self._drain_start = 0
+
+    def assign(self, positions: dict[tuple[str, int], int]) -> None:
+        self.partitions = {
+            tp: self.partitions[tp]
+            if tp in self.partitions and self.partitions[tp].position == position
+            else PartitionState(position)
+            for tp, position in positions.items()
+        }
+
+    def seek(self, tp: tuple[str, int], offset: int) -> None:
+        self.partitions[tp].reset(offset)
+
+    def _is_fetchable(self, state: PartitionState, now: float) -> bool:
+        # prefetch while less than one fetch worth of records is buffered
+        return (
+            not state.in_flight
+            and state.buffered_bytes < self.max_partition_fetch_bytes
+            and state.idle_until <= now
+        )
+
+    async def send_fetches(self) -> None:
+        now = time.monotonic()
+        for tp, state in self.partitions.items():
+            if not self._is_fetchable(state, now):
+                continue
+            correlation_id = self.correlation_id_factory()
+            msg = message.Message.fetch(
+                correlation_id=correlation_id,
+                payload=broker.Fetch(
+                    topic=tp[0],
+                    partition=tp[1],
+                    offset=state.fetch_offset,
+                    max_bytes=self.max_partition_fetch_bytes,
+                ).serialized,
+            )
+            future = asyncio.Future()
+            self.dispatcher.link(correlation_id=correlation_id, future=future)
+            state.in_flight = True
+            future.add_done_callback(
+                functools.partial(self._complete, tp, state, state.epoch)
+            )
+            await self.conn.send(msg.serialized)
+
+    def next_fetch_delay(self) -> float | None:
+        now = time.monotonic()
+        delays = [
+            max(state.idle_until - now, 0)
+            for state in self.partitions.values()
+            if not state.in_flight
+            and state.buffered_bytes < self.max_partition_fetch_bytes
+        ]
+        return min(delays, default=None)
+
+    def _complete(
+        self,
+        tp: tuple[str, int],
+        state: PartitionState,
+        epoch: int,
+        future: asyncio.Future[bytes],
+    ) -> None:
+        state.in_flight = False
+        if self.partitions.get(tp) is not state or state.epoch != epoch:
+            return
+        if future.cancelled():
+            return
+        if (exc := future.exception()) is not None:
+            state.error = exc
+            state.idle_until = time.monotonic() + self.fetch_max_wait_ms / 1000
+        else:
+            self._handle_response(
+                state, broker.LazyFetchResponse.deserialize(future.result())
+            )
+        if self.on_fetch is not None:
+            self.on_fetch()
+
+    def _handle_response(
+        self, state: PartitionState, response: broker.LazyFetchResponse
+    ) -> None:
+        if response.error_code != 0:
+            state.error = from_error_code(
+                response.error_code,
+                f"Fetch from {response.topic}-{response.partition} failed "
+                f"with error code {response.error_code}: {response.error_message}",
+            )
+            state.idle_until = time.monotonic() + self.fetch_max_wait_ms / 1000
+            return
+        fetched_bytes = 0
+        for rec in response.records:
+            if rec.offset < state.fetch_offset:
+                continue
+            state.records.append(rec)
+            fetched_bytes += rec.size
+            state.fetch_offset = rec.offset + 1
+        state.buffered_bytes += fetched_bytes
+        if fetched_bytes < self.fetch_min_bytes:
+            # close to the log end; wait for more data instead of spinning
+            state.idle_until = time.monotonic() + self.fetch_max_wait_ms / 1000
+
+    @property
+    def has_buffered_records(self) -> bool:
+        return any(
+            state.records or state.error is not None
+            for state in self.partitions.values()
+        )
+
+    def drain(
+        self, max_records: int
+    ) -> list[tuple[tuple[str, int], broker.LazyFetchedRecord]]:
+        drained = []
+        tps = list(self.partitions)
+        # rotate the starting partition so a small max_records can't starve any
+        for idx in range(len(tps)):
+            tp = tps[(self._drain_start + idx) % len(tps)]
+            state = self.partitions[tp]
+            if state.error is not None:
+                if drained:
+                    break
+                error, state.error = state.error, None
+                raise error
+            while state.records and len(drained) < max_records:
+                rec = state.records.popleft()
+                state.buffered_bytes -= rec.size
+                state.position = rec.offset + 1
+                drained.append((tp, rec))
+            if len(drained) >= max_records:
+                break
+        self._drain_start += 1
+        return drained
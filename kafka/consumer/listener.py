@@ -0,0 +1,11 @@
+from typing import Protocol
+
+
+class ConsumerRebalanceListener(Protocol):
+    async def on_partitions_revoked(self, partitions: list[tuple[str, int]]) -> None:
+        """리밸런스로 파티션을 반납하기 직전에 호출된다."""
+        pass
+
+    async def on_partitions_assigned(self, partitions: list[tuple[str, int]]) -> None:
+        """리밸런스로 새 파티션을 할당받은 직후에 호출된다."""
+        pass
@@ -0,0 +1,185 @@
+import asyncio
+import collections
+import concurrent.futures
+import contextlib
+import enum
+import functools
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+from kafka import record
+from kafka.consumer import client
+from kafka.error import KafkaError
+
+
+class ProcessingOrder(enum.StrEnum):
+    # records of a partition are handled one at a time, in offset order
+    PARTITION = "partition"
+    # records sharing a key are handled in order; other keys run in parallel
+    KEY = "key"
+
+
+class OffsetTracker:
+    def __init__(self):
+        self._in_flight: collections.deque[int] = collections.deque()
+        self._completed: set[int] = set()
+        # the offset after the highest contiguously completed record
+        self.committable: int | None = None
+
+    def track(self, offset: int) -> None:
+        self._in_flight.append(offset)
+
+    def complete(self, offset: int) -> None:
+        self._completed.add(offset)
+        while self._in_flight and self._in_flight[0] in self._completed:
+            done = self._in_flight.popleft()
+            self._completed.discard(done)
+            self.committable = done + 1
+
+
+class ParallelConsumer:
+    def __init__(
+        self,
+        consumer: client.KafkaConsumer,
+        handler: Callable[[record.ConsumerRecord], Awaitable[Any] | Any],
+        ordering: ProcessingOrder = ProcessingOrder.PARTITION,
+        executor: concurrent.futures.Executor | None = None,
+        max_in_flight: int = 1000,
+        commit_interval_ms: int = 5 * 1000,
+        poll_timeout_ms: int = 100,
+    ):
+        if consumer.enable_auto_commit:
+            raise ValueError(
+                "enable_auto_commit must be disabled; offsets are committed as "
+                "records complete"
+            )
+        self.consumer = consumer
+        # a coroutine function, or a plain function run on the executor
+        self.handler = handler
+        self.ordering = ordering
+        self.executor = executor
+        self.max_in_flight = max_in_flight
+        self.commit_interval_ms = commit_interval_ms
+        self.poll_timeout_ms = poll_timeout_ms
+        self._trackers: dict[tuple[str, int], OffsetTracker] = {}
+        # the last dispatched task of each ordering key
+        self._tails: dict[Hashable, asyncio.Task] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._error: BaseException | None = None
+        self._loop_task: asyncio.Task | None = None
+
+    def subscribe(self, topics: list[str]) -> None:
+        self.consumer.subscribe(topics, rebalance_listener=self)
+
+    def _ordering_key(self, rec: record.ConsumerRecord) -> Hashable:
+        if self.ordering == ProcessingOrder.KEY:
+            return rec.topic, rec.partition, rec.key
+        return rec.topic, rec.partition
+
+    async def _process(
+        self, predecessor: asyncio.Task | None, rec: record.ConsumerRecord
+    ) -> None:
+        if predecessor is not None:
+            # a failed predecessor fails its successors, keeping the order
+            await predecessor
+        if self.executor is not None:
+            await asyncio.get_running_loop().run_in_executor(
+                self.executor, self.handler, rec
+            )
+        else:
+            await self.handler(rec)
+        if (tracker := self._trackers.get((rec.topic, rec.partition))) is not None:
+            tracker.complete(rec.offset)
+
+    def _on_done(self, key: Hashable, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if self._tails.get(key) is task:
+            del self._tails[key]
+        self._slots.release()
+        if not task.cancelled() and self._error is None:
+            self._error = task.exception()
+
+    def _dispatch(self, rec: record.ConsumerRecord) -> None:
+        tp = (rec.topic, rec.partition)
+        self._trackers.setdefault(tp, OffsetTracker()).track(rec.offset)
+        key = self._ordering_key(rec)
+        task = asyncio.create_task(self._process(self._tails.get(key), rec))
+        self._tails[key] = task
+        self._tasks.add(task)
+        task.add_done_callback(functools.partial(self._on_done, key))
+
+    def committable(self) -> dict[tuple[str, int], int]:
+        return {
+            tp: tracker.committable
+            for tp, tracker in self._trackers.items()
+            if tracker.committable is not None
+        }
+
+    async def _commit(self, offsets: dict[tuple[str, int], int]) -> None:
+        if self.consumer.group_id is None or not offsets:
+            return
+        # a failed commit is retried with the next interval's offsets
+        with contextlib.suppress(KafkaError):
+            await self.consumer.commit(offsets)
+
+    async def _commit_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.commit_interval_ms / 1000)
+            await self._commit(self.committable())
+
+    async def run(self) -> None:
+        commit_task = asyncio.create_task(self._commit_loop())
+        try:
+            while True:
+                if self._error is not None:
+                    raise self._error
+                records = await self.consumer.poll(
+                    timeout_ms=self.poll_timeout_ms, max_records=self.max_in_flight
+                )
+                for rec in records:
+                    # records of a partition revoked since the poll aren't ours
+                    if (rec.topic, rec.partition) not in self.consumer.assignment():
+                        continue
+                    await self._slots.acquire()
+                    self._dispatch(rec)
+        finally:
+            commit_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await commit_task
+
+    def run_loop(self) -> asyncio.Task:
+        self._loop_task = asyncio.create_task(self.run())
+        return self._loop_task
+
+    async def on_partitions_revoked(self, partitions: list[tuple[str, int]]) -> None:
+        # finish what was dispatched so the next owner resumes after it
+        await asyncio.gather(
+            *(
+                task
+                for key, task in list(self._tails.items())
+                if (key[0], key[1]) in partitions
+            ),
+            return_exceptions=True,
+        )
+        await self._commit(
+            {
+                tp: offset
+                for tp, offset in self.committable().items()
+                if tp in partitions
+            }
+        )
+        for tp in partitions:
+            self._trackers.pop(tp, None)
+
+    async def on_partitions_assigned(self, partitions: list[tuple[str, int]]) -> None:
+        pass
+
+    async def close(self) -> None:
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError, Exception):
+                await self._loop_task
+            self._loop_task = None
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self._commit(self.committable())
@@ -1,7 +1,7 @@
 import asyncio
 
 from kafka import connection, parser, broker, record
-from kafka.error import InvalidCorrelationIdError
+from kafka.error import InvalidCorrelationIdError, from_error_code
 
 
 class ResponseDispatcher:
@@ -22,7 +22,9 @@ class ResponseDispatcher:
                 f"Received response with unknown correlation ID: {correlation_id}"
             )
         future = self._pending_requests.pop(correlation_id)
-        future.set_result(resp.payload)
+        # the requester may have been cancelled while awaiting the response
+        if not future.done():
+            future.set_result(resp.payload)
 
     def link(self, correlation_id: int, future: asyncio.Future[bytes]) -> None:
         if correlation_id in self._pending_requests:
@@ -36,6 +38,8 @@ class ProduceDispatcher(ResponseDispatcher):
         self._pending_requests: dict[
             int, list[asyncio.Future[record.RecordMetadata]]
         ] = {}
+        self._pending_responses: dict[int, asyncio.Future[bytes]] = {}
+        self._abandoned: set[int] = set()
 
     async def dispatch(self) -> None:
         response_parser = parser.MessageParser(self.conn)
@@ -45,13 +49,36 @@ class ProduceDispatcher(ResponseDispatcher):
                 "Connection closed or no data received"
             )
         correlation_id = resp.headers.correlation_id
+        if correlation_id in self._abandoned:
+            self._abandoned.discard(correlation_id)
+            return
+        if correlation_id in self._pending_responses:
+            future = self._pending_responses.pop(correlation_id)
+            # the requester may have been cancelled while awaiting the response
+            if not future.done():
+                future.set_result(resp.payload)
+            return
         if correlation_id not in self._pending_requests:
             raise InvalidCorrelationIdError(
                 f"Received response with unknown correlation ID: {correlation_id}"
             )
         futures = self._pending_requests.pop(correlation_id)
         response = broker.ProduceResponse.deserialize(resp.payload)
+        if response.error_code != 0:
+            for future in futures:
+                if future.done():
+                    continue
+                future.set_exception(
+                    from_error_code(
+                        response.error_code,
+                        f"Produce to {response.topic}-{response.partition} failed "
+                        f"with error code {response.error_code}: {response.error_message}",
+                    )
+                )
+            return
         for idx, future in enumerate(futures):
+            if future.done():
+                continue
             future.set_result(
                 record.RecordMetadata(
                     topic=response.topic,
@@ -64,6 +91,22 @@ class ProduceDispatcher(ResponseDispatcher):
     def link(
         self, correlation_id: int, futures: list[asyncio.Future[record.RecordMetadata]]
     ) -> None:
-        if correlation_id in self._pending_requests:
+        if (
+            correlation_id in self._pending_requests
+            or correlation_id in self._pending_responses
+        ):
             raise InvalidCorrelationIdError("already linked correlation id")
         self._pending_requests[correlation_id] = futures
+
+    def link_response(self, correlation_id: int, future: asyncio.Future[bytes]) -> None:
+        if (
+            correlation_id in self._pending_requests
+            or correlation_id in self._pending_responses
+        ):
+            raise InvalidCorrelationIdError("already linked correlation id")
+        self._pending_responses[correlation_id] = future
+
+    def unlink(self, correlation_id: int) -> None:
+        self._pending_requests.pop(correlation_id, None)
+        self._pending_responses.pop(correlation_id, None)
+        self._abandoned.add(correlation_id)
@@ -34,6 +34,18 @@ class PartitionNotFoundError(NonRetriableError):
     pass
 
 
+class RecordTooLargeError(NonRetriableError):
+    """레코드가 배치 크기 제한을 초과하는 경우 발생하는 예외"""
+
+    pass
+
+
+class InvalidRecordError(NonRetriableError):
+    """압축 배치를 풀 수 없거나 레코드 수가 맞지 않는 경우 발생하는 예외"""
+
+    pass
+
+
 class InvalidOffsetError(NonRetriableError):
     """잘못된 오프셋에 대한 예외"""
 
@@ -62,3 +74,77 @@ class InvalidCorrelationIdError(NonRetriableError):
     """잘못된 상관 관계 ID에 대한 예외"""
 
     pass
+
+
+class RequestTimedOutError(RetriableError):
+    """요청에 대한 응답이 제한 시간 안에 도착하지 않은 경우 발생하는 예외"""
+
+    pass
+
+
+class KafkaStorageError(RetriableError):
+    """브로커의 로그 저장소 입출력이 실패한 경우 발생하는 예외"""
+
+    pass
+
+
+class BufferExhaustedError(RetriableError):
+    """프로듀서 버퍼 메모리를 제한 시간 안에 할당받지 못한 경우 발생하는 예외"""
+
+    pass
+
+
+class OutOfOrderSequenceError(RetriableError):
+    """프로듀서 배치의 시퀀스 번호가 기대한 값과 다른 경우 발생하는 예외"""
+
+    pass
+
+
+class InvalidProducerEpochError(NonRetriableError):
+    """더 새로운 에포크의 프로듀서에 의해 밀려난 경우 발생하는 예외"""
+
+    pass
+
+
+class IllegalGenerationError(NonRetriableError):
+    """컨슈머 그룹의 현재 세대와 다른 세대로 요청한 경우 발생하는 예외"""
+
+    pass
+
+
+class InconsistentGroupProtocolError(NonRetriableError):
+    """그룹의 다른 멤버들과 공통으로 지원하는 할당 전략이 없는 경우 발생하는 예외"""
+
+    pass
+
+
+class UnknownMemberIdError(NonRetriableError):
+    """컨슈머 그룹에 존재하지 않는 멤버 ID로 요청한 경우 발생하는 예외"""
+
+    pass
+
+
+class RebalanceInProgressError(RetriableError):
+    """컨슈머 그룹이 리밸런스 중이라 다시 참여해야 하는 경우 발생하는 예외"""
+
+    pass
+
+
+ERROR_CODES: dict[int, type[KafkaError]] = {
+    10: InvalidAdminCommandError,
+    11: PartitionNotFoundError,
+    20: InvalidOffsetError,
+    21: PartitionNotFoundError,
+    22: IllegalGenerationError,
+    23: InconsistentGroupProtocolError,
+    25: UnknownMemberIdError,
+    27: RebalanceInProgressError,
+    45: OutOfOrderSequenceError,
+    47: InvalidProducerEpochError,
+    56: KafkaStorageError,
+    87: InvalidRecordError,
+}
+
+
+def from_error_code(error_code: int, message: str) -> KafkaError:
+    return ERROR_CODES.get(error_code, NonRetriableError)(message)
@@ -14,6 +14,13 @@ class MessageType(enum.IntEnum):
     FETCH = 2
     OFFSET_COMMIT = 3
     LIST_TOPICS = 4
+    METADATA = 5
+    INIT_PRODUCER_ID = 6
+    OFFSET_FETCH = 7
+    JOIN_GROUP = 8
+    SYNC_GROUP = 9
+    HEARTBEAT = 10
+    LEAVE_GROUP = 11
 
 
 class MessageHeaders(BaseModel):
@@ -41,6 +48,69 @@ class MessageHeaders(BaseModel):
             api_key=MessageType.PRODUCE,
         )
 
+    @classmethod
+    def fetch(cls, correlation_id: int) -> Self:
+        return cls(
+            correlation_id=correlation_id,
+            api_key=MessageType.FETCH,
+        )
+
+    @classmethod
+    def offset_commit(cls, correlation_id: int) -> Self:
+        return cls(
+            correlation_id=correlation_id,
+            api_key=MessageType.OFFSET_COMMIT,
+        )
+
+    @classmethod
+    def offset_fetch(cls, correlation_id: int) -> Self:
+        return cls(
+            correlation_id=correlation_id,
+            api_key=MessageType.OFFSET_FETCH,
+        )
+
+    @classmethod
+    def join_group(cls, correlation_id: int) -> Self:
+        return cls(
+            correlation_id=correlation_id,
+            api_key=MessageType.JOIN_GROUP,
+        )
+
+    @classmethod
+    def sync_group(cls, correlation_id: int) -> Self:
+        return cls(
+            correlation_id=correlation_id,
+            api_key=MessageType.SYNC_GROUP,
+        )
+
+    @classmethod
+    def heartbeat(cls, correlation_id: int) -> Self:
+        return cls(
+            correlation_id=correlation_id,
+            api_key=MessageType.HEARTBEAT,
+        )
+
+    @classmethod
+    def leave_group(cls, correlation_id: int) -> Self:
+        return cls(
+            correlation_id=correlation_id,
+            api_key=MessageType.LEAVE_GROUP,
+        )
+
+    @classmethod
+    def metadata(cls, correlation_id: int) -> Self:
+        return cls(
+            correlation_id=correlation_id,
+            api_key=MessageType.METADATA,
+        )
+
+    @classmethod
+    def init_producer_id(cls, correlation_id: int) -> Self:
+        return cls(
+            correlation_id=correlation_id,
+            api_key=MessageType.INIT_PRODUCER_ID,
+        )
+
 
 class Message(BaseModel):
     headers: MessageHeaders
@@ -98,3 +168,48 @@ class Message(BaseModel):
     def produce(cls, correlation_id: int, payload: bytes) -> Self:
         headers = MessageHeaders.produce(correlation_id)
         return cls(headers=headers, payload=payload)
+
+    @classmethod
+    def fetch(cls, correlation_id: int, payload: bytes) -> Self:
+        headers = MessageHeaders.fetch(correlation_id)
+        return cls(headers=headers, payload=payload)
+
+    @classmethod
+    def offset_commit(cls, correlation_id: int, payload: bytes) -> Self:
+        headers = MessageHeaders.offset_commit(correlation_id)
+        return cls(headers=headers, payload=payload)
+
+    @classmethod
+    def offset_fetch(cls, correlation_id: int, payload: bytes) -> Self:
+        headers = MessageHeaders.offset_fetch(correlation_id)
+        return cls(headers=headers, payload=payload)
+
+    @classmethod
+    def join_group(cls, correlation_id: int, payload: bytes) -> Self:
+        headers = MessageHeaders.join_group(correlation_id)
+        return cls(headers=headers, payload=payload)
+
+    @classmethod
+    def sync_group(cls, correlation_id: int, payload: bytes) -> Self:
+        headers = MessageHeaders.sync_group(correlation_id)
+        return cls(headers=headers, payload=payload)
+
+    @classmethod
+    def heartbeat(cls, correlation_id: int, payload: bytes) -> Self:
+        headers = MessageHeaders.heartbeat(correlation_id)
+        return cls(headers=headers, payload=payload)
+
+    @classmethod
+    def leave_group(cls, correlation_id: int, payload: bytes) -> Self:
+        headers = MessageHeaders.leave_group(correlation_id)
+        return cls(headers=headers, payload=payload)
+
+    @classmethod
+    def metadata(cls, correlation_id: int, payload: bytes) -> Self:
+        headers = MessageHeaders.metadata(correlation_id)
+        return cls(headers=headers, payload=payload)
+
+    @classmethod
+    def init_producer_id(cls, correlation_id: int) -> Self:
+        headers = MessageHeaders.init_producer_id(correlation_id)
+        return cls(headers=headers, payload=b"")
@@ -0,0 +1,23 @@
+import time
+
+from kafka import broker
+
+
+class ClusterMetadata:
+    def __init__(self, max_age_ms: int):
+        self.max_age_ms = max_age_ms
+        self.partition_counts: dict[str, int] = {}
+        self._updated_at: dict[str, float] = {}
+
+    def partitions_for(self, topic: str) -> int | None:
+        if (updated_at := self._updated_at.get(topic)) is None:
+            return None
+        if (time.monotonic() - updated_at) * 1000 >= self.max_age_ms:
+            return None
+        return self.partition_counts.get(topic)
+
+    def update(self, response: broker.MetadataResponse) -> None:
+        now = time.monotonic()
+        for topic in response.topics:
+            self.partition_counts[topic.name] = topic.num_partitions
+            self._updated_at[topic.name] = now
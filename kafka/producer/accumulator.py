@@ -1,53 +1,218 @@
 import asyncio
+import bisect
+import collections
+import time
+from typing import NamedTuple
 
-from kafka import record, broker
+from kafka import broker, constants, record
+from kafka.error import RecordTooLargeError
+from kafka.producer.batch import ProducerBatch
+from kafka.producer.buffer import BufferPool
+
+
+class AppendResult(NamedTuple):
+    batch_is_full: bool
+    new_batch_created: bool
+    abort_for_new_batch: bool = False
 
 
 class RecordAccumulator:
-    def __init__(self):
-        self.records: dict[
-            tuple[str, int],
-            list[tuple[broker.RecordContents, asyncio.Future[record.RecordMetadata]]],
-        ] = {}
-
-    def ready_batches(
-        self, size: int
-    ) -> list[tuple[broker.Produce, list[asyncio.Future[record.RecordMetadata]]]]:
-        produces = [
-            (
-                broker.Produce(
-                    topic=topic,
-                    partition=partition,
-                    records=[record_contents for record_contents, _ in records],
-                ),
-                [future for _, future in records],
-            )
-            for (topic, partition), records in self.records.items()
+    def __init__(
+        self,
+        batch_size: int,
+        linger_ms: int | None = None,
+        retry_backoff_ms: int = 100,
+        buffer_memory: int = 32 * 1024 * 1024,
+        acks: int = 1,
+    ):
+        self.batch_size = batch_size
+        self.linger_ms = linger_ms
+        self.retry_backoff_ms = retry_backoff_ms
+        self.free = BufferPool(buffer_memory)
+        self.acks = acks
+        self.open_batches: dict[tuple[str, int], ProducerBatch] = {}
+        self.sealed_batches: collections.deque[ProducerBatch] = collections.deque()
+        # a partition with queued retries is muted until they are drained
+        self.retry_batches: dict[tuple[str, int], list[ProducerBatch]] = {}
+        self.producer_id = constants.NO_PRODUCER_ID
+        self.producer_epoch = constants.NO_PRODUCER_EPOCH
+        # a partition's next batch is only created once the previous one is closed,
+        # so its base sequence is known when the batch is created
+        self._next_sequences: dict[tuple[str, int], int] = {}
+        self._flushes_in_progress = 0
+
+    @property
+    def is_empty(self) -> bool:
+        return (
+            not self.open_batches and not self.sealed_batches and not self.retry_batches
+        )
+
+    def begin_flush(self) -> None:
+        self._flushes_in_progress += 1
+
+    def end_flush(self) -> None:
+        self._flushes_in_progress -= 1
+
+    async def allocate(self, max_block_ms: int) -> None:
+        await self.free.allocate(self.batch_size, max_block_ms)
+
+    def deallocate(self) -> None:
+        self.free.deallocate(self.batch_size)
+
+    def _is_expired(self, batch: ProducerBatch, now: float) -> bool:
+        # senders waiting for memory can only proceed once lingering batches are sent
+        if self._flushes_in_progress > 0 or self.free.is_exhausted:
+            return True
+        if self.linger_ms is None:
+            return False
+        return (now - batch.created_at) * 1000 >= self.linger_ms
+
+    def next_ready_delay(self) -> float | None:
+        now = time.monotonic()
+        delays = [
+            max(queue[0].retry_at - now, 0) for queue in self.retry_batches.values()
         ]
-        return [
-            (produce, future)
-            for produce, future in produces
-            if len(produce.serialized) >= size
+        if any(b.key not in self.retry_batches for b in self.sealed_batches):
+            return 0
+        unmuted = [
+            b for b in self.open_batches.values() if b.key not in self.retry_batches
+        ]
+        if unmuted and (self._flushes_in_progress or self.free.is_exhausted):
+            return 0
+        if unmuted and self.linger_ms is not None:
+            elapsed = now - unmuted[0].created_at
+            delays.append(max(self.linger_ms / 1000 - elapsed, 0))
+        return min(delays, default=None)
+
+    def ready_batches(self, limit: int | None = None) -> list[ProducerBatch]:
+        ready: list[ProducerBatch] = []
+        now = time.monotonic()
+
+        def has_room() -> bool:
+            return limit is None or len(ready) < limit
+
+        for key, queue in list(self.retry_batches.items()):
+            while queue and queue[0].retry_at <= now and has_room():
+                ready.append(queue.pop(0))
+            if not queue:
+                del self.retry_batches[key]
+        muted = []
+        while self.sealed_batches and has_room():
+            batch = self.sealed_batches.popleft()
+            if batch.key in self.retry_batches:
+                muted.append(batch)
+            else:
+                ready.append(batch)
+        self.sealed_batches.extendleft(reversed(muted))
+        # open_batches keeps creation order, so the first unexpired batch ends the scan
+        for key, batch in list(self.open_batches.items()):
+            if not has_room() or not self._is_expired(batch, now):
+                break
+            if key in self.retry_batches:
+                continue
+            self._close(batch)
+            ready.append(batch)
+        return ready
+
+    def reenqueue(self, batch: ProducerBatch) -> None:
+        batch.attempts += 1
+        batch.retry_at = time.monotonic() + self.retry_backoff_ms / 1000
+        # keep retries in creation order so a partition's batches go out in order
+        queue = self.retry_batches.setdefault(batch.key, [])
+        bisect.insort(queue, batch, key=lambda b: b.created_at)
+
+    def reset_producer_id(self, producer_id: int, producer_epoch: int) -> None:
+        self.producer_id = producer_id
+        self.producer_epoch = producer_epoch
+        # a new producer id starts again at sequence 0, so every batch that
+        # hasn't been sent yet is renumbered in the order it was created
+        self._next_sequences.clear()
+        closed = [
+            *(batch for queue in self.retry_batches.values() for batch in queue),
+            *self.sealed_batches,
         ]
+        for batch in sorted(closed, key=lambda b: b.created_at):
+            batch.set_producer(
+                producer_id, producer_epoch, self._next_sequences.get(batch.key, 0)
+            )
+            self._next_sequences[batch.key] = batch.base_sequence + batch.record_count
+        for batch in self.open_batches.values():
+            batch.set_producer(
+                producer_id, producer_epoch, self._next_sequences.get(batch.key, 0)
+            )
+
+    def _close(self, batch: ProducerBatch) -> None:
+        del self.open_batches[batch.key]
+        if batch.base_sequence != constants.NO_SEQUENCE:
+            self._next_sequences[batch.key] = batch.base_sequence + batch.record_count
+
+    def _seal(self, batch: ProducerBatch) -> None:
+        self._close(batch)
+        self.sealed_batches.append(batch)
 
     def add(
         self,
         rec: record.ProducerRecord,
         future: asyncio.Future[record.RecordMetadata],
-    ) -> None:
+        abort_on_new_batch: bool = False,
+    ) -> AppendResult:
+        contents = broker.RecordContents(
+            value=rec.value,
+            key=rec.key,
+            timestamp=rec.timestamp,
+            headers=rec.headers,
+        )
+        serialized_record = contents.serialized
         key = (rec.topic, rec.partition)
-        if key not in self.records:
-            self.records[key] = []
-        self.records[key].extend(
-            [
-                (
-                    broker.RecordContents(
-                        value=rec.value,
-                        key=rec.key,
-                        timestamp=rec.timestamp,
-                        headers=rec.headers,
-                    ),
-                    future,
-                )
-            ]
+        batch = self.open_batches.get(key)
+        if batch is not None and batch.size_with(serialized_record) <= self.batch_size:
+            return AppendResult(
+                batch_is_full=self._append(batch, serialized_record, future),
+                new_batch_created=False,
+            )
+        if self.producer_id == constants.NO_PRODUCER_ID:
+            base_sequence = constants.NO_SEQUENCE
+        elif batch is not None and batch.base_sequence != constants.NO_SEQUENCE:
+            # the open batch is only sealed below, so it hasn't advanced the
+            # partition's sequence yet
+            base_sequence = batch.base_sequence + batch.record_count
+        else:
+            base_sequence = self._next_sequences.get(key, 0)
+        new_batch = ProducerBatch(
+            topic=rec.topic,
+            partition=rec.partition,
+            created_at=time.monotonic(),
+            producer_id=self.producer_id,
+            producer_epoch=self.producer_epoch,
+            base_sequence=base_sequence,
+            acks=self.acks,
+        )
+        if new_batch.size_with(serialized_record) > self.batch_size:
+            raise RecordTooLargeError(
+                f"Record of {len(serialized_record)} bytes does not fit "
+                f"in a batch of {self.batch_size} bytes"
+            )
+        if abort_on_new_batch:
+            return AppendResult(
+                batch_is_full=False, new_batch_created=False, abort_for_new_batch=True
+            )
+        if batch is not None:
+            self._seal(batch)
+        self.open_batches[key] = new_batch
+        return AppendResult(
+            batch_is_full=self._append(new_batch, serialized_record, future)
+            or batch is not None,
+            new_batch_created=True,
         )
+
+    def _append(
+        self,
+        batch: ProducerBatch,
+        serialized_record: bytes,
+        future: asyncio.Future[record.RecordMetadata],
+    ) -> bool:
+        batch.append(serialized_record, future)
+        if batch.size >= self.batch_size:
+            self._seal(batch)
+            return True
+        return False
@@ -0,0 +1,129 @@
+import asyncio
+import base64
+import json
+
+from kafka import broker, compression, constants, record
+from kafka.compression import CompressionType
+
+RECORD_SEPARATOR = b", "
+
+
+class ProducerBatch:
+    def __init__(
+        self,
+        topic: str,
+        partition: int,
+        created_at: float,
+        producer_id: int = constants.NO_PRODUCER_ID,
+        producer_epoch: int = constants.NO_PRODUCER_EPOCH,
+        base_sequence: int = constants.NO_SEQUENCE,
+        acks: int = 1,
+    ):
+        self.topic = topic
+        self.partition = partition
+        self.created_at = created_at
+        self.acks = acks
+        self.records: list[bytes] = []
+        self.futures: list[asyncio.Future[record.RecordMetadata]] = []
+        self._header = b""
+        self._prefix = b'"records": ['
+        self.compressed: bytes | None = None
+        self._suffix = b"]}"
+        self.size = len(self._prefix) + len(self._suffix)
+        self.set_producer(producer_id, producer_epoch, base_sequence)
+        self.attempts = 0
+        self.retry_at = 0.0
+
+    def set_producer(
+        self, producer_id: int, producer_epoch: int, base_sequence: int
+    ) -> None:
+        self.producer_id = producer_id
+        self.producer_epoch = producer_epoch
+        self.base_sequence = base_sequence
+        # matches broker.Produce.serialized, which leaves out unset producer fields
+        producer_fields = (
+            f'"producer_id": {producer_id}, "producer_epoch": {producer_epoch}, '
+            f'"base_sequence": {base_sequence}, '
+            if producer_id != constants.NO_PRODUCER_ID
+            else ""
+        ) + (f'"acks": {self.acks}, ' if self.acks != 1 else "")
+        header = (
+            f'{{"topic": {json.dumps(self.topic)}, '
+            f'"partition": {self.partition}, {producer_fields}'
+        ).encode("utf-8")
+        if self.compressed is not None:
+            self.compressed = header + self.compressed[len(self._header) :]
+        self.size += len(header) - len(self._header)
+        self._header = header
+        self._prefix = self._header + b'"records": ['
+
+    @property
+    def key(self) -> tuple[str, int]:
+        return self.topic, self.partition
+
+    @property
+    def record_count(self) -> int:
+        return len(self.records)
+
+    def size_with(self, serialized_record: bytes) -> int:
+        separator_size = len(RECORD_SEPARATOR) if self.records else 0
+        return self.size + separator_size + len(serialized_record)
+
+    def append(
+        self,
+        serialized_record: bytes,
+        future: asyncio.Future[record.RecordMetadata],
+    ) -> None:
+        self.size = self.size_with(serialized_record)
+        self.records.append(serialized_record)
+        self.futures.append(future)
+
+    @property
+    def serialized(self) -> bytes:
+        if self.compressed is not None:
+            return self.compressed
+        return self._prefix + RECORD_SEPARATOR.join(self.records) + self._suffix
+
+    def compress(self, compression_type: CompressionType) -> None:
+        records = b"[" + RECORD_SEPARATOR.join(self.records) + b"]"
+        compressed_records = base64.b64encode(
+            compression.compress(records, compression_type)
+        ).decode("ascii")
+        compressed = self._header + (
+            f'"compression_type": "{compression_type}", '
+            f'"record_count": {self.record_count}, '
+            f'"compressed_records": "{compressed_records}"}}'
+        ).encode("utf-8")
+        # small or incompressible batches are cheaper to send as they are
+        if len(compressed) < self.size:
+            self.compressed = compressed
+
+    def done(self, response: broker.ProduceResponse) -> None:
+        for idx, future in enumerate(self.futures):
+            if not future.done():
+                future.set_result(
+                    record.RecordMetadata(
+                        topic=response.topic,
+                        partition=response.partition,
+                        offset=response.base_offset + idx,
+                        timestamp=response.timestamp,
+                    )
+                )
+
+    def done_without_ack(self) -> None:
+        # offset and append time are unknown when the broker does not acknowledge
+        for future in self.futures:
+            if not future.done():
+                future.set_result(
+                    record.RecordMetadata(
+                        topic=self.topic,
+                        partition=self.partition,
+                        offset=-1,
+                        timestamp=-1,
+                    )
+                )
+
+    def fail(self, exc: Exception) -> None:
+        for future in self.futures:
+            if not future.done():
+                future.set_exception(exc)
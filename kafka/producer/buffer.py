@@ -0,0 +1,53 @@
+import asyncio
+import collections
+
+from kafka.error import BufferExhaustedError
+
+
+class BufferPool:
+    def __init__(self, total_memory: int):
+        self.total_memory = total_memory
+        self.available_memory = total_memory
+        self._waiters: collections.deque[tuple[int, asyncio.Future[None]]] = (
+            collections.deque()
+        )
+
+    @property
+    def is_exhausted(self) -> bool:
+        return bool(self._waiters)
+
+    async def allocate(self, size: int, max_block_ms: int) -> None:
+        if not self._waiters and self.available_memory >= size:
+            self.available_memory -= size
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append((size, waiter))
+        try:
+            await asyncio.wait_for(waiter, timeout=max_block_ms / 1000)
+        except BaseException as exc:
+            if waiter.done() and not waiter.cancelled():
+                # granted just as the caller gave up
+                self.deallocate(size)
+            else:
+                # a waiter leaving the head of the queue may unblock the next one
+                self._waiters.remove((size, waiter))
+                self._grant()
+            if isinstance(exc, TimeoutError):
+                raise BufferExhaustedError(
+                    f"Failed to allocate {size} bytes within {max_block_ms}ms"
+                ) from None
+            raise
+
+    def deallocate(self, size: int) -> None:
+        self.available_memory += size
+        self._grant()
+
+    def _grant(self) -> None:
+        # waiters are served in arrival order so large requests are not starved
+        while self._waiters:
+            size, waiter = self._waiters[0]
+            if self.available_memory < size:
+                break
+            self._waiters.popleft()
+            self.available_memory -= size
+            waiter.set_result(None)
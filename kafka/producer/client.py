@@ -0,0 +1,280 @@
+import asyncio
+import contextlib
+from collections.abc import Callable
+
+from kafka import (
+    broker,
+    connection,
+    constants,
+    dispatcher,
+    message,
+    metadata,
+    record,
+    serialization,
+)
+from kafka.compression import CompressionType
+from kafka.error import PartitionNotFoundError, from_error_code
+from kafka.producer import accumulator, partitioner, sender
+
+
+class KafkaProducer:
+    def __init__(
+        self,
+        broker_host: str,
+        broker_port: int,
+        correlation_id_factory: Callable[[], int],
+        batch_size: int = 8 * 1024,
+        linger_ms: int = 5,
+        record_partitioner: partitioner.Partitioner | None = None,
+        metadata_max_age_ms: int = 5 * 60 * 1000,
+        max_in_flight_requests_per_connection: int = 5,
+        retries: int = 0,
+        retry_backoff_ms: int = 100,
+        request_timeout_ms: int = 30 * 1000,
+        enable_idempotence: bool = False,
+        buffer_memory: int = 32 * 1024 * 1024,
+        max_block_ms: int = 60 * 1000,
+        compression_type: str = CompressionType.NONE,
+        acks: int = 1,
+        key_serializer: serialization.Serializer = serialization.bytes_serializer,
+        value_serializer: serialization.Serializer = serialization.bytes_serializer,
+    ):
+        if not 0 < batch_size <= constants.PAYLOAD_SIZE_LIMIT:
+            raise ValueError(
+                f"batch_size must be between 1 and {constants.PAYLOAD_SIZE_LIMIT} bytes"
+            )
+        if acks not in (-1, 0, 1):
+            raise ValueError("acks must be one of -1, 0 or 1")
+        if enable_idempotence and acks == 0:
+            raise ValueError(
+                "enable_idempotence requires acknowledged produce requests"
+            )
+        if buffer_memory < batch_size:
+            raise ValueError("buffer_memory must be at least batch_size")
+        if max_in_flight_requests_per_connection < 1:
+            raise ValueError("max_in_flight_requests_per_connection must be at least 1")
+        if (
+            enable_idempotence
+            and max_in_flight_requests_per_connection
+            > constants.PRODUCER_STATE_WINDOW_SIZE
+        ):
+            # the broker only remembers this many batches per producer for dedup
+            raise ValueError(
+                "max_in_flight_requests_per_connection must be at most "
+                f"{constants.PRODUCER_STATE_WINDOW_SIZE} with enable_idempotence"
+            )
+        self.broker_host = broker_host
+        self.broker_port = broker_port
+        self.correlation_id_factory = correlation_id_factory
+        self.batch_size = batch_size
+        self.linger_ms = linger_ms
+        self.partitioner = record_partitioner or partitioner.DefaultPartitioner()
+        self.max_in_flight_requests_per_connection = (
+            max_in_flight_requests_per_connection
+        )
+        self.retries = retries
+        self.request_timeout_ms = request_timeout_ms
+        self.enable_idempotence = enable_idempotence
+        self.max_block_ms = max_block_ms
+        self.compression_type = CompressionType(compression_type)
+        self.acks = acks
+        self.key_serializer = key_serializer
+        self.value_serializer = value_serializer
+        self._accumulator = accumulator.RecordAccumulator(
+            batch_size=batch_size,
+            linger_ms=linger_ms,
+            retry_backoff_ms=retry_backoff_ms,
+            buffer_memory=buffer_memory,
+            acks=acks,
+        )
+        self._metadata = metadata.ClusterMetadata(max_age_ms=metadata_max_age_ms)
+        self._metadata_requests: dict[str, asyncio.Task[None]] = {}
+        self._conn: connection.BrokerConnection | None = None
+        self._dispatcher: dispatcher.ProduceDispatcher | None = None
+        self._sender: sender.RequestSender | None = None
+        self._wakeup = asyncio.Event()
+        self._incomplete: set[asyncio.Future[record.RecordMetadata]] = set()
+        self._loop_task: asyncio.Task | None = None
+
+    @property
+    def is_connected(self) -> bool:
+        return (
+            self._conn is not None
+            and self._conn.is_connected
+            and self._dispatcher is not None
+            and self._sender is not None
+        )
+
+    async def loop(self) -> None:
+        try:
+            async with connection.BrokerConnection(
+                self.broker_host, self.broker_port
+            ) as conn:
+                self._conn = conn
+                self._dispatcher = dispatcher.ProduceDispatcher(conn)
+                async with asyncio.TaskGroup() as tg:
+                    tg.create_task(self._dispatch_loop())
+                    if self.enable_idempotence:
+                        await self._init_producer_id()
+                    self._sender = sender.RequestSender(
+                        conn=conn,
+                        correlation_id_factory=self.correlation_id_factory,
+                        response_dispatcher=self._dispatcher,
+                        record_accumulator=self._accumulator,
+                        max_in_flight_requests=self.max_in_flight_requests_per_connection,
+                        retries=self.retries,
+                        request_timeout_ms=self.request_timeout_ms,
+                        on_complete=self._wakeup.set,
+                        compression_type=self.compression_type,
+                        acks=self.acks,
+                    )
+                    tg.create_task(self._send_loop())
+        finally:
+            for future in list(self._incomplete):
+                if not future.done():
+                    future.set_exception(
+                        connection.BrokerConnectionError("Producer loop stopped")
+                    )
+
+    def run_loop(self) -> asyncio.Task:
+        self._loop_task = asyncio.create_task(self.loop())
+        return self._loop_task
+
+    async def _dispatch_loop(self) -> None:
+        while True:
+            await self._dispatcher.dispatch()
+
+    async def _send_loop(self) -> None:
+        while True:
+            if self._sender.needs_producer_id_reset and not self._sender.in_flight:
+                await self._init_producer_id()
+                self._sender.needs_producer_id_reset = False
+            await self._sender.send()
+            # with every slot in flight, only a completed request can make progress
+            timeout = (
+                self._accumulator.next_ready_delay()
+                if self._sender.available_slots
+                else None
+            )
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            self._wakeup.clear()
+
+    async def _request(
+        self, correlation_id: int, msg: message.Message, future: asyncio.Future[bytes]
+    ) -> bytes:
+        self._dispatcher.link_response(correlation_id=correlation_id, future=future)
+        await self._conn.send(msg.serialized)
+        return await future
+
+    async def _init_producer_id(self) -> None:
+        correlation_id = self.correlation_id_factory()
+        resp = broker.InitProducerIdResponse.deserialize(
+            await self._request(
+                correlation_id,
+                message.Message.init_producer_id(correlation_id=correlation_id),
+                asyncio.Future(),
+            )
+        )
+        if resp.error_code != 0:
+            raise from_error_code(
+                resp.error_code, f"Failed to init producer id: {resp.error_message}"
+            )
+        self._accumulator.reset_producer_id(resp.producer_id, resp.producer_epoch)
+
+    async def _update_metadata(self, topic: str) -> None:
+        correlation_id = self.correlation_id_factory()
+        msg = message.Message.metadata(
+            correlation_id=correlation_id,
+            payload=broker.Metadata(topics=[topic]).serialized,
+        )
+        try:
+            self._metadata.update(
+                broker.MetadataResponse.deserialize(
+                    await self._request(correlation_id, msg, asyncio.Future())
+                )
+            )
+        finally:
+            del self._metadata_requests[topic]
+
+    async def _partitions_for(self, topic: str) -> int:
+        if (num_partitions := self._metadata.partitions_for(topic)) is not None:
+            return num_partitions
+        if (request := self._metadata_requests.get(topic)) is None:
+            request = asyncio.create_task(self._update_metadata(topic))
+            self._metadata_requests[topic] = request
+        # every send() for the topic waits on the same request, so one caller
+        # being cancelled mustn't cancel it for the others
+        await asyncio.shield(request)
+        if (num_partitions := self._metadata.partition_counts.get(topic)) is None:
+            raise PartitionNotFoundError(f"Topic {topic} does not exist")
+        return num_partitions
+
+    async def _append(
+        self,
+        rec: record.ProducerRecord,
+        future: asyncio.Future[record.RecordMetadata],
+    ) -> accumulator.AppendResult:
+        num_partitions = None
+        if rec.partition is None:
+            num_partitions = await self._partitions_for(rec.topic)
+            partition = self.partitioner.partition(rec.topic, rec.key, num_partitions)
+            rec = rec.model_copy(update={"partition": partition})
+        result = self._accumulator.add(rec=rec, future=future, abort_on_new_batch=True)
+        if result.abort_for_new_batch and num_partitions is not None:
+            self.partitioner.on_new_batch(rec.topic, num_partitions, rec.partition)
+            partition = self.partitioner.partition(rec.topic, rec.key, num_partitions)
+            rec = rec.model_copy(update={"partition": partition})
+            result = self._accumulator.add(
+                rec=rec, future=future, abort_on_new_batch=True
+            )
+        if not result.abort_for_new_batch:
+            return result
+        # a new batch needs buffer memory, which acknowledged batches give back
+        self._wakeup.set()
+        await self._accumulator.allocate(self.max_block_ms)
+        try:
+            result = self._accumulator.add(rec=rec, future=future)
+        except BaseException:
+            self._accumulator.deallocate()
+            raise
+        if not result.new_batch_created:
+            self._accumulator.deallocate()
+        return result
+
+    async def send(
+        self, rec: record.ProducerRecord
+    ) -> asyncio.Future[record.RecordMetadata]:
+        if not self.is_connected:
+            raise connection.BrokerConnectionError("Not connected to broker")
+        rec = rec.model_copy(
+            update={
+                "key": None if rec.key is None else self.key_serializer(rec.key),
+                "value": self.value_serializer(rec.value),
+            }
+        )
+        future = asyncio.Future()
+        result = await self._append(rec, future)
+        if result.batch_is_full or result.new_batch_created:
+            self._wakeup.set()
+        self._incomplete.add(future)
+        future.add_done_callback(self._incomplete.discard)
+
+        return future
+
+    async def flush(self) -> None:
+        self._accumulator.begin_flush()
+        self._wakeup.set()
+        try:
+            await asyncio.gather(*self._incomplete, return_exceptions=True)
+        finally:
+            self._accumulator.end_flush()
+
+    async def close(self) -> None:
+        if self.is_connected:
+            await self.flush()
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._loop_task
+            self._loop_task = None
@@ -2,7 +2,7 @@ import pydantic
 
 
 class RecordContents(pydantic.BaseModel):
-    value: str
-    key: str | None = None
+    value: bytes
+    key: bytes | None = None
     timestamp: int | None = None
-    headers: dict[str, str] = pydantic.Field(default_factory=dict)
+    headers: dict[str, bytes] = pydantic.Field(default_factory=dict)
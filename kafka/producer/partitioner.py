@@ -0,0 +1,92 @@
+import random
+from typing import Protocol
+
+MURMUR2_SEED = 0x9747B28C
+MURMUR2_M = 0x5BD1E995
+MURMUR2_R = 24
+UINT32_MASK = 0xFFFFFFFF
+
+
+def murmur2(data: bytes) -> int:
+    """Java 클라이언트의 Utils.murmur2 와 같은 32비트 부호 있는 해시"""
+    length = len(data)
+    h = (MURMUR2_SEED ^ length) & UINT32_MASK
+    tail_start = length - length % 4
+    for i in range(0, tail_start, 4):
+        k = int.from_bytes(data[i : i + 4], "little")
+        k = (k * MURMUR2_M) & UINT32_MASK
+        k ^= k >> MURMUR2_R
+        k = (k * MURMUR2_M) & UINT32_MASK
+        h = (h * MURMUR2_M) & UINT32_MASK
+        h ^= k
+
+    remaining = length % 4
+    if remaining == 3:
+        h ^= data[tail_start + 2] << 16
+    if remaining >= 2:
+        h ^= data[tail_start + 1] << 8
+    if remaining >= 1:
+        h ^= data[tail_start]
+        h = (h * MURMUR2_M) & UINT32_MASK
+
+    h ^= h >> 13
+    h = (h * MURMUR2_M) & UINT32_MASK
+    h ^= h >> 15
+    return h - (1 << 32) if h & 0x80000000 else h
+
+
+def to_positive(number: int) -> int:
+    return number & 0x7FFFFFFF
+
+
+class Partitioner(Protocol):
+    def partition(self, topic: str, key: bytes | None, num_partitions: int) -> int:
+        """레코드를 보낼 파티션 번호를 반환한다."""
+        pass
+
+    def on_new_batch(
+        self, topic: str, num_partitions: int, prev_partition: int
+    ) -> None:
+        """prev_partition 에 새 배치가 필요해졌을 때 호출된다."""
+        pass
+
+
+class StickyPartitionCache:
+    def __init__(self):
+        self.partitions: dict[str, int] = {}
+
+    def partition(self, topic: str, num_partitions: int) -> int:
+        if (partition := self.partitions.get(topic)) is not None:
+            return partition
+        return self.next_partition(topic, num_partitions, prev_partition=None)
+
+    def next_partition(
+        self, topic: str, num_partitions: int, prev_partition: int | None
+    ) -> int:
+        old_partition = self.partitions.get(topic)
+        if old_partition is None or old_partition == prev_partition:
+            if num_partitions == 1 or old_partition is None:
+                new_partition = random.randrange(num_partitions)
+            else:
+                new_partition = random.randrange(num_partitions - 1)
+                if new_partition >= old_partition:
+                    new_partition += 1
+            self.partitions[topic] = new_partition
+        return self.partitions[topic]
+
+
+class DefaultPartitioner:
+    def __init__(self):
+        self.sticky_partition_cache = StickyPartitionCache()
+
+    def partition(self, topic: str, key: bytes | None, num_partitions: int) -> int:
+        if key is None:
+            return self.sticky_partition_cache.partition(topic, num_partitions)
+        return to_positive(murmur2(key)) % num_partitions
+
+    def on_new_batch(
+        self, topic: str, num_partitions: int, prev_partition: int
+    ) -> None:
+        self.sticky_partition_cache.next_partition(
+            topic, num_partitions, prev_partition
+        )
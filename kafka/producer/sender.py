@@ -1,7 +1,17 @@
+import asyncio
+import functools
 from collections.abc import Callable
 
-from kafka import connection, dispatcher, constants, message
+from kafka import broker, connection, constants, dispatcher, message
+from kafka.compression import CompressionType
+from kafka.error import (
+    KafkaError,
+    RequestTimedOutError,
+    RetriableError,
+    from_error_code,
+)
 from kafka.producer import accumulator
+from kafka.producer.batch import ProducerBatch
 
 
 class RequestSender:
@@ -11,21 +21,115 @@ class RequestSender:
         correlation_id_factory: Callable[[], int],
         response_dispatcher: dispatcher.ProduceDispatcher,
         record_accumulator: accumulator.RecordAccumulator,
-        message_size_limit: int,
+        max_in_flight_requests: int = 5,
+        retries: int = 0,
+        request_timeout_ms: int = 30 * 1000,
+        on_complete: Callable[[], None] | None = None,
+        compression_type: CompressionType = CompressionType.NONE,
+        acks: int = 1,
     ):
         self.conn = conn
         self.correlation_id_factory = correlation_id_factory
         self.dispatcher = response_dispatcher
         self.accumulator = record_accumulator
-        self.message_size_limit = message_size_limit
+        self.max_in_flight_requests = max_in_flight_requests
+        self.retries = retries
+        self.request_timeout_ms = request_timeout_ms
+        self.on_complete = on_complete
+        self.compression_type = compression_type
+        self.acks = acks
+        self.in_flight: dict[int, ProducerBatch] = {}
+        # the broker still expects a failed batch's sequence, so nothing more is
+        # sent until the in-flight requests drain and a new producer id is taken
+        self.needs_producer_id_reset = False
+
+    @property
+    def available_slots(self) -> int:
+        if self.needs_producer_id_reset:
+            return 0
+        return max(self.max_in_flight_requests - len(self.in_flight), 0)
 
     async def send(self) -> None:
-        payload_size_limit = self.message_size_limit - constants.HEADER_WIDTH
-        produces = self.accumulator.ready_batches(payload_size_limit)
-        for produce, futures in produces:
+        if self.available_slots == 0:
+            return
+        batches = self.accumulator.ready_batches(limit=self.available_slots)
+        if self.compression_type != CompressionType.NONE:
+            # retried batches keep the payload compressed on their first attempt
+            await asyncio.gather(
+                *(
+                    asyncio.to_thread(batch.compress, self.compression_type)
+                    for batch in batches
+                    if batch.attempts == 0
+                )
+            )
+        for batch in batches:
             correlation_id = self.correlation_id_factory()
             msg = message.Message.produce(
-                correlation_id=correlation_id, payload=produce.serialized
+                correlation_id=correlation_id, payload=batch.serialized
+            )
+            if self.acks == 0:
+                await self.conn.send(msg.serialized)
+                batch.done_without_ack()
+                self.accumulator.deallocate()
+                continue
+            future = asyncio.Future()
+            self.dispatcher.link_response(correlation_id, future)
+            self.in_flight[correlation_id] = batch
+            timeout_handle = asyncio.get_running_loop().call_later(
+                self.request_timeout_ms / 1000, self._expire, correlation_id, future
+            )
+            future.add_done_callback(
+                functools.partial(self._complete, correlation_id, timeout_handle)
             )
             await self.conn.send(msg.serialized)
-            self.dispatcher.link(correlation_id, futures)
+
+    def _expire(self, correlation_id: int, future: asyncio.Future[bytes]) -> None:
+        if future.done():
+            return
+        self.dispatcher.unlink(correlation_id)
+        future.set_exception(
+            RequestTimedOutError(
+                f"Request {correlation_id} timed out after {self.request_timeout_ms}ms"
+            )
+        )
+
+    def _complete(
+        self,
+        correlation_id: int,
+        timeout_handle: asyncio.TimerHandle,
+        future: asyncio.Future[bytes],
+    ) -> None:
+        timeout_handle.cancel()
+        batch = self.in_flight.pop(correlation_id)
+        if future.cancelled():
+            self._fail(batch, KafkaError(f"Request {correlation_id} was cancelled"))
+        elif (exc := future.exception()) is not None:
+            self._retry_or_fail(batch, exc)
+        else:
+            response = broker.ProduceResponse.deserialize(future.result())
+            if response.error_code == 0:
+                batch.done(response)
+                self.accumulator.deallocate()
+            else:
+                self._retry_or_fail(
+                    batch,
+                    from_error_code(
+                        response.error_code,
+                        f"Produce to {response.topic}-{response.partition} failed "
+                        f"with error code {response.error_code}: {response.error_message}",
+                    ),
+                )
+        if self.on_complete is not None:
+            self.on_complete()
+
+    def _retry_or_fail(self, batch: ProducerBatch, exc: BaseException) -> None:
+        if isinstance(exc, RetriableError) and batch.attempts < self.retries:
+            self.accumulator.reenqueue(batch)
+        else:
+            self._fail(batch, exc)
+
+    def _fail(self, batch: ProducerBatch, exc: BaseException) -> None:
+        if batch.producer_id != constants.NO_PRODUCER_ID:
+            self.needs_producer_id_reset = True
+        batch.fail(exc)
+        self.accumulator.deallocate()
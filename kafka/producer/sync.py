@@ -0,0 +1,142 @@
+import asyncio
+import collections
+import concurrent.futures
+import functools
+import threading
+from collections.abc import Callable
+from typing import Any
+
+from kafka import record
+from kafka.producer.client import KafkaProducer
+
+_FLUSH = object()
+
+
+class SyncProducer:
+    """별도 스레드의 이벤트 루프에서 KafkaProducer 를 실행하는 스레드 안전 프로듀서"""
+
+    def __init__(
+        self,
+        broker_host: str,
+        broker_port: int,
+        correlation_id_factory: Callable[[], int],
+        connect_timeout_ms: int = 10 * 1000,
+        **producer_config: Any,
+    ):
+        self._producer = KafkaProducer(
+            broker_host=broker_host,
+            broker_port=broker_port,
+            correlation_id_factory=correlation_id_factory,
+            **producer_config,
+        )
+        # deque append and popleft are atomic, so callers never contend on a lock
+        # to hand over records; only waking the loop thread is synchronized
+        self._pending: collections.deque[
+            tuple[record.ProducerRecord | object, concurrent.futures.Future]
+        ] = collections.deque()
+        self._wakeup_lock = threading.Lock()
+        self._wakeup_scheduled = False
+        self._closed = False
+        self._loop = asyncio.new_event_loop()
+        self._handoff = asyncio.Event()
+        self._handoff_task: asyncio.Task | None = None
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="kafka-sync-producer", daemon=True
+        )
+        self._thread.start()
+        try:
+            asyncio.run_coroutine_threadsafe(self._start(), self._loop).result(
+                timeout=connect_timeout_ms / 1000
+            )
+        except BaseException:
+            self._stop_loop()
+            raise
+
+    def __enter__(self) -> "SyncProducer":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    async def _start(self) -> None:
+        loop_task = self._producer.run_loop()
+        while not self._producer.is_connected:
+            if loop_task.done():
+                # surfaces the connection error raised by the producer loop
+                loop_task.result()
+            await asyncio.sleep(0.01)
+        self._handoff_task = asyncio.create_task(self._handoff_loop())
+
+    def _enqueue(
+        self, item: record.ProducerRecord | object
+    ) -> concurrent.futures.Future:
+        if self._closed:
+            raise RuntimeError("Producer is closed")
+        future = concurrent.futures.Future()
+        self._pending.append((item, future))
+        with self._wakeup_lock:
+            if self._wakeup_scheduled:
+                return future
+            self._wakeup_scheduled = True
+        self._loop.call_soon_threadsafe(self._handoff.set)
+        return future
+
+    def send(
+        self, rec: record.ProducerRecord
+    ) -> concurrent.futures.Future[record.RecordMetadata]:
+        return self._enqueue(rec)
+
+    async def _handoff_loop(self) -> None:
+        while True:
+            await self._handoff.wait()
+            self._handoff.clear()
+            with self._wakeup_lock:
+                self._wakeup_scheduled = False
+            while self._pending:
+                item, future = self._pending.popleft()
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    if item is _FLUSH:
+                        # records queued before the marker are already accumulated
+                        result = asyncio.ensure_future(self._producer.flush())
+                    else:
+                        result = await self._producer.send(item)
+                except Exception as exc:
+                    future.set_exception(exc)
+                    continue
+                result.add_done_callback(functools.partial(self._complete, future))
+
+    @staticmethod
+    def _complete(
+        future: concurrent.futures.Future, result: asyncio.Future[Any]
+    ) -> None:
+        if result.cancelled():
+            future.cancel()
+        elif (exc := result.exception()) is not None:
+            future.set_exception(exc)
+        else:
+            future.set_result(result.result())
+
+    def flush(self, timeout: float | None = None) -> None:
+        self._enqueue(_FLUSH).result(timeout=timeout)
+
+    async def _close(self) -> None:
+        await self._producer.close()
+        if self._handoff_task is not None:
+            self._handoff_task.cancel()
+
+    def _stop_loop(self) -> None:
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def close(self, timeout: float | None = None) -> None:
+        if self._closed:
+            return
+        self.flush(timeout=timeout)
+        self._closed = True
+        asyncio.run_coroutine_threadsafe(self._close(), self._loop).result(
+            timeout=timeout
+        )
+        self._stop_loop()
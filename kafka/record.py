@@ -1,3 +1,7 @@
+import functools
+from collections.abc import Callable
+from typing import Any
+
 from pydantic import BaseModel, Field
 
 
@@ -10,18 +14,73 @@ class RecordMetadata(BaseModel):
 
 class ProducerRecord(BaseModel):
     topic: str
-    value: str
-    key: str | None = None
+    # the producer's key and value serializers turn these into bytes
+    value: Any
+    key: Any = None
     partition: int | None = None
     timestamp: int | None = None
-    headers: dict[str, str] = Field(default_factory=dict)
+    headers: dict[str, bytes] = Field(default_factory=dict)
 
 
-class ConsumerRecord(BaseModel):
-    topic: str
-    value: bytes
-    key: bytes | None
-    partition: int
-    timestamp: int
-    headers: dict[str, bytes]
-    offset: int
+class ConsumerRecord:
+    """값과 헤더는 처음 읽을 때 역직렬화한다."""
+
+    def __init__(
+        self,
+        topic: str,
+        partition: int,
+        offset: int,
+        timestamp: int,
+        key: Any,
+        load_value: Callable[[], Any],
+        load_headers: Callable[[], dict[str, bytes]],
+    ):
+        self.topic = topic
+        self.partition = partition
+        self.offset = offset
+        self.timestamp = timestamp
+        # the consumer's key deserializer has already run; filters read keys
+        self.key = key
+        self._load_value = load_value
+        self._load_headers = load_headers
+
+    @functools.cached_property
+    def value(self) -> Any:
+        return self._load_value()
+
+    @functools.cached_property
+    def headers(self) -> dict[str, bytes]:
+        return self._load_headers()
+
+    def _fields(self) -> tuple[Any, ...]:
+        return (
+            self.topic,
+            self.partition,
+            self.offset,
+            self.timestamp,
+            self.key,
+            self.value,
+            self.headers,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ConsumerRecord):
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    def __repr__(self) -> str:
+        return (
+            f"ConsumerRecord(topic={self.topic!r}, partition={self.partition}, "
+            f"offset={self.offset}, timestamp={self.timestamp}, key={self.key!r})"
+        )
+
+    def __getstate__(self) -> dict[str, Any]:
+        # loaders needn't be picklable, so a record handed to another process
+        # carries its decoded value and headers instead
+        state = {
+            name: value
+            for name, value in self.__dict__.items()
+            if name not in ("_load_value", "_load_headers")
+        }
+        state["value"], state["headers"] = self.value, self.headers
+        return state
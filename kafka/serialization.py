@@ -0,0 +1,46 @@
+import base64
+from collections.abc import Callable
+from typing import Annotated, Any
+
+from pydantic import BeforeValidator, PlainSerializer
+
+Serializer = Callable[[Any], bytes]
+Deserializer = Callable[[bytes], Any]
+
+
+def _decode_wire_bytes(value: Any) -> Any:
+    # JSON can't carry raw bytes, so strings are always the base64 wire form
+    if isinstance(value, str):
+        return base64.b64decode(value, validate=True)
+    return value
+
+
+WireBytes = Annotated[
+    bytes,
+    BeforeValidator(_decode_wire_bytes),
+    PlainSerializer(
+        lambda value: base64.b64encode(value).decode("ascii"),
+        return_type=str,
+        when_used="json",
+    ),
+]
+
+
+def bytes_serializer(data: Any) -> bytes:
+    if isinstance(data, bytes):
+        return data
+    if isinstance(data, str):
+        return data.encode("utf-8")
+    raise TypeError(f"Cannot serialize {type(data).__name__} without a serializer")
+
+
+def bytes_deserializer(data: bytes) -> bytes:
+    return data
+
+
+def string_serializer(encoding: str = "utf-8") -> Serializer:
+    return lambda data: data.encode(encoding)
+
+
+def string_deserializer(encoding: str = "utf-8") -> Deserializer:
+    return lambda data: data.decode(encoding)
@@ -0,0 +1,55 @@
+import asyncio
+
+from kafka import constants
+
+
+class CoalescingWriter:
+    def __init__(
+        self,
+        writer: asyncio.StreamWriter,
+        high_water_mark: int = constants.WRITE_HIGH_WATER_MARK,
+        cork_ms: float = 0,
+    ):
+        self.writer = writer
+        self.high_water_mark = high_water_mark
+        self.cork_ms = cork_ms
+        self._buf: list[bytes] = []
+        self._buf_size = 0
+        self._flush_handle: asyncio.Handle | None = None
+
+    @property
+    def buffered_size(self) -> int:
+        return self._buf_size + self.writer.transport.get_write_buffer_size()
+
+    def write(self, data: bytes) -> None:
+        self._buf.append(data)
+        self._buf_size += len(data)
+        if self._flush_handle is not None:
+            return
+        loop = asyncio.get_running_loop()
+        if self.cork_ms > 0:
+            self._flush_handle = loop.call_later(self.cork_ms / 1000, self.flush)
+        else:
+            self._flush_handle = loop.call_soon(self.flush)
+
+    def flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._buf:
+            return
+        buf, self._buf, self._buf_size = self._buf, [], 0
+        self.writer.writelines(buf)
+
+    async def drain(self) -> None:
+        if self.buffered_size < self.high_water_mark:
+            return
+        self.flush()
+        await self.writer.drain()
+
+    def close(self) -> None:
+        self.flush()
+        self.writer.close()
+
+    async def wait_closed(self) -> None:
+        await self.writer.wait_closed()
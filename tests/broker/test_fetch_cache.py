@@ -0,0 +1,87 @@
+from pathlib import Path
+
+import pytest
+
+from kafka.broker.cache import FetchCache
+from kafka.broker.log import Record
+from kafka.broker.query import Fetch
+from kafka.broker.storage import FSLogStorage
+
+
+@pytest.fixture
+def fs_log_storage(tmp_path: Path) -> FSLogStorage:
+    # every record rolls a new segment; the tail cache is off so reads hit disk
+    storage = FSLogStorage(
+        root_path=tmp_path,
+        log_file_size_limit=100,
+        partitions={},
+        tail_cache_size=0,
+    )
+    storage.init_topic(topic_name="topic01", num_partitions=1)
+    for value in [b"a", b"b", b"c", b"d", b"e"]:
+        storage.append_log(
+            Record(
+                topic="topic01",
+                partition=0,
+                value=value,
+                key=None,
+                timestamp=1,
+                headers={},
+                offset=None,
+            )
+        )
+    return storage
+
+
+@pytest.mark.parametrize(
+    "offset, max_bytes, expected_hits",
+    [
+        (0, 1, 1),
+        (2, 100, 1),
+        (3, 1, 0),
+        (3, 10000, 0),
+    ],
+)
+def test_list_encoded_logs_caches_sealed_segments(
+    fs_log_storage: FSLogStorage, offset: int, max_bytes: int, expected_hits: int
+):
+    """봉인된 세그먼트만 읽은 결과는 캐시하고, 활성 세그먼트를 읽은 결과는 캐시하지 않는다"""
+    qry = Fetch(topic="topic01", partition=0, offset=offset, max_bytes=max_bytes)
+
+    first = fs_log_storage.list_encoded_logs(qry)
+    second = fs_log_storage.list_encoded_logs(qry)
+
+    assert first == second == [r.payload for r in fs_log_storage.list_logs(qry)]
+    metrics = fs_log_storage.cache_metrics()
+    assert metrics["fetch_cache_hits"] == expected_hits
+    assert metrics["fetch_cache_misses"] == 2 - expected_hits
+    assert metrics["fetch_cache_hit_rate"] == expected_hits / 2
+    assert (metrics["fetch_cache_bytes"] > 0) == (expected_hits > 0)
+
+
+def test_put_evicts_least_recently_used():
+    fetch_cache = FetchCache(max_bytes=10)
+    fetch_cache.put(("topic01", 0, 0, 1), [b"aaaa"])
+    fetch_cache.put(("topic01", 0, 1, 1), [b"bbbb"])
+    fetch_cache.get(("topic01", 0, 0, 1))
+
+    fetch_cache.put(("topic01", 0, 2, 1), [b"cccc"])
+    fetch_cache.put(("topic01", 0, 3, 1), [b"d" * 11])
+
+    assert fetch_cache.size == 8
+    assert fetch_cache.get(("topic01", 0, 0, 1)) == [b"aaaa"]
+    assert fetch_cache.get(("topic01", 0, 1, 1)) is None
+    assert fetch_cache.get(("topic01", 0, 3, 1)) is None
+    assert fetch_cache.hit_rate == 0.5
+
+
+def test_drop():
+    fetch_cache = FetchCache(max_bytes=10)
+    fetch_cache.put(("topic01", 0, 0, 1), [b"aaaa"])
+    fetch_cache.put(("topic01", 1, 0, 1), [b"bbbb"])
+
+    fetch_cache.drop(("topic01", 0))
+
+    assert fetch_cache.size == 4
+    assert fetch_cache.get(("topic01", 0, 0, 1)) is None
+    assert fetch_cache.get(("topic01", 1, 0, 1)) == [b"bbbb"]
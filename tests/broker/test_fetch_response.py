@@ -0,0 +1,66 @@
+import pytest
+
+from kafka.broker import FetchedRecord, FetchResponse, LazyFetchResponse
+
+
+@pytest.fixture
+def fetch_response(request: pytest.FixtureRequest) -> FetchResponse:
+    records: list[FetchedRecord] = request.param
+    return FetchResponse(topic="topic01", partition=0, error_code=0, records=records)
+
+
+@pytest.mark.parametrize(
+    "fetch_response",
+    [
+        [],
+        [FetchedRecord(value=b"", key=None, timestamp=1, headers={}, offset=0)],
+        [
+            FetchedRecord(value=b"a", key=b"k1", timestamp=1, headers={}, offset=3),
+            FetchedRecord(
+                value=b"ab",
+                key=b"key",
+                timestamp=2,
+                headers={"h1": b"abc", "h2": b"abcd"},
+                offset=4,
+            ),
+        ],
+    ],
+    indirect=True,
+)
+def test_deserialize(fetch_response: FetchResponse):
+    response = LazyFetchResponse.deserialize(
+        fetch_response.model_dump_json().encode("utf-8")
+    )
+
+    assert (response.topic, response.partition, response.error_code) == (
+        "topic01",
+        0,
+        0,
+    )
+    assert [
+        (r.offset, r.timestamp, r.key, r.value, r.headers) for r in response.records
+    ] == [
+        (r.offset, r.timestamp, r.key, r.value, r.headers)
+        for r in fetch_response.records
+    ]
+    assert [r.size for r in response.records] == [
+        len(r.value) + len(r.key or b"") + sum(map(len, r.headers.values()))
+        for r in fetch_response.records
+    ]
+
+
+@pytest.mark.parametrize(
+    "fetch_response",
+    [[FetchedRecord(value=b"v", key=b"k", timestamp=1, headers={}, offset=0)]],
+    indirect=True,
+)
+def test_deserialize_decodes_value_on_access(fetch_response: FetchResponse):
+    """값은 읽을 때까지 디코딩하지 않는다"""
+    [record] = LazyFetchResponse.deserialize(
+        fetch_response.model_dump_json().encode("utf-8")
+    ).records
+
+    assert (record.offset, record.key, record.size) == (0, b"k", 2)
+    assert "value" not in vars(record)
+    assert record.value == b"v"
+    assert "value" in vars(record)
@@ -0,0 +1,82 @@
+from pathlib import Path
+
+import pytest
+
+from kafka.broker.cache import FileHandleCache
+from kafka.broker.log import Record
+from kafka.broker.query import Fetch
+from kafka.broker.storage import FSLogStorage
+
+
+@pytest.fixture
+def paths(tmp_path: Path) -> list[Path]:
+    return [tmp_path / f"{idx}.log" for idx in range(3)]
+
+
+def test_open_evicts_least_recently_used(paths: list[Path]):
+    file_handles = FileHandleCache(max_open_files=2)
+    with file_handles.open(paths[0]) as first:
+        pass
+    with file_handles.open(paths[1]):
+        pass
+    with file_handles.open(paths[0]) as reopened:
+        pass
+
+    with file_handles.open(paths[2]):
+        pass
+
+    assert reopened is first
+    assert not first.closed
+    assert file_handles.open_files == 2
+    assert (file_handles.hits, file_handles.misses) == (1, 3)
+
+
+def test_open_keeps_handles_in_use(paths: list[Path]):
+    """사용 중인 파일은 한도를 넘어도 닫지 않고, 반납된 뒤에 닫는다"""
+    file_handles = FileHandleCache(max_open_files=1)
+
+    with file_handles.open(paths[0]) as first:
+        with file_handles.open(paths[1]) as second:
+            second.write(b"data")
+            assert file_handles.open_files == 2
+        first.write(b"data")
+
+    assert second.closed
+    assert not first.closed
+    assert file_handles.open_files == 1
+
+
+def test_list_logs_within_open_file_budget(tmp_path: Path):
+    # every record rolls a new segment, so each read spans many files
+    storage = FSLogStorage(
+        root_path=tmp_path,
+        log_file_size_limit=100,
+        partitions={},
+        tail_cache_size=0,
+        fetch_cache_size=0,
+        max_open_files=3,
+    )
+    storage.init_topic(topic_name="topic01", num_partitions=1)
+    values = [b"a", b"b", b"c", b"d", b"e"]
+    for value in values:
+        storage.append_log(
+            Record(
+                topic="topic01",
+                partition=0,
+                value=value,
+                key=None,
+                timestamp=1,
+                headers={},
+                offset=None,
+            )
+        )
+
+    records = storage.list_logs(
+        Fetch(topic="topic01", partition=0, offset=0, max_bytes=10000)
+    )
+    open_files = storage.file_handles.open_files
+    storage.close()
+
+    assert [r.value for r in records] == values
+    assert open_files == 3
+    assert storage.file_handles.open_files == 0
@@ -1,3 +1,4 @@
+import json
 import shutil
 from pathlib import Path
 
@@ -90,12 +91,12 @@ def test_update(
         (
             "root-limit_1GB",
             dict(group_id="default-group", topic="topic01", partition=0, offset=3),
-            b'{"default-group:topic01:0": 3}',
+            b'{"group_id":"default-group","topic":"topic01","partition":0,"offset":3}\n',
         ),
         (
             "root-limit_100B",
             dict(group_id="default-group", topic="topic01", partition=0, offset=2),
-            b'{"default-group:topic01:0": 2}',
+            b'{"group_id":"default-group","topic":"topic01","partition":0,"offset":2}\n',
         ),
     ],
     indirect=["fs_committed_offset_storage", "committed_offset"],
@@ -105,11 +106,127 @@ def test_commit(
     committed_offset: CommittedOffset,
     expected: bytes,
 ):
+    chk_file_path = (
+        fs_committed_offset_storage.root_path / constants.COMMITTED_OFFSET_FILE_NAME
+    )
+    snapshot = chk_file_path.read_bytes()
+
     fs_committed_offset_storage.update(committed_offset)
     fs_committed_offset_storage.commit()
 
-    chk_file_path = (
-        fs_committed_offset_storage.root_path / constants.COMMITTED_OFFSET_FILE_NAME
+    log_file_path = (
+        fs_committed_offset_storage.root_path / constants.COMMITTED_OFFSET_LOG_FILE_NAME
+    )
+    assert log_file_path.read_bytes() == expected
+    assert chk_file_path.read_bytes() == snapshot
+
+
+@pytest.mark.parametrize(
+    "root_path, offsets, expected",
+    [
+        ("root-empty", [3], {("default-group", "topic01", 0): 3}),
+        ("root-limit_1GB", [3, 5], {("default-group", "topic01", 0): 5}),
+        ("root-limit_100B", [2, 4, 6], {("default-group", "topic01", 0): 6}),
+    ],
+    indirect=["root_path"],
+)
+def test_load_replays_offsets_log(
+    root_path: Path,
+    offsets: list[int],
+    expected: dict[tuple[str, str, int], int],
+):
+    storage = FSCommittedOffsetStorage.load_from_root(root_path)
+    for offset in offsets:
+        storage.update(
+            CommittedOffset(
+                group_id="default-group", topic="topic01", partition=0, offset=offset
+            )
+        )
+        storage.commit()
+
+    reloaded = FSCommittedOffsetStorage.load_from_root(root_path)
+
+    assert reloaded.cache == expected
+    assert reloaded.log_entries == len(offsets)
+
+
+def test_load_ignores_torn_offsets_log_entry(tmp_path: Path):
+    storage = FSCommittedOffsetStorage.load_from_root(tmp_path)
+    storage.update(
+        CommittedOffset(
+            group_id="default-group", topic="topic01", partition=0, offset=3
+        )
+    )
+    storage.commit()
+    with (tmp_path / constants.COMMITTED_OFFSET_LOG_FILE_NAME).open("ab") as f:
+        f.write(b'{"group_id":"default-group","topic":"topic01","parti')
+
+    reloaded = FSCommittedOffsetStorage.load_from_root(tmp_path)
+
+    assert reloaded.cache == {("default-group", "topic01", 0): 3}
+
+
+def test_commit_after_torn_offsets_log_entry(tmp_path: Path):
+    """잘린 마지막 줄은 로드할 때 지워져서 이후 커밋이 로그를 망가뜨리지 않는다"""
+    storage = FSCommittedOffsetStorage.load_from_root(tmp_path)
+    storage.update(
+        CommittedOffset(
+            group_id="default-group", topic="topic01", partition=0, offset=3
+        )
+    )
+    storage.commit()
+    with (tmp_path / constants.COMMITTED_OFFSET_LOG_FILE_NAME).open("ab") as f:
+        f.write(b'{"group_id":"default-group","topic":"topic01","parti')
+    reloaded = FSCommittedOffsetStorage.load_from_root(tmp_path)
+    reloaded.update(
+        CommittedOffset(
+            group_id="default-group", topic="topic01", partition=1, offset=5
+        )
+    )
+    reloaded.commit()
+
+    recovered = FSCommittedOffsetStorage.load_from_root(tmp_path)
+
+    assert recovered.cache == {
+        ("default-group", "topic01", 0): 3,
+        ("default-group", "topic01", 1): 5,
+    }
+    assert recovered.log_entries == 2
+
+
+@pytest.mark.parametrize(
+    "compaction_threshold, partitions, expected_snapshot, expected_log_entries",
+    [
+        (2, [0], {}, 1),
+        (2, [0, 1], {"default-group:topic01:0": 1, "default-group:topic01:1": 1}, 0),
+        (1, [0, 1, 2], {f"default-group:topic01:{p}": 1 for p in range(3)}, 0),
+    ],
+)
+def test_commit_compacts_offsets_log(
+    tmp_path: Path,
+    compaction_threshold: int,
+    partitions: list[int],
+    expected_snapshot: dict[str, int],
+    expected_log_entries: int,
+):
+    storage = FSCommittedOffsetStorage.load_from_root(
+        tmp_path, compaction_threshold=compaction_threshold
+    )
+    for partition in partitions:
+        storage.update(
+            CommittedOffset(
+                group_id="default-group",
+                topic="topic01",
+                partition=partition,
+                offset=1,
+            )
+        )
+    storage.commit()
+
+    snapshot = json.loads((tmp_path / constants.COMMITTED_OFFSET_FILE_NAME).read_text())
+    log_lines = (
+        (tmp_path / constants.COMMITTED_OFFSET_LOG_FILE_NAME).read_bytes().splitlines()
     )
-    with chk_file_path.open("rb") as f:
-        assert f.read() == expected
+    assert snapshot == expected_snapshot
+    assert len(log_lines) == expected_log_entries == storage.log_entries
+    assert FSCommittedOffsetStorage.load_from_root(tmp_path).cache == storage.cache
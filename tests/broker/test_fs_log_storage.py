@@ -1,14 +1,23 @@
 from typing import Any
+import base64
+import json
+import os
 import shutil
 from pathlib import Path
+from unittest import mock
 
 import pytest
 
-from kafka import constants
-from kafka.broker.log import Record, Partition, Segment
+from kafka import compression, constants
+from kafka.broker.log import Record, RecordBatch, Partition, Segment
+from kafka.compression import CompressionType
 from kafka.broker.query import Fetch
 from kafka.broker.storage import FSLogStorage
-from kafka.error import InvalidAdminCommandError, PartitionNotFoundError
+from kafka.error import (
+    InvalidAdminCommandError,
+    InvalidRecordError,
+    PartitionNotFoundError,
+)
 
 
 @pytest.fixture
@@ -100,6 +109,48 @@ def test_load_from_root(
     assert log_storage.partitions == expected_partitions
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize("root_path", ["root-limit_100B"], indirect=True)
+async def test_load_from_root_defers_partitions(root_path: Path):
+    """시작할 때는 디렉터리 목록만 읽고, 파티션은 처음 쓰일 때 읽는다"""
+    (root_path / "topic02-0").mkdir()
+    log_storage = FSLogStorage.load_from_root(
+        root_path=root_path, log_file_size_limit=constants.LOG_FILE_SIZE_LIMIT
+    )
+    unloaded = set(log_storage.partitions.unloaded)
+
+    leo = log_storage.partitions[("topic01", 0)].leo
+    await log_storage.warm_up()
+
+    assert unloaded == {("topic01", 0), ("topic01", 1)}
+    assert log_storage.partition_counts() == {"topic01": 2}
+    assert leo == 2
+    assert log_storage.partitions.unloaded == {}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("root_path", ["root-limit_100B"], indirect=True)
+async def test_load_from_root_keeps_unreadable_partition(
+    root_path: Path, capsys: pytest.CaptureFixture[str]
+):
+    """읽지 못한 파티션은 사라지지 않고, 쓰일 때마다 같은 오류를 낸다"""
+    log_path = root_path / "topic01-0" / Segment(base_offset=1).log
+    with log_path.open("ab") as log_file:
+        log_file.write(b'0050{"torn')
+    log_storage = FSLogStorage.load_from_root(
+        root_path=root_path, log_file_size_limit=constants.LOG_FILE_SIZE_LIMIT
+    )
+
+    await log_storage.warm_up()
+
+    assert "Failed to load partition topic01-0" in capsys.readouterr().out
+    for _ in range(2):
+        with pytest.raises(json.JSONDecodeError):
+            log_storage.partitions.get(("topic01", 0))
+    assert log_storage.partition_counts() == {"topic01": 2}
+    assert log_storage.partitions[("topic01", 1)].leo == 0
+
+
 @pytest.fixture
 def fs_log_storage(tmp_path: Path) -> FSLogStorage:
     root_path = tmp_path
@@ -297,7 +348,7 @@ def log_record(base_log_record: Record, request: pytest.FixtureRequest) -> Recor
     [
         (
             ("test-topic", 1),
-            ("test-topic", 0, "dGVzdC12YWx1ZQ==", None, 1752735958, {}),
+            ("test-topic", 0, b"test-value", None, 1752735958, {}),
             {
                 ("test-topic", 0): dict(
                     topic="test-topic", num=0, segments=[dict(base_offset=0)], leo=1
@@ -316,7 +367,7 @@ def log_record(base_log_record: Record, request: pytest.FixtureRequest) -> Recor
         ),
         (
             ("another-topic", 1),
-            ("another-topic", 0, "YW5vdGhlci12YWx1ZQ==", None, 1752735959, {}),
+            ("another-topic", 0, b"another-value", None, 1752735959, {}),
             {
                 ("another-topic", 0): dict(
                     topic="another-topic", num=0, segments=[dict(base_offset=0)], leo=1
@@ -335,7 +386,7 @@ def log_record(base_log_record: Record, request: pytest.FixtureRequest) -> Recor
         ),
         (
             ("test-topic", 3),
-            ("test-topic", 1, "YWRkaXRpb25hbC1kYXRh", None, 1752735960, {}),
+            ("test-topic", 1, b"additional-data", None, 1752735960, {}),
             {
                 ("test-topic", 0): dict(
                     topic="test-topic", num=0, segments=[dict(base_offset=0)], leo=0
@@ -384,7 +435,7 @@ def test_append_log(
     [
         (
             ("test-topic", 1),
-            ("test-topic", 1, "dGVzdC12YWx1ZQ==", None, 1752735960, {}),
+            ("test-topic", 1, b"test-value", None, 1752735960, {}),
         ),
     ],
     indirect=["initiated_log_storage", "log_record"],
@@ -416,7 +467,7 @@ def logged_log_storage(
     [
         (
             ("root-limit_1GB", 1024**3),
-            ("topic01", 0, "c2Vjb25kLWxvZw==", None, 1752735962, {}),
+            ("topic01", 0, b"second-log", None, 1752735962, {}),
             {
                 ("topic01", 0): dict(
                     topic="topic01", num=0, segments=[dict(base_offset=0)], leo=2
@@ -451,7 +502,7 @@ def logged_log_storage(
         ),
         (
             ("root-limit_100B", 100),
-            ("topic01", 1, "c2Vjb25kLWxvZw==", None, 1752735962, {}),
+            ("topic01", 1, b"second-log", None, 1752735962, {}),
             {
                 ("topic01", 0): dict(
                     topic="topic01",
@@ -539,6 +590,21 @@ def test_append_log_to_already_logged_partition(
                 ),
             ],
         ),
+        (
+            ("root-limit_1GB", 1024**3),
+            Fetch(topic="topic01", partition=0, offset=0, max_bytes=1),
+            [
+                Record(
+                    topic="topic01",
+                    partition=0,
+                    value="aW5pdGlhbC1sb2c=",
+                    key=None,
+                    timestamp=1752735961,
+                    headers={},
+                    offset=0,
+                ),
+            ],
+        ),
         (
             ("root-limit_1GB", 1024**3),
             Fetch(topic="topic01", partition=0, offset=1, max_bytes=100),
@@ -616,3 +682,242 @@ def test_list_topics(logged_log_storage: FSLogStorage, expected: list[str]):
     topics = logged_log_storage.list_topics()
 
     assert topics == expected
+
+
+@pytest.mark.parametrize(
+    "logged_log_storage, expected",
+    [
+        (("root-empty", 1024**3), {}),
+        (("root-limit_1GB", 1024**3), {"topic01": 2}),
+    ],
+    indirect=["logged_log_storage"],
+)
+def test_partition_counts(logged_log_storage: FSLogStorage, expected: dict[str, int]):
+    assert logged_log_storage.partition_counts() == expected
+
+
+def compressed_batch(topic: str, partition: int, values: list[str]) -> RecordBatch:
+    records = json.dumps(
+        [dict(value=v, key=None, timestamp=1, headers={}) for v in values]
+    ).encode()
+    return RecordBatch(
+        topic=topic,
+        partition=partition,
+        base_offset=None,
+        record_count=len(values),
+        timestamp=1752735958,
+        compression_type=CompressionType.GZIP,
+        records=base64.b64encode(
+            compression.compress(records, CompressionType.GZIP)
+        ).decode(),
+    )
+
+
+@pytest.mark.parametrize(
+    "logged_log_storage, offset, expected_values",
+    [
+        (("root-limit_1GB", 1024**3), 0, [b"initial-log", b"a", b"b", b"c"]),
+        (("root-limit_1GB", 1024**3), 2, [b"b", b"c"]),
+        (("root-limit_1GB", 1024**3), 4, []),
+    ],
+    indirect=["logged_log_storage"],
+)
+def test_append_batch(
+    logged_log_storage: FSLogStorage,
+    tmp_path: Path,
+    offset: int,
+    expected_values: list[bytes],
+):
+    """압축 배치는 하나의 엔트리로 저장되고, 조회할 때 레코드별 오프셋으로 풀린다"""
+    logged_log_storage.append_batch(
+        compressed_batch("topic01", 0, ["YQ==", "Yg==", "Yw=="])
+    )
+
+    records = logged_log_storage.list_logs(
+        Fetch(topic="topic01", partition=0, offset=offset, max_bytes=10000)
+    )
+    reloaded = FSLogStorage.load_from_root(tmp_path, 1024**3)
+
+    assert [r.value for r in records] == expected_values
+    assert [r.offset for r in records] == list(
+        range(offset, offset + len(expected_values))
+    )
+    assert logged_log_storage.partitions[("topic01", 0)].leo == 4
+    assert reloaded.partitions[("topic01", 0)].leo == 4
+    index_path = tmp_path / "topic01-0" / Segment(base_offset=0).index
+    assert index_path.stat().st_size == 2 * (
+        constants.LOG_RECORD_OFFSET_WIDTH + constants.LOG_RECORD_POSITION_WIDTH
+    )
+
+
+@pytest.mark.parametrize(
+    "logged_log_storage, batch",
+    [
+        (
+            ("root-limit_1GB", 1024**3),
+            compressed_batch("topic01", 0, ["YQ=="]).model_copy(
+                update=dict(records=base64.b64encode(b"not gzip").decode())
+            ),
+        ),
+        (
+            ("root-limit_1GB", 1024**3),
+            compressed_batch("topic01", 0, ["YQ==", "Yg=="]).model_copy(
+                update=dict(record_count=3)
+            ),
+        ),
+    ],
+    indirect=["logged_log_storage"],
+)
+def test_append_batch_with_invalid_batch(
+    logged_log_storage: FSLogStorage, tmp_path: Path, batch: RecordBatch
+):
+    """풀 수 없거나 레코드 수가 맞지 않는 배치는 로그에 쓰기 전에 거부된다"""
+    log_path = tmp_path / "topic01-0" / Segment(base_offset=0).log
+    log_size = log_path.stat().st_size
+
+    with pytest.raises(InvalidRecordError):
+        logged_log_storage.append_batch(batch)
+
+    assert logged_log_storage.partitions[("topic01", 0)].leo == 1
+    assert log_path.stat().st_size == log_size
+    assert [
+        r.value
+        for r in logged_log_storage.list_logs(
+            Fetch(topic="topic01", partition=0, offset=0, max_bytes=10000)
+        )
+    ] == [b"initial-log"]
+
+
+@pytest.mark.parametrize(
+    "logged_log_storage, values, expected_entries",
+    [
+        (("root-limit_1GB", 1024**3), ["YQ==", "Yg==", "Yw=="], 2),
+        (
+            ("root-limit_1GB", 1024**3),
+            [base64.b64encode(os.urandom(3000)).decode() for _ in range(3)],
+            4,
+        ),
+    ],
+    indirect=["logged_log_storage"],
+)
+def test_append_batch_decodes_once(
+    logged_log_storage: FSLogStorage,
+    tmp_path: Path,
+    values: list[str],
+    expected_entries: int,
+):
+    """배치는 검증할 때 한 번만 풀고, 그 레코드로 테일 캐시를 채운다"""
+    with mock.patch(
+        "kafka.compression.decompress", wraps=compression.decompress
+    ) as decompress:
+        logged_log_storage.append_batch(compressed_batch("topic01", 0, values))
+
+    cached = logged_log_storage.tail_cache.read(("topic01", 0), 1, 100000)
+    reloaded = FSLogStorage.load_from_root(tmp_path, 1024**3)
+    index_path = tmp_path / "topic01-0" / Segment(base_offset=0).index
+
+    assert decompress.call_count == 1
+    assert cached == reloaded.list_encoded_logs(
+        Fetch(topic="topic01", partition=0, offset=1, max_bytes=100000)
+    )
+    assert reloaded.partitions[("topic01", 0)].leo == 4
+    assert index_path.stat().st_size == expected_entries * (
+        constants.LOG_RECORD_OFFSET_WIDTH + constants.LOG_RECORD_POSITION_WIDTH
+    )
+
+
+@pytest.mark.parametrize(
+    "logged_log_storage, offset, max_bytes, expected_cached",
+    [
+        (("root-limit_1GB", 1024**3), 0, 10000, False),
+        (("root-limit_1GB", 1024**3), 1, 10000, True),
+        (("root-limit_1GB", 1024**3), 3, 10000, True),
+        (("root-limit_1GB", 1024**3), 2, 1, True),
+        (("root-limit_1GB", 1024**3), 5, 10000, False),
+    ],
+    indirect=["logged_log_storage"],
+)
+def test_list_encoded_logs(
+    logged_log_storage: FSLogStorage,
+    tmp_path: Path,
+    offset: int,
+    max_bytes: int,
+    expected_cached: bool,
+):
+    """최근에 추가된 레코드는 디스크를 읽지 않고 캐시에서 그대로 돌려준다"""
+    logged_log_storage.append_batch(
+        compressed_batch("topic01", 0, ["YQ==", "Yg==", "Yw=="])
+    )
+    logged_log_storage.append_log(
+        Record(
+            topic="topic01",
+            partition=0,
+            value=b"d",
+            key=b"k",
+            timestamp=1,
+            headers={"h": b"v"},
+            offset=None,
+        )
+    )
+    qry = Fetch(topic="topic01", partition=0, offset=offset, max_bytes=max_bytes)
+
+    encoded = logged_log_storage.list_encoded_logs(qry)
+    reloaded = FSLogStorage.load_from_root(tmp_path, 1024**3)
+
+    assert (
+        logged_log_storage.tail_cache.read(("topic01", 0), offset, max_bytes)
+        is not None
+    ) == expected_cached
+    assert encoded == reloaded.list_encoded_logs(qry)
+    assert encoded == [record.payload for record in reloaded.list_logs(qry)]
+
+
+@pytest.fixture
+def segmented_log_storage(tmp_path: Path) -> FSLogStorage:
+    # three records per segment; the caches are off so every fetch reads disk
+    storage = FSLogStorage(
+        root_path=tmp_path,
+        log_file_size_limit=220,
+        partitions={},
+        tail_cache_size=0,
+        fetch_cache_size=0,
+    )
+    storage.init_topic(topic_name="topic01", num_partitions=1)
+    for value in [b"a", b"b", b"c", b"d", b"e", b"f", b"g", b"h"]:
+        storage.append_log(
+            Record(
+                topic="topic01",
+                partition=0,
+                value=value,
+                key=None,
+                timestamp=1,
+                headers={},
+                offset=None,
+            )
+        )
+    return storage
+
+
+@pytest.mark.parametrize(
+    "offsets, expected_read_aheads",
+    [
+        ([0], 0),
+        ([0, 1], 1),
+        ([0, 1, 2, 3], 3),
+        ([0, 2], 0),
+        ([6, 7], 0),
+    ],
+)
+def test_list_logs_reads_ahead_for_sequential_fetches(
+    segmented_log_storage: FSLogStorage,
+    offsets: list[int],
+    expected_read_aheads: int,
+):
+    """순차적으로 읽는 컨슈머에게는 봉인된 세그먼트의 다음 구간을 미리 읽어 둔다"""
+    with mock.patch("os.posix_fadvise", create=True) as posix_fadvise:
+        for offset in offsets:
+            segmented_log_storage.list_logs(
+                Fetch(topic="topic01", partition=0, offset=offset, max_bytes=1)
+            )
+
+    assert posix_fadvise.call_count == expected_read_aheads
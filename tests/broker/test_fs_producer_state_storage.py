@@ -0,0 +1,123 @@
+from pathlib import Path
+
+import pytest
+
+from kafka import constants
+from kafka.broker.command import Produce, RecordContents
+from kafka.broker.storage import FSProducerStateStorage
+from kafka.error import InvalidProducerEpochError, OutOfOrderSequenceError
+
+
+@pytest.fixture
+def fs_producer_state_storage(tmp_path: Path) -> FSProducerStateStorage:
+    (tmp_path / "topic01-0").mkdir()
+    return FSProducerStateStorage.load_from_root(tmp_path)
+
+
+def produce_command(
+    base_sequence: int, record_count: int = 1, producer_epoch: int = 0
+) -> Produce:
+    return Produce(
+        topic="topic01",
+        partition=0,
+        producer_id=0,
+        producer_epoch=producer_epoch,
+        base_sequence=base_sequence,
+        records=[RecordContents(value="dmFsdWU=", key=None, timestamp=1, headers={})]
+        * record_count,
+    )
+
+
+def test_init_producer_id(fs_producer_state_storage: FSProducerStateStorage):
+    producer_ids = [fs_producer_state_storage.init_producer_id() for _ in range(2)]
+
+    reloaded = FSProducerStateStorage.load_from_root(
+        fs_producer_state_storage.root_path
+    )
+    assert producer_ids == [0, 1]
+    assert reloaded.init_producer_id() == 2
+
+
+@pytest.mark.parametrize(
+    "cmd, expected",
+    [
+        (produce_command(base_sequence=0, record_count=2), 10),
+        (produce_command(base_sequence=2), 12),
+        (produce_command(base_sequence=3), None),
+        (produce_command(base_sequence=0, producer_epoch=1), None),
+    ],
+)
+def test_duplicate_offset(
+    fs_producer_state_storage: FSProducerStateStorage,
+    cmd: Produce,
+    expected: int | None,
+):
+    fs_producer_state_storage.update(
+        produce_command(base_sequence=0, record_count=2), base_offset=10
+    )
+    fs_producer_state_storage.update(produce_command(base_sequence=2), base_offset=12)
+
+    assert fs_producer_state_storage.duplicate_offset(cmd) == expected
+
+
+@pytest.mark.parametrize(
+    "cmd, error_type",
+    [
+        (produce_command(base_sequence=4), OutOfOrderSequenceError),
+        (produce_command(base_sequence=1, producer_epoch=1), OutOfOrderSequenceError),
+        (
+            produce_command(base_sequence=1, producer_epoch=-1),
+            InvalidProducerEpochError,
+        ),
+    ],
+)
+def test_duplicate_offset_with_invalid_sequence(
+    fs_producer_state_storage: FSProducerStateStorage,
+    cmd: Produce,
+    error_type: type[Exception],
+):
+    fs_producer_state_storage.update(produce_command(base_sequence=0), base_offset=0)
+
+    with pytest.raises(error_type):
+        fs_producer_state_storage.duplicate_offset(cmd)
+
+
+def test_update_keeps_window(fs_producer_state_storage: FSProducerStateStorage):
+    for sequence in range(constants.PRODUCER_STATE_WINDOW_SIZE + 1):
+        fs_producer_state_storage.update(
+            produce_command(base_sequence=sequence), base_offset=sequence
+        )
+    fs_producer_state_storage.close()
+
+    reloaded = FSProducerStateStorage.load_from_root(
+        fs_producer_state_storage.root_path
+    )
+    assert reloaded.entries == {}
+    entry = reloaded.partition_entries("topic01", 0)[0]
+    assert [b.first_sequence for b in entry.batches] == list(
+        range(1, constants.PRODUCER_STATE_WINDOW_SIZE + 1)
+    )
+    with pytest.raises(OutOfOrderSequenceError):
+        reloaded.duplicate_offset(produce_command(base_sequence=0))
+
+
+@pytest.mark.parametrize("updates, expected_batches", [(2, 0), (3, 3), (5, 3)])
+def test_update_snapshots_periodically(
+    tmp_path: Path, updates: int, expected_batches: int
+):
+    """스냅샷은 배치마다가 아니라 snapshot_interval 개의 배치마다 다시 쓴다"""
+    (tmp_path / "topic01-0").mkdir()
+    storage = FSProducerStateStorage.load_from_root(tmp_path, snapshot_interval=3)
+    for sequence in range(updates):
+        storage.update(produce_command(base_sequence=sequence), base_offset=sequence)
+
+    snapshot = FSProducerStateStorage.load_from_root(tmp_path).partition_entries(
+        "topic01", 0
+    )
+    storage.close()
+    closed = FSProducerStateStorage.load_from_root(tmp_path).partition_entries(
+        "topic01", 0
+    )
+
+    assert sum(len(entry.batches) for entry in snapshot.values()) == expected_batches
+    assert [b.first_sequence for b in closed[0].batches] == list(range(updates))
@@ -0,0 +1,253 @@
+import json
+
+import pytest
+
+from kafka.broker import handler
+from kafka.broker.command import (
+    Heartbeat,
+    JoinGroup,
+    LeaveGroup,
+    MemberAssignment,
+    SyncGroup,
+)
+from kafka.broker.group import GroupCoordinator, GroupState
+from kafka.broker.query import TopicPartition
+from kafka.error import (
+    IllegalGenerationError,
+    InconsistentGroupProtocolError,
+    RebalanceInProgressError,
+    UnknownMemberIdError,
+)
+from kafka.message import Message
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def group_coordinator(clock: FakeClock) -> GroupCoordinator:
+    return GroupCoordinator(clock=clock)
+
+
+def join(
+    group_coordinator: GroupCoordinator,
+    member_id: str | None = None,
+    assignors: list[str] | None = None,
+    owned_partitions: list[tuple[str, int]] | None = None,
+) -> str:
+    return group_coordinator.join(
+        JoinGroup(
+            group_id="group01",
+            member_id=member_id,
+            session_timeout_ms=1000,
+            topics=["topic01"],
+            assignors=assignors or ["range"],
+            owned_partitions=[
+                TopicPartition(topic=topic, partition=partition)
+                for topic, partition in owned_partitions or []
+            ],
+        )
+    )
+
+
+def sync(
+    group_coordinator: GroupCoordinator,
+    member_id: str,
+    assignments: dict[str, list[tuple[str, int]]] | None = None,
+) -> list[tuple[str, int]] | None:
+    return group_coordinator.sync(
+        SyncGroup(
+            group_id="group01",
+            generation_id=group_coordinator.groups["group01"].generation_id,
+            member_id=member_id,
+            assignments=[
+                MemberAssignment(
+                    member_id=member,
+                    partitions=[
+                        TopicPartition(topic=topic, partition=partition)
+                        for topic, partition in partitions
+                    ],
+                )
+                for member, partitions in (assignments or {}).items()
+            ],
+        )
+    )
+
+
+def test_join_single_member(group_coordinator: GroupCoordinator):
+    member_id = join(group_coordinator)
+
+    group = group_coordinator.groups["group01"]
+    assert group.state == GroupState.COMPLETING_REBALANCE
+    assert group.generation_id == 0
+    assert group.leader_id == member_id
+    assert group.assignor == "range"
+
+
+def test_join_waits_for_existing_members(group_coordinator: GroupCoordinator):
+    """새 멤버가 참여하면 기존 멤버가 모두 다시 참여할 때까지 세대가 완료되지 않는다"""
+    leader = join(group_coordinator)
+    sync(group_coordinator, leader, {leader: [("topic01", 0)]})
+
+    follower = join(group_coordinator)
+    group = group_coordinator.groups["group01"]
+    assert group.state == GroupState.PREPARING_REBALANCE
+    with pytest.raises(RebalanceInProgressError):
+        group_coordinator.heartbeat(
+            Heartbeat(group_id="group01", generation_id=0, member_id=leader)
+        )
+
+    join(group_coordinator, leader)
+
+    assert group.state == GroupState.COMPLETING_REBALANCE
+    assert group.generation_id == 1
+    assert group.leader_id == leader
+    assert sync(group_coordinator, follower) is None
+    assert sync(
+        group_coordinator,
+        leader,
+        {leader: [("topic01", 0)], follower: [("topic01", 1)]},
+    ) == [("topic01", 0)]
+    assert sync(group_coordinator, follower) == [("topic01", 1)]
+    assert group.state == GroupState.STABLE
+
+
+def test_expired_member_is_removed(
+    group_coordinator: GroupCoordinator, clock: FakeClock
+):
+    leader = join(group_coordinator)
+    follower = join(group_coordinator)
+    join(group_coordinator, leader)
+    sync(group_coordinator, leader, {})
+
+    clock.now = 0.8
+    group_coordinator.heartbeat(
+        Heartbeat(group_id="group01", generation_id=1, member_id=leader)
+    )
+    clock.now = 1.5
+
+    with pytest.raises(RebalanceInProgressError):
+        group_coordinator.heartbeat(
+            Heartbeat(group_id="group01", generation_id=1, member_id=leader)
+        )
+    assert list(group_coordinator.groups["group01"].members) == [leader]
+    with pytest.raises(UnknownMemberIdError):
+        join(group_coordinator, follower)
+
+
+@pytest.mark.parametrize(
+    "owned_partitions, expected",
+    [
+        ([("topic01", 0), ("topic01", 1)], (GroupState.STABLE, 0)),
+        ([("topic01", 0)], (GroupState.COMPLETING_REBALANCE, 1)),
+    ],
+)
+def test_rejoin_with_revoked_partitions(
+    group_coordinator: GroupCoordinator,
+    owned_partitions: list[tuple[str, int]],
+    expected: tuple[GroupState, int],
+):
+    """협력적 멤버가 파티션을 반납하고 다시 참여하면 리밸런스가 시작된다"""
+    member_id = join(
+        group_coordinator, owned_partitions=[("topic01", 0), ("topic01", 1)]
+    )
+    sync(group_coordinator, member_id, {member_id: [("topic01", 0), ("topic01", 1)]})
+
+    join(group_coordinator, member_id, owned_partitions=owned_partitions)
+
+    group = group_coordinator.groups["group01"]
+    assert (group.state, group.generation_id) == expected
+
+
+def test_leave_group(group_coordinator: GroupCoordinator):
+    leader = join(group_coordinator)
+    follower = join(group_coordinator)
+    join(group_coordinator, leader)
+
+    group_coordinator.leave(LeaveGroup(group_id="group01", member_id=leader))
+    join(group_coordinator, follower)
+
+    group = group_coordinator.groups["group01"]
+    assert group.leader_id == follower
+    assert group.generation_id == 2
+
+
+@pytest.mark.parametrize(
+    "heartbeat, expected",
+    [
+        (dict(generation_id=5), IllegalGenerationError),
+        (dict(member_id="unknown"), UnknownMemberIdError),
+    ],
+)
+def test_heartbeat_with_invalid_member(
+    group_coordinator: GroupCoordinator,
+    heartbeat: dict[str, str | int],
+    expected: type[Exception],
+):
+    member_id = join(group_coordinator)
+    sync(group_coordinator, member_id, {})
+
+    with pytest.raises(expected):
+        group_coordinator.heartbeat(
+            Heartbeat(
+                **dict(group_id="group01", generation_id=0, member_id=member_id)
+                | heartbeat
+            )
+        )
+
+
+def test_join_with_inconsistent_assignors(group_coordinator: GroupCoordinator):
+    join(group_coordinator, assignors=["range"])
+
+    with pytest.raises(InconsistentGroupProtocolError):
+        join(group_coordinator, assignors=["roundrobin"])
+
+
+def test_join_group_handler(group_coordinator: GroupCoordinator):
+    leader = join(group_coordinator)
+    req = Message.join_group(
+        correlation_id=1,
+        payload=JoinGroup(
+            group_id="group01",
+            session_timeout_ms=1000,
+            topics=["topic01"],
+            assignors=["range"],
+        ).serialized,
+    )
+
+    resp = json.loads(handler.join_group(req, group_coordinator).payload)
+    rejoined = json.loads(
+        handler.join_group(
+            req.model_copy(
+                update=dict(
+                    payload=JoinGroup(
+                        group_id="group01",
+                        member_id=leader,
+                        session_timeout_ms=1000,
+                        topics=["topic01"],
+                        assignors=["range"],
+                    ).serialized
+                )
+            ),
+            group_coordinator,
+        ).payload
+    )
+
+    assert resp["error_code"] == 27
+    assert resp["member_id"] is not None
+    assert rejoined["error_code"] == 0
+    assert rejoined["leader_id"] == leader
+    assert rejoined["members"] == [
+        {"member_id": leader, "topics": ["topic01"], "owned_partitions": []},
+        {"member_id": resp["member_id"], "topics": ["topic01"], "owned_partitions": []},
+    ]
@@ -0,0 +1,56 @@
+import pytest
+
+from kafka.broker.query import Metadata
+from kafka.message import MessageHeaders, Message, MessageType
+
+
+@pytest.fixture
+def message(
+    base_message_headers: MessageHeaders,
+    base_message: Message,
+    request: pytest.FixtureRequest,
+) -> Message:
+    headers, payload = request.param
+    return base_message.model_copy(
+        update=dict(
+            headers=base_message_headers.model_copy(update=headers),
+            payload=payload,
+        )
+    )
+
+
+@pytest.mark.parametrize(
+    "message, expected",
+    [
+        (
+            ({"correlation_id": 1, "api_key": MessageType.METADATA}, b""),
+            Metadata(topics=None),
+        ),
+        (
+            (
+                {"correlation_id": 2, "api_key": MessageType.METADATA},
+                b'{"topics":["topic01","topic02"]}',
+            ),
+            Metadata(topics=["topic01", "topic02"]),
+        ),
+    ],
+    indirect=["message"],
+)
+def test_from_message(message: Message, expected: Metadata):
+    qry = Metadata.from_message(message)
+
+    assert qry == expected
+
+
+@pytest.mark.parametrize(
+    "message",
+    [({"correlation_id": 3, "api_key": MessageType.FETCH}, b"{}")],
+    indirect=["message"],
+)
+def test_from_message_with_invalid_message(message: Message):
+    with pytest.raises(ValueError):
+        Metadata.from_message(message)
+
+
+def test_serialized():
+    assert Metadata(topics=["topic01"]).serialized == b'{"topics":["topic01"]}'
@@ -0,0 +1,127 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from kafka.broker import handler
+from kafka.broker.log import CommittedOffset
+from kafka.broker.query import OffsetFetch, TopicPartition
+from kafka.broker.storage import FSCommittedOffsetStorage
+from kafka.message import Message, MessageHeaders, MessageType
+
+
+@pytest.fixture
+def message(
+    base_message_headers: MessageHeaders,
+    base_message: Message,
+    request: pytest.FixtureRequest,
+) -> Message:
+    headers, payload = request.param
+    return base_message.model_copy(
+        update=dict(
+            headers=base_message_headers.model_copy(update=headers),
+            payload=payload,
+        )
+    )
+
+
+@pytest.mark.parametrize(
+    "message, expected",
+    [
+        (
+            (
+                {"correlation_id": 1, "api_key": MessageType.OFFSET_FETCH},
+                b'{"group_id":"group01","partitions":[{"topic":"topic01","partition":0}]}',
+            ),
+            OffsetFetch(
+                group_id="group01",
+                partitions=[TopicPartition(topic="topic01", partition=0)],
+            ),
+        ),
+        (
+            (
+                {"correlation_id": 2, "api_key": MessageType.OFFSET_FETCH},
+                b'{"group_id":"group02","partitions":[{"topic":"topic01","partition":0},{"topic":"topic02","partition":1}]}',
+            ),
+            OffsetFetch(
+                group_id="group02",
+                partitions=[
+                    TopicPartition(topic="topic01", partition=0),
+                    TopicPartition(topic="topic02", partition=1),
+                ],
+            ),
+        ),
+    ],
+    indirect=["message"],
+)
+def test_from_message(message: Message, expected: OffsetFetch):
+    qry = OffsetFetch.from_message(message)
+
+    assert qry == expected
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        ({"correlation_id": 3, "api_key": MessageType.FETCH}, b"{}"),
+        (
+            {"correlation_id": 4, "api_key": MessageType.OFFSET_FETCH},
+            b'{"group_id":"group01","partitions":[]}',
+        ),
+    ],
+    indirect=["message"],
+)
+def test_from_message_with_invalid_message(message: Message):
+    with pytest.raises(ValueError):
+        OffsetFetch.from_message(message)
+
+
+@pytest.mark.parametrize(
+    "partitions, expected",
+    [
+        (
+            [("topic01", 0)],
+            [{"topic": "topic01", "partition": 0, "offset": 5}],
+        ),
+        (
+            [("topic01", 0), ("topic01", 1), ("topic02", 0)],
+            [
+                {"topic": "topic01", "partition": 0, "offset": 5},
+                {"topic": "topic01", "partition": 1, "offset": -1},
+                {"topic": "topic02", "partition": 0, "offset": -1},
+            ],
+        ),
+    ],
+)
+def test_offset_fetch_handler(
+    tmp_path: Path,
+    partitions: list[tuple[str, int]],
+    expected: list[dict[str, str | int]],
+):
+    """커밋되지 않은 파티션은 오프셋 -1로 응답한다"""
+    committed_offset_storage = FSCommittedOffsetStorage.load_from_root(tmp_path)
+    committed_offset_storage.update(
+        CommittedOffset(group_id="group01", topic="topic01", partition=0, offset=5)
+    )
+    committed_offset_storage.update(
+        CommittedOffset(group_id="group02", topic="topic01", partition=1, offset=7)
+    )
+    req = Message.offset_fetch(
+        correlation_id=1,
+        payload=OffsetFetch(
+            group_id="group01",
+            partitions=[
+                TopicPartition(topic=topic, partition=partition)
+                for topic, partition in partitions
+            ],
+        ).serialized,
+    )
+
+    resp = handler.offset_fetch(req, committed_offset_storage=committed_offset_storage)
+
+    assert resp.headers == req.headers
+    assert json.loads(resp.payload) == {
+        "topics": expected,
+        "error_code": 0,
+        "error_message": None,
+    }
@@ -55,7 +55,7 @@ def expected(
                 partition=0,
                 records=[
                     dict(
-                        value="dmFsdWU=",
+                        value=b"value",
                         key=None,
                         timestamp=1753230940,
                         headers={},
@@ -73,8 +73,8 @@ def expected(
                 partition=1,
                 records=[
                     dict(
-                        value="dmFsdWUy",
-                        key="dXNlcjAx",
+                        value=b"value2",
+                        key=b"user01",
                         timestamp=1753230940,
                         headers={},
                     ),
@@ -91,10 +91,10 @@ def expected(
                 partition=1,
                 records=[
                     dict(
-                        value="dmFsdWUy",
-                        key="dXNlcjAx",
+                        value=b"value2",
+                        key=b"user01",
                         timestamp=1753230940,
-                        headers={"header1": "dmFsdWUx"},
+                        headers={"header1": b"value1"},
                     ),
                 ],
             ),
@@ -152,11 +152,11 @@ def test_from_message_with_invalid_message(
                 partition=0,
                 records=[
                     RecordContents(
-                        value="test-value", key=None, timestamp=None, headers={}
+                        value=b"test-value", key=None, timestamp=None, headers={}
                     ),
                 ],
             ),
-            b'{"topic": "test-topic", "partition": 0, "records": [{"value": "test-value", "key": null, "timestamp": null, "headers": {}}]}',
+            b'{"topic": "test-topic", "partition": 0, "records": [{"value": "dGVzdC12YWx1ZQ==", "key": null, "timestamp": null, "headers": {}}]}',
         ),
         (
             Produce(
@@ -164,16 +164,45 @@ def test_from_message_with_invalid_message(
                 partition=0,
                 records=[
                     RecordContents(
-                        value="test-value", key=None, timestamp=None, headers={}
+                        value=b"test-value", key=None, timestamp=None, headers={}
                     ),
                     RecordContents(
-                        value="test-value", key=None, timestamp=None, headers={}
+                        value=b"test-value", key=None, timestamp=None, headers={}
                     ),
                 ],
             ),
-            b'{"topic": "test-topic", "partition": 0, "records": [{"value": "test-value", "key": null, "timestamp": null, "headers": {}}, {"value": "test-value", "key": null, "timestamp": null, "headers": {}}]}',
+            b'{"topic": "test-topic", "partition": 0, "records": [{"value": "dGVzdC12YWx1ZQ==", "key": null, "timestamp": null, "headers": {}}, {"value": "dGVzdC12YWx1ZQ==", "key": null, "timestamp": null, "headers": {}}]}',
+        ),
+        (
+            Produce(
+                topic="test-topic",
+                partition=0,
+                producer_id=3,
+                producer_epoch=0,
+                base_sequence=5,
+                records=[
+                    RecordContents(
+                        value=b"test-value", key=None, timestamp=None, headers={}
+                    ),
+                ],
+            ),
+            b'{"topic": "test-topic", "partition": 0, "producer_id": 3, "producer_epoch": 0, "base_sequence": 5, "records": [{"value": "dGVzdC12YWx1ZQ==", "key": null, "timestamp": null, "headers": {}}]}',
         ),
     ],
 )
 def test_serialized(produce_command: Produce, expected: bytes):
     assert produce_command.serialized == expected
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        dict(compression_type="gzip", record_count=0, compressed_records="YQ=="),
+        dict(compression_type="gzip", record_count=1),
+        dict(compression_type="snappy", record_count=1, compressed_records="YQ=="),
+        dict(acks=2, records=[dict(value="YQ==", key=None, timestamp=1, headers={})]),
+    ],
+)
+def test_invalid_produce(params: dict[str, Any]):
+    with pytest.raises(pydantic.ValidationError):
+        Produce(topic="topic01", partition=0, **params)
@@ -42,7 +42,7 @@ def test_partition_name(log_record: Record, expected: str):
     "log_record, expected",
     [
         (
-            ("test-topic", 0, "dGVzdC12YWx1ZQ==", None, 1752735958, {}, 0),
+            ("test-topic", 0, b"test-value", None, 1752735958, {}, 0),
             (
                 b"0086{"
                 b'"value":"dGVzdC12YWx1ZQ==",'
@@ -54,7 +54,7 @@ def test_partition_name(log_record: Record, expected: str):
             ),
         ),
         (
-            ("another-topic", 1, b"YW5vdGhlci12YWx1ZQ==", None, 1752735959, {}, 3),
+            ("another-topic", 1, b"another-value", None, 1752735959, {}, 3),
             (
                 b"0090"
                 b"{"
@@ -83,12 +83,12 @@ def recorded(base_log_record: Record, request: pytest.FixtureRequest) -> Record:
     "log_record, offset, recorded",
     [
         (
-            ("test-topic", 0, "dGVzdC12YWx1ZQ==", None, 1752735958, {}, None),
+            ("test-topic", 0, b"test-value", None, 1752735958, {}, None),
             1,
             dict(
                 topic="test-topic",
                 partition=0,
-                value="dGVzdC12YWx1ZQ==",
+                value=b"test-value",
                 key=None,
                 timestamp=1752735958,
                 headers={},
@@ -107,8 +107,8 @@ def test_record_at(log_record: Record, offset: int, recorded: Record):
 @pytest.mark.parametrize(
     "log_record",
     [
-        ("test-topic", 0, "dGVzdC12YWx1ZQ==", None, 1752735958, {}, 0),
-        ("test-topic", 0, "dGVzdC12YWx1ZQ==", None, 1752735958, {}, 1),
+        ("test-topic", 0, b"test-value", None, 1752735958, {}, 0),
+        ("test-topic", 0, b"test-value", None, 1752735958, {}, 1),
     ],
     indirect=True,
 )
@@ -122,8 +122,8 @@ def test_record_at_with_already_recorded(log_record: Record):
 @pytest.mark.parametrize(
     "log_record",
     [
-        ("test-topic", 0, "dGVzdC12YWx1ZQ==", None, 1752735958, {}, None),
-        ("another-topic", 1, "YW5vdGhlci12YWx1ZQ==", None, 1752735959, {}, None),
+        ("test-topic", 0, b"test-value", None, 1752735958, {}, None),
+        ("another-topic", 1, b"another-value", None, 1752735959, {}, None),
     ],
     indirect=True,
 )
@@ -170,13 +170,13 @@ def expected_records(
                 0,
                 [
                     {
-                        "value": "aGVsbG8=",
+                        "value": b"hello",
                         "key": None,
                         "timestamp": 1752735958,
                         "headers": {},
                     },
                     {
-                        "value": "aGVsbG8=",
+                        "value": b"hello",
                         "key": None,
                         "timestamp": 1752735958,
                         "headers": {},
@@ -187,7 +187,7 @@ def expected_records(
                 dict(
                     topic="test-topic",
                     partition=0,
-                    value="aGVsbG8=",
+                    value=b"hello",
                     key=None,
                     timestamp=1752735958,
                     headers={},
@@ -196,7 +196,7 @@ def expected_records(
                 dict(
                     topic="test-topic",
                     partition=0,
-                    value="aGVsbG8=",
+                    value=b"hello",
                     key=None,
                     timestamp=1752735958,
                     headers={},
@@ -217,12 +217,12 @@ def test_from_produce_command(produce_command: Produce, expected_records: list[R
     "log_record, position, expected",
     [
         (
-            ("test-topic", 0, "dGVzdC12YWx1ZQ==", None, 1752735958, {}, 0),
+            ("test-topic", 0, b"test-value", None, 1752735958, {}, 0),
             0,
             b"0000000000000000",
         ),
         (
-            ("another-topic", 1, "YW5vdGhlci12YWx1ZQ==", None, 1752735959, {}, 3),
+            ("another-topic", 1, b"another-value", None, 1752735959, {}, 3),
             100,
             b"0000000300000100",
         ),
@@ -267,7 +267,7 @@ def expected_record(base_log_record: Record, request: pytest.FixtureRequest) ->
             (
                 "test-topic",
                 0,
-                "dGVzdC12YWx1ZQ==",
+                b"test-value",
                 None,
                 1752735958,
                 {},
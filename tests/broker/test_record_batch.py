@@ -0,0 +1,117 @@
+import base64
+import json
+
+import pytest
+
+from kafka import compression
+from kafka.broker.command import Produce, RecordContents
+from kafka.broker.log import Record, RecordBatch, records_from_log
+from kafka.compression import CompressionType
+from kafka.error import InvalidOffsetError, InvalidRecordError
+
+
+@pytest.fixture
+def record_batch(request: pytest.FixtureRequest) -> RecordBatch:
+    compression_type, base_offset = request.param
+    contents = [
+        RecordContents(value="dmFsdWUx", key=None, timestamp=None, headers={}),
+        RecordContents(value="dmFsdWUy", key="a2V5", timestamp=1, headers={}),
+    ]
+    records = json.dumps([c.model_dump(mode="json") for c in contents]).encode()
+    return RecordBatch(
+        topic="topic01",
+        partition=0,
+        base_offset=base_offset,
+        record_count=len(contents),
+        timestamp=1752735958,
+        compression_type=compression_type,
+        records=base64.b64encode(
+            compression.compress(records, compression_type)
+        ).decode(),
+    )
+
+
+@pytest.mark.parametrize(
+    "record_batch",
+    [(CompressionType.GZIP, 10), (CompressionType.LZMA, 10), (CompressionType.BZ2, 10)],
+    indirect=True,
+)
+def test_unpack(record_batch: RecordBatch):
+    """배치 타임스탬프는 타임스탬프가 없는 레코드에만 채워진다"""
+    assert record_batch.unpack() == [
+        Record(
+            topic="topic01",
+            partition=0,
+            value="dmFsdWUx",
+            key=None,
+            timestamp=1752735958,
+            headers={},
+            offset=10,
+        ),
+        Record(
+            topic="topic01",
+            partition=0,
+            value="dmFsdWUy",
+            key="a2V5",
+            timestamp=1,
+            headers={},
+            offset=11,
+        ),
+    ]
+
+
+@pytest.mark.parametrize(
+    "record_batch, update",
+    [
+        ((CompressionType.GZIP, 3), dict(records="bm90IGd6aXA=")),
+        ((CompressionType.LZMA, 3), dict(records="bm90IGx6bWE=")),
+        ((CompressionType.BZ2, 3), dict(records="bm90IGJ6Mg==")),
+        ((CompressionType.GZIP, 3), dict(compression_type=CompressionType.LZMA)),
+        ((CompressionType.GZIP, 3), dict(record_count=1)),
+        ((CompressionType.GZIP, 3), dict(record_count=3)),
+    ],
+    indirect=["record_batch"],
+)
+def test_unpack_invalid_batch(record_batch: RecordBatch, update: dict):
+    """풀 수 없거나 레코드 수가 맞지 않는 배치는 InvalidRecordError로 거부된다"""
+    with pytest.raises(InvalidRecordError):
+        record_batch.model_copy(update=update).unpack()
+
+
+@pytest.mark.parametrize("record_batch", [(CompressionType.GZIP, 3)], indirect=True)
+def test_records_from_log(record_batch: RecordBatch):
+    data = record_batch.bin[4:]
+
+    records = records_from_log(topic="topic01", partition=0, record_data=data)
+
+    assert records == record_batch.unpack()
+
+
+@pytest.mark.parametrize("record_batch", [(CompressionType.GZIP, None)], indirect=True)
+def test_batch_at(record_batch: RecordBatch):
+    with pytest.raises(InvalidOffsetError):
+        _ = record_batch.bin
+
+    assert record_batch.batch_at(5).base_offset == 5
+    assert record_batch.batch_at(5).index_entry(7) == b"0000000500000007"
+
+
+@pytest.mark.parametrize("record_batch", [(CompressionType.GZIP, 3)], indirect=True)
+def test_batch_at_with_already_based(record_batch: RecordBatch):
+    with pytest.raises(InvalidOffsetError):
+        record_batch.batch_at(5)
+
+
+def test_from_produce_command():
+    cmd = Produce(
+        topic="topic01",
+        partition=1,
+        compression_type=CompressionType.GZIP,
+        record_count=3,
+        compressed_records="Y29tcHJlc3NlZA==",
+    )
+
+    batch = RecordBatch.from_produce_command(cmd)
+
+    assert (batch.topic, batch.partition, batch.base_offset) == ("topic01", 1, None)
+    assert (batch.record_count, batch.records) == (3, "Y29tcHJlc3NlZA==")
@@ -0,0 +1,78 @@
+import pytest
+
+from kafka.broker.cache import TailCache
+from kafka.broker.log import Record
+
+
+def records(partition: int, offsets: range) -> list[Record]:
+    return [
+        Record(
+            topic="topic01",
+            partition=partition,
+            value=b"v",
+            key=None,
+            timestamp=1,
+            headers={},
+            offset=offset,
+        )
+        for offset in offsets
+    ]
+
+
+# offsets keep the same width so every record has the same size
+RECORD_SIZE = records(0, range(10, 11))[0].size
+
+
+@pytest.fixture
+def tail_cache() -> TailCache:
+    tail_cache = TailCache(max_bytes=10 * RECORD_SIZE)
+    tail_cache.append(("topic01", 0), records(0, range(10, 15)))
+    return tail_cache
+
+
+@pytest.mark.parametrize(
+    "offset, max_bytes, expected_offsets",
+    [
+        (9, 1000, None),
+        (10, 1000, [10, 11, 12, 13, 14]),
+        (13, 1000, [13, 14]),
+        (15, 1000, None),
+        (10, 2 * RECORD_SIZE, [10, 11]),
+        (10, 1, [10]),
+    ],
+)
+def test_read(
+    tail_cache: TailCache,
+    offset: int,
+    max_bytes: int,
+    expected_offsets: list[int] | None,
+):
+    result = tail_cache.read(("topic01", 0), offset, max_bytes)
+
+    assert result == (
+        None
+        if expected_offsets is None
+        else [
+            r.payload for r in records(0, range(10, 15)) if r.offset in expected_offsets
+        ]
+    )
+
+
+def test_append_evicts_least_recently_used_partition(tail_cache: TailCache):
+    """용량을 넘으면 가장 오래 읽히지 않은 파티션의 오래된 레코드부터 버린다"""
+    tail_cache.append(("topic01", 1), records(1, range(10, 15)))
+    tail_cache.read(("topic01", 0), 10, 1000)
+
+    tail_cache.append(("topic01", 0), records(0, range(15, 17)))
+
+    assert tail_cache.size == 10 * RECORD_SIZE
+    assert len(tail_cache.read(("topic01", 0), 10, 1000)) == 7
+    assert tail_cache.read(("topic01", 1), 11, 1000) is None
+    assert len(tail_cache.read(("topic01", 1), 12, 1000)) == 3
+
+
+def test_drop(tail_cache: TailCache):
+    tail_cache.drop(("topic01", 0))
+
+    assert tail_cache.size == 0
+    assert tail_cache.read(("topic01", 0), 10, 1000) is None
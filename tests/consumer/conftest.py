@@ -0,0 +1,45 @@
+import asyncio
+import functools
+from collections.abc import AsyncGenerator
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+
+from kafka import constants
+from kafka.broker.group import GroupCoordinator
+from kafka.broker.server import handle_client
+from kafka.broker.storage import (
+    FSCommittedOffsetStorage,
+    FSLogStorage,
+    FSProducerStateStorage,
+)
+
+
+@pytest.fixture
+def committed_offset_storage(tmp_path: Path) -> FSCommittedOffsetStorage:
+    return FSCommittedOffsetStorage.load_from_root(tmp_path)
+
+
+@pytest_asyncio.fixture
+async def fs_broker(
+    tmp_path: Path, committed_offset_storage: FSCommittedOffsetStorage
+) -> AsyncGenerator[tuple[str, int, FSLogStorage], None]:
+    log_storage = FSLogStorage.load_from_root(tmp_path, constants.LOG_FILE_SIZE_LIMIT)
+    log_storage.init_topic(topic_name="topic01", num_partitions=2)
+    server = await asyncio.start_server(
+        functools.partial(
+            handle_client,
+            log_storage=log_storage,
+            committed_offset_storage=committed_offset_storage,
+            producer_state_storage=FSProducerStateStorage.load_from_root(tmp_path),
+            group_coordinator=GroupCoordinator(),
+        ),
+        "127.0.0.1",
+        0,
+    )
+    host, port = server.sockets[0].getsockname()
+    yield host, port, log_storage
+    server.close()
+    await server.wait_closed()
+    log_storage.close()
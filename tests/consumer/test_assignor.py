@@ -0,0 +1,108 @@
+import pytest
+
+from kafka.consumer.assignor import (
+    CooperativeStickyAssignor,
+    PartitionAssignor,
+    RangeAssignor,
+    RoundRobinAssignor,
+)
+
+
+@pytest.mark.parametrize(
+    "assignor, partition_counts, subscriptions, expected",
+    [
+        (
+            RangeAssignor(),
+            {"topic01": 3, "topic02": 3},
+            {"m1": ["topic01", "topic02"], "m2": ["topic01", "topic02"]},
+            {
+                "m1": [("topic01", 0), ("topic01", 1), ("topic02", 0), ("topic02", 1)],
+                "m2": [("topic01", 2), ("topic02", 2)],
+            },
+        ),
+        (
+            RangeAssignor(),
+            {"topic01": 2, "topic02": 1},
+            {"m1": ["topic01"], "m2": ["topic01", "topic02"], "m3": ["topic01"]},
+            {
+                "m1": [("topic01", 0)],
+                "m2": [("topic01", 1), ("topic02", 0)],
+                "m3": [],
+            },
+        ),
+        (
+            RoundRobinAssignor(),
+            {"topic01": 3, "topic02": 3},
+            {"m1": ["topic01", "topic02"], "m2": ["topic01", "topic02"]},
+            {
+                "m1": [("topic01", 0), ("topic01", 2), ("topic02", 1)],
+                "m2": [("topic01", 1), ("topic02", 0), ("topic02", 2)],
+            },
+        ),
+        (
+            RoundRobinAssignor(),
+            {"topic01": 2, "topic02": 2},
+            {"m1": ["topic01"], "m2": ["topic01", "topic02"]},
+            {
+                "m1": [("topic01", 0)],
+                "m2": [("topic01", 1), ("topic02", 0), ("topic02", 1)],
+            },
+        ),
+    ],
+)
+def test_assign(
+    assignor: PartitionAssignor,
+    partition_counts: dict[str, int],
+    subscriptions: dict[str, list[str]],
+    expected: dict[str, list[tuple[str, int]]],
+):
+    assert assignor.assign(partition_counts, subscriptions) == expected
+
+
+@pytest.mark.parametrize(
+    "partition_counts, subscriptions, owned_partitions, expected",
+    [
+        (
+            {"topic01": 4},
+            {"m1": ["topic01"], "m2": ["topic01"]},
+            {},
+            {
+                "m1": [("topic01", 0), ("topic01", 2)],
+                "m2": [("topic01", 1), ("topic01", 3)],
+            },
+        ),
+        (
+            {"topic01": 4},
+            {"m1": ["topic01"], "m2": ["topic01"]},
+            {"m1": [("topic01", p) for p in range(4)]},
+            {"m1": [("topic01", 0), ("topic01", 1)], "m2": []},
+        ),
+        (
+            {"topic01": 4},
+            {"m1": ["topic01"], "m2": ["topic01"]},
+            {"m1": [("topic01", 0), ("topic01", 1)]},
+            {
+                "m1": [("topic01", 0), ("topic01", 1)],
+                "m2": [("topic01", 2), ("topic01", 3)],
+            },
+        ),
+        (
+            {"topic01": 3},
+            {"m1": ["topic01"], "m3": ["topic01"]},
+            {"m1": [("topic01", 0)], "m3": [("topic01", 2)]},
+            {"m1": [("topic01", 0), ("topic01", 1)], "m3": [("topic01", 2)]},
+        ),
+    ],
+)
+def test_cooperative_sticky_assign(
+    partition_counts: dict[str, int],
+    subscriptions: dict[str, list[str]],
+    owned_partitions: dict[str, list[tuple[str, int]]],
+    expected: dict[str, list[tuple[str, int]]],
+):
+    """소유한 파티션은 유지하고, 다른 멤버가 아직 소유한 파티션은 다음 리밸런스로 미룬다"""
+    assignor = CooperativeStickyAssignor()
+
+    assert (
+        assignor.assign(partition_counts, subscriptions, owned_partitions) == expected
+    )
@@ -0,0 +1,178 @@
+import asyncio
+import json
+from unittest import mock
+
+import pytest
+
+from kafka import constants
+from kafka.broker import (
+    OffsetCommitResponse,
+    OffsetFetchResponse,
+    PartitionOffset,
+    PartitionResult,
+)
+from kafka.connection import BrokerConnection
+from kafka.consumer.coordinator import ConsumerCoordinator
+from kafka.dispatcher import ResponseDispatcher
+from kafka.error import PartitionNotFoundError
+
+
+@pytest.fixture
+def coordinator() -> ConsumerCoordinator:
+    conn = mock.Mock(spec=BrokerConnection)
+    conn.send = mock.AsyncMock()
+    correlation_ids = iter(range(1, 1000))
+    return ConsumerCoordinator(
+        conn=conn,
+        correlation_id_factory=lambda: next(correlation_ids),
+        response_dispatcher=mock.Mock(spec=ResponseDispatcher),
+        group_id="group01",
+    )
+
+
+def commit_response(failed: set[tuple[str, int]], payload: bytes) -> bytes:
+    topics = json.loads(payload[constants.HEADER_WIDTH :])["topics"]
+    return (
+        OffsetCommitResponse(
+            topics=[
+                PartitionResult(
+                    topic=t["topic"],
+                    partition=t["partition"],
+                    error_code=21 if (t["topic"], t["partition"]) in failed else 0,
+                )
+                for t in topics
+            ]
+        )
+        .model_dump_json()
+        .encode("utf-8")
+    )
+
+
+@pytest.mark.asyncio
+async def test_commit_async_skips_unchanged_offsets(coordinator: ConsumerCoordinator):
+    (future,) = await coordinator.commit_async({("topic01", 0): 3, ("topic01", 1): 1})
+    future.set_result(commit_response(set(), coordinator.conn.send.await_args.args[0]))
+
+    unchanged = await coordinator.commit_async({("topic01", 0): 3, ("topic01", 1): 1})
+    (changed,) = await coordinator.commit_async({("topic01", 0): 5, ("topic01", 1): 1})
+
+    assert unchanged == []
+    assert coordinator.conn.send.await_count == 2
+    assert json.loads(
+        coordinator.conn.send.await_args.args[0][constants.HEADER_WIDTH :]
+    ) == {
+        "group_id": "group01",
+        "topics": [{"topic": "topic01", "partition": 0, "offset": 5}],
+    }
+
+
+@pytest.mark.asyncio
+async def test_failed_commit_is_resent(coordinator: ConsumerCoordinator):
+    offsets = {("topic01", 0): 3, ("topic01", 1): 1}
+    (future,) = await coordinator.commit_async(offsets)
+    future.set_result(
+        commit_response({("topic01", 1)}, coordinator.conn.send.await_args.args[0])
+    )
+    await asyncio.sleep(0)
+
+    await coordinator.commit_async(offsets)
+
+    assert coordinator.committed == offsets
+    assert json.loads(
+        coordinator.conn.send.await_args.args[0][constants.HEADER_WIDTH :]
+    )["topics"] == [{"topic": "topic01", "partition": 1, "offset": 1}]
+
+
+@pytest.mark.asyncio
+async def test_commit_raises_partition_error(coordinator: ConsumerCoordinator):
+    async def _respond() -> None:
+        while not coordinator.dispatcher.link.called:
+            await asyncio.sleep(0)
+        coordinator.dispatcher.link.call_args.kwargs["future"].set_result(
+            commit_response({("topic01", 0)}, coordinator.conn.send.await_args.args[0])
+        )
+
+    responder = asyncio.create_task(_respond())
+    with pytest.raises(PartitionNotFoundError):
+        await coordinator.commit({("topic01", 0): 3})
+    await responder
+
+
+@pytest.mark.asyncio
+async def test_commit_async_splits_large_request(coordinator: ConsumerCoordinator):
+    offsets = {("topic01", partition): 100 for partition in range(500)}
+
+    futures = await coordinator.commit_async(offsets)
+
+    payloads = [c.args[0] for c in coordinator.conn.send.await_args_list]
+    assert len(futures) == len(payloads) > 1
+    assert all(
+        len(payload) - constants.HEADER_WIDTH <= constants.PAYLOAD_SIZE_LIMIT
+        for payload in payloads
+    )
+    assert sum(
+        len(json.loads(payload[constants.HEADER_WIDTH :])["topics"])
+        for payload in payloads
+    ) == len(offsets)
+
+
+def offset_fetch_response(
+    committed: dict[tuple[str, int], int], payload: bytes
+) -> bytes:
+    partitions = json.loads(payload[constants.HEADER_WIDTH :])["partitions"]
+    return (
+        OffsetFetchResponse(
+            topics=[
+                PartitionOffset(
+                    topic=p["topic"],
+                    partition=p["partition"],
+                    offset=committed.get(
+                        (p["topic"], p["partition"]), constants.NO_COMMITTED_OFFSET
+                    ),
+                )
+                for p in partitions
+            ],
+            error_code=0,
+        )
+        .model_dump_json()
+        .encode("utf-8")
+    )
+
+
+async def respond_to_offset_fetches(
+    coordinator: ConsumerCoordinator, committed: dict[tuple[str, int], int]
+) -> None:
+    answered = 0
+    while True:
+        calls = coordinator.dispatcher.link.call_args_list
+        payloads = coordinator.conn.send.await_args_list
+        for call, payload in list(zip(calls, payloads))[answered:]:
+            call.kwargs["future"].set_result(
+                offset_fetch_response(committed, payload.args[0])
+            )
+            answered += 1
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("num_partitions", [2, 500])
+async def test_fetch_committed(coordinator: ConsumerCoordinator, num_partitions: int):
+    """커밋된 오프셋이 없는 파티션은 결과에서 빠진다"""
+    partitions = [("topic01", partition) for partition in range(num_partitions)]
+    committed = {("topic01", 0): 3}
+    responder = asyncio.create_task(respond_to_offset_fetches(coordinator, committed))
+
+    result = await coordinator.fetch_committed(partitions)
+    responder.cancel()
+
+    payloads = [c.args[0] for c in coordinator.conn.send.await_args_list]
+    assert result == committed
+    assert coordinator.committed == committed
+    assert all(
+        len(offset_fetch_response({}, payload)) <= constants.PAYLOAD_SIZE_LIMIT
+        for payload in payloads
+    )
+    assert sum(
+        len(json.loads(payload[constants.HEADER_WIDTH :])["partitions"])
+        for payload in payloads
+    ) == len(partitions)
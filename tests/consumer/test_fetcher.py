@@ -0,0 +1,130 @@
+import asyncio
+from unittest import mock
+
+import pytest
+
+from kafka.broker import FetchResponse
+from kafka.connection import BrokerConnection
+from kafka.consumer.fetcher import Fetcher
+from kafka.dispatcher import ResponseDispatcher
+from kafka.error import InvalidOffsetError
+
+
+@pytest.fixture
+def fetcher() -> Fetcher:
+    conn = mock.Mock(spec=BrokerConnection)
+    conn.send = mock.AsyncMock()
+    correlation_ids = iter(range(1, 100))
+    return Fetcher(
+        conn=conn,
+        correlation_id_factory=lambda: next(correlation_ids),
+        response_dispatcher=mock.Mock(spec=ResponseDispatcher),
+        max_partition_fetch_bytes=10,
+        fetch_min_bytes=1,
+        fetch_max_wait_ms=100,
+    )
+
+
+def linked_futures(fetcher: Fetcher) -> list[asyncio.Future[bytes]]:
+    return [c.kwargs["future"] for c in fetcher.dispatcher.link.call_args_list]
+
+
+def fetch_response(offsets: list[int], value: str = "YWJj") -> bytes:
+    return (
+        FetchResponse.model_validate(
+            dict(
+                topic="topic01",
+                partition=0,
+                error_code=0,
+                records=[
+                    dict(value=value, key=None, timestamp=1, headers={}, offset=offset)
+                    for offset in offsets
+                ],
+            )
+        )
+        .model_dump_json()
+        .encode("utf-8")
+    )
+
+
+@pytest.mark.asyncio
+async def test_send_fetches_until_buffer_is_full(fetcher: Fetcher):
+    """버퍼가 가득 찬 파티션은 애플리케이션이 레코드를 가져갈 때까지 더 가져오지 않는다"""
+    fetcher.assign({("topic01", 0): 0})
+
+    await fetcher.send_fetches()
+    await fetcher.send_fetches()
+    linked_futures(fetcher)[0].set_result(fetch_response([0, 1, 2, 3]))
+    await asyncio.sleep(0)
+    await fetcher.send_fetches()
+
+    state = fetcher.partitions[("topic01", 0)]
+    assert fetcher.conn.send.await_count == 1
+    assert (state.buffered_bytes, state.fetch_offset) == (12, 4)
+    assert fetcher.next_fetch_delay() is None
+
+
+@pytest.mark.asyncio
+async def test_drain_frees_buffer_for_prefetch(fetcher: Fetcher):
+    fetcher.assign({("topic01", 0): 0})
+    await fetcher.send_fetches()
+    linked_futures(fetcher)[0].set_result(fetch_response([0, 1, 2, 3]))
+    await asyncio.sleep(0)
+
+    drained = fetcher.drain(max_records=2)
+    await fetcher.send_fetches()
+
+    assert [rec.offset for _, rec in drained] == [0, 1]
+    assert fetcher.partitions[("topic01", 0)].position == 2
+    assert fetcher.conn.send.await_count == 2
+    assert b'"offset":4' in fetcher.conn.send.await_args.args[0]
+
+
+@pytest.mark.asyncio
+async def test_seek_drops_in_flight_response(fetcher: Fetcher):
+    fetcher.assign({("topic01", 0): 0})
+    await fetcher.send_fetches()
+
+    fetcher.seek(("topic01", 0), 10)
+    linked_futures(fetcher)[0].set_result(fetch_response([0, 1]))
+    await asyncio.sleep(0)
+
+    state = fetcher.partitions[("topic01", 0)]
+    assert fetcher.drain(max_records=10) == []
+    assert (state.position, state.fetch_offset, state.in_flight) == (10, 10, False)
+
+
+@pytest.mark.asyncio
+async def test_empty_fetch_backs_off(fetcher: Fetcher):
+    """로그 끝에 도달하면 fetch_max_wait_ms 동안 다시 가져오지 않는다"""
+    fetcher.assign({("topic01", 0): 0})
+    await fetcher.send_fetches()
+
+    linked_futures(fetcher)[0].set_result(fetch_response([]))
+    await asyncio.sleep(0)
+    await fetcher.send_fetches()
+
+    assert fetcher.conn.send.await_count == 1
+    assert 0 < fetcher.next_fetch_delay() <= 0.1
+
+
+@pytest.mark.asyncio
+async def test_drain_raises_fetch_error(fetcher: Fetcher):
+    fetcher.assign({("topic01", 0): 0})
+    await fetcher.send_fetches()
+    linked_futures(fetcher)[0].set_result(
+        FetchResponse(
+            topic="topic01",
+            partition=0,
+            error_code=20,
+            error_message="invalid offset",
+            records=[],
+        )
+        .model_dump_json()
+        .encode("utf-8")
+    )
+    await asyncio.sleep(0)
+
+    with pytest.raises(InvalidOffsetError):
+        fetcher.drain(max_records=10)
+    assert fetcher.drain(max_records=10) == []
@@ -0,0 +1,468 @@
+import asyncio
+import itertools
+import pickle
+from collections.abc import AsyncGenerator
+from typing import Any
+from unittest import mock
+
+import pytest
+import pytest_asyncio
+
+from kafka import serialization
+from kafka.broker.log import CommittedOffset, Record
+from kafka.broker.storage import (
+    FSCommittedOffsetStorage,
+    FSLogStorage,
+)
+from kafka.consumer.assignor import CooperativeStickyAssignor
+from kafka.consumer.client import KafkaConsumer
+from kafka.error import KafkaError, PartitionNotFoundError
+
+
+def append_records(
+    log_storage: FSLogStorage, topic: str, partition: int, values: list[bytes]
+) -> None:
+    for value in values:
+        log_storage.append_log(
+            Record(
+                topic=topic,
+                partition=partition,
+                value=value,
+                key=b"key",
+                timestamp=1752735958,
+                headers={"h1": b"v1"},
+                offset=None,
+            )
+        )
+
+
+@pytest_asyncio.fixture
+async def consumer(
+    fs_broker: tuple[str, int, FSLogStorage], request: pytest.FixtureRequest
+) -> AsyncGenerator[KafkaConsumer, None]:
+    host, port, _ = fs_broker
+    correlation_ids = itertools.count(1)
+    consumer = KafkaConsumer(
+        broker_host=host,
+        broker_port=port,
+        correlation_id_factory=lambda: next(correlation_ids),
+        fetch_max_wait_ms=10,
+        **getattr(request, "param", {}),
+    )
+    consumer.run_loop()
+    while not consumer.is_connected:
+        await asyncio.sleep(0.01)
+    yield consumer
+    await consumer.close()
+
+
+async def poll_until(
+    consumer: KafkaConsumer, count: int, max_records: int = 500
+) -> list[Any]:
+    records = []
+    while len(records) < count:
+        records.extend(await consumer.poll(timeout_ms=1000, max_records=max_records))
+    return records
+
+
+@pytest.mark.asyncio
+async def test_poll(consumer: KafkaConsumer, fs_broker: tuple[str, int, FSLogStorage]):
+    _, _, log_storage = fs_broker
+    append_records(log_storage, "topic01", 0, [b"a", b"b"])
+    append_records(log_storage, "topic01", 1, [b"c"])
+    consumer.assign([("topic01", 0), ("topic01", 1)])
+
+    records = await asyncio.wait_for(poll_until(consumer, 3), timeout=1)
+
+    assert sorted((r.partition, r.offset, r.value) for r in records) == [
+        (0, 0, b"a"),
+        (0, 1, b"b"),
+        (1, 0, b"c"),
+    ]
+    assert (records[0].key, records[0].headers) == (b"key", {"h1": b"v1"})
+    assert consumer.position(("topic01", 0)) == 2
+    assert consumer.position(("topic01", 1)) == 1
+
+
+@pytest.mark.asyncio
+async def test_poll_records_appended_later(
+    consumer: KafkaConsumer, fs_broker: tuple[str, int, FSLogStorage]
+):
+    """로그 끝에 도달한 파티션도 새로 추가된 레코드를 이어서 가져온다"""
+    _, _, log_storage = fs_broker
+    consumer.assign([("topic01", 0)])
+
+    empty = await consumer.poll(timeout_ms=50)
+    append_records(log_storage, "topic01", 0, [b"late"])
+    records = await asyncio.wait_for(poll_until(consumer, 1), timeout=1)
+
+    assert empty == []
+    assert [(r.offset, r.value) for r in records] == [(0, b"late")]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "consumer", [dict(max_partition_fetch_bytes=100)], indirect=True
+)
+async def test_poll_prefetches_next_records(
+    consumer: KafkaConsumer, fs_broker: tuple[str, int, FSLogStorage]
+):
+    """애플리케이션이 레코드를 처리하는 동안 다음 레코드를 미리 가져온다"""
+    _, _, log_storage = fs_broker
+    append_records(log_storage, "topic01", 0, [b"x" * 30 for _ in range(10)])
+    consumer.assign([("topic01", 0)])
+
+    first = await asyncio.wait_for(poll_until(consumer, 1, max_records=1), timeout=1)
+    state = consumer._fetcher.partitions[("topic01", 0)]
+
+    async def _prefetched() -> None:
+        while not state.records:
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(_prefetched(), timeout=1)
+
+    assert [r.offset for r in first] == [0]
+    assert state.position == 1
+    assert state.fetch_offset > state.position
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_records", [1, 3])
+async def test_poll_with_max_records(
+    consumer: KafkaConsumer,
+    fs_broker: tuple[str, int, FSLogStorage],
+    max_records: int,
+):
+    _, _, log_storage = fs_broker
+    append_records(log_storage, "topic01", 0, [b"a", b"b", b"c", b"d"])
+    consumer.assign([("topic01", 0)])
+
+    records = await asyncio.wait_for(
+        poll_until(consumer, 1, max_records=max_records), timeout=1
+    )
+
+    assert len(records) <= max_records
+    assert consumer.position(("topic01", 0)) == records[-1].offset + 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "consumer",
+    [dict(value_deserializer=mock.Mock(side_effect=bytes.upper))],
+    indirect=True,
+)
+async def test_poll_deserializes_value_on_access(
+    consumer: KafkaConsumer, fs_broker: tuple[str, int, FSLogStorage]
+):
+    """값은 애플리케이션이 읽을 때 한 번만 역직렬화한다"""
+    _, _, log_storage = fs_broker
+    append_records(log_storage, "topic01", 0, [b"a", b"b"])
+    consumer.assign([("topic01", 0)])
+
+    records = await asyncio.wait_for(poll_until(consumer, 2), timeout=1)
+
+    assert [(r.offset, r.key) for r in records] == [(0, b"key"), (1, b"key")]
+    consumer.value_deserializer.assert_not_called()
+    assert records[1].value == records[1].value == b"B"
+    consumer.value_deserializer.assert_called_once_with(b"b")
+    unpickled = pickle.loads(pickle.dumps(records[0]))
+    assert (unpickled.value, unpickled.headers) == (b"A", {"h1": b"v1"})
+    assert unpickled == records[0]
+
+
+@pytest.mark.asyncio
+async def test_seek(consumer: KafkaConsumer, fs_broker: tuple[str, int, FSLogStorage]):
+    _, _, log_storage = fs_broker
+    append_records(log_storage, "topic01", 0, [b"a", b"b", b"c"])
+    consumer.assign([("topic01", 0)])
+    await asyncio.wait_for(poll_until(consumer, 3), timeout=1)
+
+    consumer.seek(("topic01", 0), 1)
+    records = await asyncio.wait_for(poll_until(consumer, 2), timeout=1)
+
+    assert [r.value for r in records] == [b"b", b"c"]
+    assert consumer.position(("topic01", 0)) == 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "consumer",
+    [
+        dict(
+            key_deserializer=serialization.string_deserializer(),
+            value_deserializer=lambda data: int(data),
+        )
+    ],
+    indirect=True,
+)
+async def test_poll_with_deserializers(
+    consumer: KafkaConsumer, fs_broker: tuple[str, int, FSLogStorage]
+):
+    _, _, log_storage = fs_broker
+    append_records(log_storage, "topic01", 0, [b"42"])
+    consumer.assign([("topic01", 0)])
+
+    (rec,) = await asyncio.wait_for(poll_until(consumer, 1), timeout=1)
+
+    assert (rec.key, rec.value) == ("key", 42)
+
+
+@pytest.mark.asyncio
+async def test_poll_unknown_partition(consumer: KafkaConsumer):
+    consumer.assign([("topic01", 5)])
+
+    with pytest.raises(PartitionNotFoundError):
+        await asyncio.wait_for(poll_until(consumer, 1), timeout=1)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "consumer",
+    [dict(group_id="group01", auto_commit_interval_ms=50)],
+    indirect=True,
+)
+async def test_auto_commit(
+    consumer: KafkaConsumer,
+    fs_broker: tuple[str, int, FSLogStorage],
+    committed_offset_storage: FSCommittedOffsetStorage,
+):
+    """자동 커밋은 모든 파티션의 위치를 하나의 요청으로 주기적으로 커밋한다"""
+    _, _, log_storage = fs_broker
+    append_records(log_storage, "topic01", 0, [b"a", b"b"])
+    append_records(log_storage, "topic01", 1, [b"c"])
+    consumer.assign([("topic01", 0), ("topic01", 1)])
+    await asyncio.wait_for(poll_until(consumer, 3), timeout=1)
+
+    with mock.patch.object(
+        committed_offset_storage,
+        "commit",
+        wraps=committed_offset_storage.commit,
+    ) as commit:
+
+        async def _committed() -> None:
+            while commit.call_count == 0:
+                await asyncio.sleep(0.01)
+
+        await asyncio.wait_for(_committed(), timeout=1)
+        await asyncio.sleep(0.1)
+
+    assert commit.call_count == 1
+    assert committed_offset_storage.cache == {
+        ("group01", "topic01", 0): 2,
+        ("group01", "topic01", 1): 1,
+    }
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "consumer",
+    [dict(group_id="group01", auto_commit_interval_ms=60_000)],
+    indirect=True,
+)
+async def test_close_commits_positions(
+    consumer: KafkaConsumer,
+    fs_broker: tuple[str, int, FSLogStorage],
+    committed_offset_storage: FSCommittedOffsetStorage,
+):
+    _, _, log_storage = fs_broker
+    append_records(log_storage, "topic01", 0, [b"a", b"b"])
+    consumer.assign([("topic01", 0)])
+    await asyncio.wait_for(poll_until(consumer, 2), timeout=1)
+
+    await consumer.close()
+
+    assert committed_offset_storage.cache == {("group01", "topic01", 0): 2}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "consumer",
+    [dict(group_id="group01", auto_commit_interval_ms=60_000)],
+    indirect=True,
+)
+async def test_close_after_failed_commit(
+    consumer: KafkaConsumer, fs_broker: tuple[str, int, FSLogStorage]
+):
+    """마지막 커밋이 실패해도 그룹을 떠나고 백그라운드 작업을 멈춘 뒤 오류를 낸다"""
+    _, _, log_storage = fs_broker
+    append_records(log_storage, "topic01", 0, [b"a", b"b"])
+    consumer.assign([("topic01", 0)])
+    await asyncio.wait_for(poll_until(consumer, 2), timeout=1)
+    await consumer.commit()
+    consumer.seek(("topic01", 0), 0)
+    loop_task = consumer._loop_task
+
+    with mock.patch.object(
+        consumer._coordinator,
+        "leave_group",
+        wraps=consumer._coordinator.leave_group,
+    ) as leave_group:
+        with pytest.raises(KafkaError):
+            await consumer.close()
+
+    assert leave_group.call_count == 1
+    assert loop_task.done()
+    assert consumer._loop_task is None
+
+
+@pytest.mark.asyncio
+async def test_commit_without_group_id(consumer: KafkaConsumer):
+    consumer.assign([("topic01", 0)])
+
+    with pytest.raises(ValueError):
+        await consumer.commit()
+
+
+def test_seek_unassigned_partition():
+    consumer = KafkaConsumer(
+        broker_host="localhost", broker_port=9092, correlation_id_factory=lambda: 1
+    )
+    consumer.assign([("topic01", 0)])
+
+    with pytest.raises(ValueError):
+        consumer.seek(("topic01", 1), 0)
+
+
+@pytest.mark.parametrize("max_partition_fetch_bytes", [0, 10_000])
+def test_init_with_invalid_max_partition_fetch_bytes(max_partition_fetch_bytes: int):
+    with pytest.raises(ValueError):
+        KafkaConsumer(
+            broker_host="localhost",
+            broker_port=9092,
+            correlation_id_factory=lambda: 1,
+            max_partition_fetch_bytes=max_partition_fetch_bytes,
+        )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "consumer",
+    [dict(group_id="group01", auto_commit_interval_ms=60_000)],
+    indirect=True,
+)
+async def test_assign_resumes_from_committed_offsets(
+    consumer: KafkaConsumer,
+    fs_broker: tuple[str, int, FSLogStorage],
+    committed_offset_storage: FSCommittedOffsetStorage,
+):
+    """커밋된 오프셋이 있는 파티션은 그 위치부터, 없는 파티션은 처음부터 읽는다"""
+    _, _, log_storage = fs_broker
+    append_records(log_storage, "topic01", 0, [b"a", b"b", b"c"])
+    append_records(log_storage, "topic01", 1, [b"d"])
+    committed_offset_storage.update(
+        CommittedOffset(group_id="group01", topic="topic01", partition=0, offset=2)
+    )
+    consumer.assign([("topic01", 0), ("topic01", 1)])
+
+    records = await asyncio.wait_for(poll_until(consumer, 2), timeout=1)
+
+    assert sorted((r.partition, r.offset, r.value) for r in records) == [
+        (0, 2, b"c"),
+        (1, 0, b"d"),
+    ]
+    assert consumer.position(("topic01", 0)) == 3
+
+
+@pytest.mark.asyncio
+async def test_subscribe_spreads_partitions(fs_broker: tuple[str, int, FSLogStorage]):
+    """같은 그룹의 컨슈머가 늘고 줄면 파티션이 자동으로 다시 분배된다"""
+    host, port, log_storage = fs_broker
+    append_records(log_storage, "topic01", 0, [b"a"])
+    append_records(log_storage, "topic01", 1, [b"b"])
+    correlation_ids = itertools.count(1)
+    consumers = [
+        KafkaConsumer(
+            broker_host=host,
+            broker_port=port,
+            correlation_id_factory=lambda: next(correlation_ids),
+            fetch_max_wait_ms=10,
+            group_id="group01",
+            heartbeat_interval_ms=20,
+            retry_backoff_ms=10,
+        )
+        for _ in range(2)
+    ]
+    for consumer in consumers:
+        consumer.run_loop()
+        while not consumer.is_connected:
+            await asyncio.sleep(0.01)
+        consumer.subscribe(["topic01"])
+
+    async def _assigned(expected: set[tuple[str, int]]) -> None:
+        # every consumer owns a share and together they own every partition
+        while not (
+            all(c.assignment() for c in consumers)
+            and set().union(*(c.assignment() for c in consumers)) == expected
+            and sum(len(c.assignment()) for c in consumers) == len(expected)
+        ):
+            await asyncio.sleep(0.01)
+
+    try:
+        await asyncio.wait_for(_assigned({("topic01", 0), ("topic01", 1)}), timeout=2)
+        records = [
+            await asyncio.wait_for(poll_until(consumer, 1), timeout=1)
+            for consumer in consumers
+        ]
+        await consumers.pop().close()
+        await asyncio.wait_for(_assigned({("topic01", 0), ("topic01", 1)}), timeout=2)
+    finally:
+        for consumer in consumers:
+            await consumer.close()
+
+    assert sorted(r.value for recs in records for r in recs) == [b"a", b"b"]
+
+
+@pytest.mark.asyncio
+async def test_cooperative_rebalance_keeps_retained_partitions(
+    fs_broker: tuple[str, int, FSLogStorage],
+):
+    """협력적 리밸런스는 이동하는 파티션만 반납하고 나머지의 프리페치 상태를 유지한다"""
+    host, port, _ = fs_broker
+    correlation_ids = itertools.count(1)
+    consumers = [
+        KafkaConsumer(
+            broker_host=host,
+            broker_port=port,
+            correlation_id_factory=lambda: next(correlation_ids),
+            fetch_max_wait_ms=10,
+            group_id="group01",
+            heartbeat_interval_ms=20,
+            retry_backoff_ms=10,
+            partition_assignors=[CooperativeStickyAssignor()],
+        )
+        for _ in range(2)
+    ]
+
+    async def _assigned(expected: list[int]) -> None:
+        while [len(c.assignment()) for c in consumers] != expected:
+            await asyncio.sleep(0.01)
+
+    async def _fetching(consumer: KafkaConsumer) -> None:
+        while set(consumer._fetcher.partitions) != consumer.assignment():
+            await asyncio.sleep(0.01)
+
+    try:
+        first, second = consumers
+        first.run_loop()
+        while not first.is_connected:
+            await asyncio.sleep(0.01)
+        first.subscribe(["topic01"])
+        await asyncio.wait_for(_assigned([2, 0]), timeout=2)
+        await asyncio.wait_for(_fetching(first), timeout=1)
+        states = dict(first._fetcher.partitions)
+
+        with mock.patch.object(first, "_revoke", wraps=first._revoke) as revoke:
+            second.run_loop()
+            while not second.is_connected:
+                await asyncio.sleep(0.01)
+            second.subscribe(["topic01"])
+            await asyncio.wait_for(_assigned([1, 1]), timeout=2)
+
+        (retained,) = first.assignment()
+        (moved,) = second.assignment()
+        assert retained != moved
+        assert revoke.call_args_list == [mock.call([moved])]
+        assert first._fetcher.partitions[retained] is states[retained]
+    finally:
+        for consumer in consumers:
+            await consumer.close()
@@ -0,0 +1,196 @@
+import asyncio
+import concurrent.futures
+import itertools
+import threading
+from collections.abc import AsyncGenerator
+
+import pytest
+import pytest_asyncio
+
+from kafka.broker.log import Record
+from kafka.broker.storage import FSCommittedOffsetStorage, FSLogStorage
+from kafka.consumer.client import KafkaConsumer
+from kafka.consumer.parallel import OffsetTracker, ParallelConsumer, ProcessingOrder
+from kafka.record import ConsumerRecord
+
+
+def append(
+    log_storage: FSLogStorage, partition: int, entries: list[tuple[bytes, bytes]]
+) -> None:
+    for key, value in entries:
+        log_storage.append_log(
+            Record(
+                topic="topic01",
+                partition=partition,
+                value=value,
+                key=key,
+                timestamp=1752735958,
+                headers={},
+                offset=None,
+            )
+        )
+
+
+@pytest_asyncio.fixture
+async def consumer(
+    fs_broker: tuple[str, int, FSLogStorage],
+) -> AsyncGenerator[KafkaConsumer, None]:
+    host, port, _ = fs_broker
+    correlation_ids = itertools.count(1)
+    consumer = KafkaConsumer(
+        broker_host=host,
+        broker_port=port,
+        correlation_id_factory=lambda: next(correlation_ids),
+        fetch_max_wait_ms=10,
+        group_id="group01",
+        enable_auto_commit=False,
+    )
+    consumer.run_loop()
+    while not consumer.is_connected:
+        await asyncio.sleep(0.01)
+    consumer.assign([("topic01", 0), ("topic01", 1)])
+    yield consumer
+    await consumer.close()
+
+
+async def wait_until(predicate, timeout: float = 2) -> None:
+    async def _wait() -> None:
+        while not predicate():
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(_wait(), timeout=timeout)
+
+
+@pytest.mark.parametrize(
+    "completed, expected",
+    [
+        ([], None),
+        ([1, 2], None),
+        ([0, 2], 1),
+        ([2, 0, 1], 3),
+        ([0, 1, 2, 3, 4], 5),
+    ],
+)
+def test_offset_tracker(completed: list[int], expected: int | None):
+    tracker = OffsetTracker()
+    for offset in range(5):
+        tracker.track(offset)
+
+    for offset in completed:
+        tracker.complete(offset)
+
+    assert tracker.committable == expected
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "ordering, expected_max_concurrency",
+    [(ProcessingOrder.PARTITION, 2), (ProcessingOrder.KEY, 4)],
+)
+async def test_run_keeps_order(
+    consumer: KafkaConsumer,
+    fs_broker: tuple[str, int, FSLogStorage],
+    ordering: ProcessingOrder,
+    expected_max_concurrency: int,
+):
+    """순서 키가 같은 레코드는 순서대로, 다른 레코드는 동시에 처리한다"""
+    _, _, log_storage = fs_broker
+    for partition in range(2):
+        append(log_storage, partition, [(b"k1", b"0"), (b"k2", b"1")] * 3)
+    processed: list[tuple[int, bytes, int]] = []
+    running = 0
+    max_running = 0
+
+    async def handler(rec: ConsumerRecord) -> None:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        processed.append((rec.partition, rec.key, rec.offset))
+        running -= 1
+
+    parallel = ParallelConsumer(consumer, handler, ordering=ordering)
+    parallel.run_loop()
+    await wait_until(lambda: len(processed) == 12)
+    await parallel.close()
+
+    assert max_running == expected_max_concurrency
+    for partition, key in itertools.product(range(2), [b"k1", b"k2"]):
+        offsets = [o for p, k, o in processed if (p, k) == (partition, key)]
+        assert offsets == sorted(offsets)
+    if ordering == ProcessingOrder.PARTITION:
+        for partition in range(2):
+            offsets = [o for p, _, o in processed if p == partition]
+            assert offsets == list(range(6))
+
+
+@pytest.mark.asyncio
+async def test_commit_up_to_contiguous_offset(
+    consumer: KafkaConsumer,
+    fs_broker: tuple[str, int, FSLogStorage],
+    committed_offset_storage: FSCommittedOffsetStorage,
+):
+    """완료되지 않은 레코드가 있으면 그 앞까지만 커밋한다"""
+    _, _, log_storage = fs_broker
+    append(log_storage, 0, [(b"k1", b"a"), (b"k2", b"b"), (b"k3", b"c")])
+    release = threading.Event()
+    done: list[int] = []
+
+    def handler(rec: ConsumerRecord) -> None:
+        if rec.offset == 1:
+            release.wait(timeout=2)
+        done.append(rec.offset)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        parallel = ParallelConsumer(
+            consumer,
+            handler,
+            ordering=ProcessingOrder.KEY,
+            executor=executor,
+            commit_interval_ms=20,
+        )
+        parallel.run_loop()
+        await wait_until(lambda: sorted(done) == [0, 2])
+        await wait_until(
+            lambda: committed_offset_storage.cache.get(("group01", "topic01", 0)) == 1
+        )
+        committable = parallel.committable()
+        release.set()
+        await parallel.close()
+
+    assert committable == {("topic01", 0): 1}
+    assert committed_offset_storage.cache == {("group01", "topic01", 0): 3}
+
+
+@pytest.mark.asyncio
+async def test_run_raises_handler_error(
+    consumer: KafkaConsumer, fs_broker: tuple[str, int, FSLogStorage]
+):
+    _, _, log_storage = fs_broker
+    append(log_storage, 0, [(b"k1", b"a"), (b"k1", b"b")])
+    handled: list[int] = []
+
+    async def handler(rec: ConsumerRecord) -> None:
+        if rec.offset == 0:
+            raise RuntimeError("boom")
+        handled.append(rec.offset)
+
+    parallel = ParallelConsumer(consumer, handler)
+
+    with pytest.raises(RuntimeError):
+        await asyncio.wait_for(parallel.run(), timeout=2)
+    await parallel.close()
+    assert handled == []
+    assert parallel.committable() == {}
+
+
+def test_init_with_auto_commit():
+    consumer = KafkaConsumer(
+        broker_host="localhost",
+        broker_port=9092,
+        correlation_id_factory=lambda: 1,
+        group_id="group01",
+    )
+
+    with pytest.raises(ValueError):
+        ParallelConsumer(consumer, lambda rec: None)
@@ -26,7 +26,7 @@ def base_create_topics(base_create_topic: CreateTopic) -> CreateTopics:
 @pytest.fixture
 def base_record_contents() -> RecordContents:
     return RecordContents(
-        value="test-value",
+        value=b"test-value",
         key=None,
         timestamp=None,
         headers={},
@@ -8,7 +8,7 @@ def base_log_record() -> Record:
     return Record(
         topic="test-topic",
         partition=0,
-        value="test-value",
+        value=b"test-value",
         key=None,
         timestamp=1752735958,
         headers={},
@@ -8,7 +8,7 @@ def base_producer_record() -> ProducerRecord:
     return ProducerRecord(
         topic="test-topic",
         partition=0,
-        key="test-key",
-        value="test-value",
-        headers={"header1": "value1", "header2": "value2"},
+        key=b"test-key",
+        value=b"test-value",
+        headers={"header1": b"value1", "header2": b"value2"},
     )
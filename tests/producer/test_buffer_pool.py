@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from kafka.error import BufferExhaustedError
+from kafka.producer.buffer import BufferPool
+
+
+@pytest.mark.asyncio
+async def test_allocate():
+    pool = BufferPool(total_memory=100)
+
+    await pool.allocate(60, max_block_ms=10)
+
+    assert pool.available_memory == 40
+    assert not pool.is_exhausted
+
+
+@pytest.mark.asyncio
+async def test_allocate_waits_for_deallocate():
+    """남은 메모리가 부족하면 반환될 때까지 도착 순서대로 기다린다"""
+    pool = BufferPool(total_memory=100)
+    await pool.allocate(100, max_block_ms=10)
+    first = asyncio.create_task(pool.allocate(60, max_block_ms=1000))
+    second = asyncio.create_task(pool.allocate(40, max_block_ms=1000))
+    await asyncio.sleep(0)
+
+    assert pool.is_exhausted
+
+    pool.deallocate(50)
+    await asyncio.sleep(0)
+
+    assert not first.done() and not second.done()
+
+    pool.deallocate(50)
+    await asyncio.wait_for(asyncio.gather(first, second), timeout=1)
+
+    assert pool.available_memory == 0
+    assert not pool.is_exhausted
+
+
+@pytest.mark.asyncio
+async def test_allocate_timeout():
+    pool = BufferPool(total_memory=100)
+    await pool.allocate(100, max_block_ms=10)
+
+    with pytest.raises(BufferExhaustedError):
+        await pool.allocate(10, max_block_ms=10)
+
+    assert not pool.is_exhausted
+    pool.deallocate(100)
+    assert pool.available_memory == 100
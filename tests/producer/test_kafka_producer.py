@@ -0,0 +1,575 @@
+import asyncio
+import contextlib
+import functools
+import itertools
+import json
+from asyncio import StreamReader, StreamWriter
+from collections.abc import AsyncGenerator
+from pathlib import Path
+from typing import Any
+from unittest import mock
+
+import pytest
+import pytest_asyncio
+
+from kafka import constants, message, parser
+from kafka.broker import (
+    Metadata,
+    MetadataResponse,
+    Produce,
+    ProduceResponse,
+    TopicMetadata,
+)
+from kafka.broker.query import Fetch
+from kafka.broker.group import GroupCoordinator
+from kafka.broker.server import handle_client
+from kafka.broker.storage import (
+    FSCommittedOffsetStorage,
+    FSLogStorage,
+    FSProducerStateStorage,
+)
+from kafka.error import (
+    BufferExhaustedError,
+    KafkaStorageError,
+    PartitionNotFoundError,
+    RecordTooLargeError,
+)
+from kafka.producer.client import KafkaProducer
+from kafka.record import ProducerRecord, RecordMetadata
+
+
+@pytest_asyncio.fixture
+async def broker(
+    request: pytest.FixtureRequest,
+) -> AsyncGenerator[tuple[str, int, list[Produce]], None]:
+    received: list[Produce] = []
+    failures = itertools.count(getattr(request, "param", 0), -1)
+    leos: dict[tuple[str, int], int] = {}
+
+    async def handle_produce(reader: StreamReader, writer: StreamWriter) -> None:
+        async for msg in parser.MessageParser(reader):
+            if msg.headers.api_key == message.MessageType.METADATA:
+                qry = Metadata.from_message(msg)
+                metadata = MetadataResponse(
+                    topics=[
+                        TopicMetadata(name=topic, num_partitions=3)
+                        for topic in qry.topics
+                        if topic == "topic01"
+                    ],
+                    error_code=0,
+                )
+                writer.write(
+                    message.Message(
+                        headers=msg.headers,
+                        payload=metadata.model_dump_json().encode("utf-8"),
+                    ).serialized
+                )
+                continue
+            produce = Produce.from_message(msg)
+            received.append(produce)
+            if next(failures) > 0:
+                response = ProduceResponse.failure(
+                    topic=produce.topic,
+                    partition=produce.partition,
+                    error_code=56,
+                    error_message="Disk I/O failed",
+                )
+                writer.write(
+                    message.Message(
+                        headers=msg.headers,
+                        payload=response.model_dump_json().encode("utf-8"),
+                    ).serialized
+                )
+                continue
+            key = (produce.topic, produce.partition)
+            base_offset = leos.get(key, 0)
+            leos[key] = base_offset + len(produce.records)
+            response = ProduceResponse.success(
+                topic=produce.topic,
+                partition=produce.partition,
+                base_offset=base_offset,
+            )
+            writer.write(
+                message.Message(
+                    headers=msg.headers,
+                    payload=response.model_dump_json().encode("utf-8"),
+                ).serialized
+            )
+            await writer.drain()
+        writer.close()
+        await writer.wait_closed()
+
+    server = await asyncio.start_server(handle_produce, "127.0.0.1", 0)
+    host, port = server.sockets[0].getsockname()
+    yield host, port, received
+    server.close()
+    await server.wait_closed()
+
+
+@pytest_asyncio.fixture
+async def producer(
+    broker: tuple[str, int, list[Produce]], request: pytest.FixtureRequest
+) -> AsyncGenerator[KafkaProducer, None]:
+    host, port, _ = broker
+    linger_ms, batch_size, retries = getattr(request, "param", (5, 8 * 1024, 0))
+    correlation_ids = itertools.count(1)
+    producer = KafkaProducer(
+        broker_host=host,
+        broker_port=port,
+        correlation_id_factory=lambda: next(correlation_ids),
+        batch_size=batch_size,
+        linger_ms=linger_ms,
+        retries=retries,
+        retry_backoff_ms=10,
+    )
+    producer.run_loop()
+    while not producer.is_connected:
+        await asyncio.sleep(0.01)
+    yield producer
+    await producer.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("producer", [(10, 8 * 1024, 0)], indirect=True)
+async def test_send_after_linger(
+    producer: KafkaProducer, broker: tuple[str, int, list[Produce]]
+):
+    """batch_size 에 도달하지 않아도 linger_ms 가 지나면 전송된다"""
+    _, _, received = broker
+    future1 = await producer.send(
+        ProducerRecord(topic="topic01", partition=0, value="a")
+    )
+    future2 = await producer.send(
+        ProducerRecord(topic="topic01", partition=0, value="b")
+    )
+
+    assert received == []
+
+    results = await asyncio.wait_for(asyncio.gather(future1, future2), timeout=1)
+
+    assert [(r.topic, r.partition, r.offset) for r in results] == [
+        ("topic01", 0, 0),
+        ("topic01", 0, 1),
+    ]
+    assert len(received) == 1
+    assert [r.value for r in received[0].records] == [b"a", b"b"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("producer", [(60_000, 211, 0)], indirect=True)
+async def test_send_full_batch_without_linger(
+    producer: KafkaProducer, broker: tuple[str, int, list[Produce]]
+):
+    """batch_size 에 도달한 배치는 linger_ms 를 기다리지 않고 전송된다"""
+    _, _, received = broker
+    future = await producer.send(
+        ProducerRecord(topic="topic01", partition=0, value="x" * 75)
+    )
+
+    result = await asyncio.wait_for(future, timeout=1)
+
+    assert isinstance(result, RecordMetadata)
+    assert len(received) == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("producer", [(5, 100, 0)], indirect=True)
+async def test_send_too_large_record(producer: KafkaProducer):
+    """배치 크기를 넘는 레코드는 즉시 거부된다"""
+    with pytest.raises(RecordTooLargeError):
+        await producer.send(
+            ProducerRecord(topic="topic01", partition=0, value="x" * 100)
+        )
+
+
+@pytest.mark.parametrize("batch_size", [0, 10_000])
+def test_init_with_invalid_batch_size(batch_size: int):
+    with pytest.raises(ValueError):
+        KafkaProducer(
+            broker_host="localhost",
+            broker_port=9092,
+            correlation_id_factory=lambda: 1,
+            batch_size=batch_size,
+        )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("producer", [(60_000, 8 * 1024, 0)], indirect=True)
+async def test_flush(producer: KafkaProducer, broker: tuple[str, int, list[Produce]]):
+    """flush 는 linger_ms 와 관계없이 모든 레코드가 확인될 때까지 기다린다"""
+    _, _, received = broker
+    futures = [
+        await producer.send(
+            ProducerRecord(topic="topic01", partition=partition, value="value")
+        )
+        for partition in (0, 1, 0)
+    ]
+
+    await asyncio.wait_for(producer.flush(), timeout=1)
+
+    assert all(future.done() for future in futures)
+    assert sorted((p.partition, len(p.records)) for p in received) == [(0, 2), (1, 1)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("producer", [(60_000, 8 * 1024, 0)], indirect=True)
+async def test_send_without_partition(
+    producer: KafkaProducer, broker: tuple[str, int, list[Produce]]
+):
+    """파티션이 없는 레코드는 키 해시 또는 sticky 파티션으로 보내진다"""
+    _, _, received = broker
+    keyed = [
+        await producer.send(ProducerRecord(topic="topic01", key="abc", value="v"))
+        for _ in range(2)
+    ]
+    unkeyed = [
+        await producer.send(ProducerRecord(topic="topic01", value="v"))
+        for _ in range(3)
+    ]
+
+    await asyncio.wait_for(producer.flush(), timeout=1)
+
+    assert {future.result().partition for future in keyed} == {479470107 % 3}
+    assert len({future.result().partition for future in unkeyed}) == 1
+    assert sum(len(p.records) for p in received) == 5
+
+
+@pytest.mark.asyncio
+async def test_send_cancelled_while_fetching_metadata(producer: KafkaProducer):
+    """메타데이터를 기다리던 send() 가 취소되어도 같은 토픽을 기다리는 다른 send() 는 계속된다"""
+    cancelled = asyncio.create_task(
+        producer.send(ProducerRecord(topic="topic01", value="a"))
+    )
+    waiting = asyncio.create_task(
+        producer.send(ProducerRecord(topic="topic01", value="b"))
+    )
+    while "topic01" not in producer._metadata_requests:
+        await asyncio.sleep(0)
+    cancelled.cancel()
+
+    future = await asyncio.wait_for(waiting, timeout=1)
+    later = await producer.send(ProducerRecord(topic="topic01", value="c"))
+    await asyncio.wait_for(producer.flush(), timeout=1)
+
+    assert cancelled.cancelled()
+    assert future.result().topic == later.result().topic == "topic01"
+    assert not producer._loop_task.done()
+
+
+@pytest.mark.asyncio
+async def test_send_to_unknown_topic(producer: KafkaProducer):
+    with pytest.raises(PartitionNotFoundError):
+        await producer.send(ProducerRecord(topic="unknown", value="v"))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "broker, producer, expected_values",
+    [(1, (60_000, 8 * 1024, 1), [b"a", b"a", b"b"])],
+    indirect=["broker", "producer"],
+)
+async def test_send_with_retry(
+    producer: KafkaProducer,
+    broker: tuple[str, int, list[Produce]],
+    expected_values: list[bytes],
+):
+    """재시도 가능한 오류로 실패한 배치는 같은 파티션의 새 배치보다 먼저 다시 전송된다"""
+    _, _, received = broker
+    first = await producer.send(ProducerRecord(topic="topic01", partition=0, value="a"))
+    producer._accumulator.begin_flush()
+    producer._wakeup.set()
+    while not producer._accumulator.retry_batches:
+        await asyncio.sleep(0.001)
+    producer._accumulator.end_flush()
+    second = await producer.send(
+        ProducerRecord(topic="topic01", partition=0, value="b")
+    )
+
+    await asyncio.wait_for(producer.flush(), timeout=1)
+
+    assert [p.records[0].value for p in received] == expected_values
+    assert first.result().offset == 0
+    assert second.result().offset == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "broker, producer", [(2, (5, 8 * 1024, 1))], indirect=["broker", "producer"]
+)
+async def test_send_with_exhausted_retries(producer: KafkaProducer):
+    future = await producer.send(
+        ProducerRecord(topic="topic01", partition=0, value="a")
+    )
+
+    with pytest.raises(KafkaStorageError):
+        await asyncio.wait_for(future, timeout=1)
+
+
+@pytest_asyncio.fixture
+async def fs_broker(
+    tmp_path: Path,
+) -> AsyncGenerator[tuple[str, int, FSLogStorage], None]:
+    log_storage = FSLogStorage.load_from_root(tmp_path, constants.LOG_FILE_SIZE_LIMIT)
+    log_storage.init_topic(topic_name="topic01", num_partitions=1)
+    server = await asyncio.start_server(
+        functools.partial(
+            handle_client,
+            log_storage=log_storage,
+            committed_offset_storage=FSCommittedOffsetStorage.load_from_root(tmp_path),
+            # snapshot every batch so tests can read the state back from disk
+            producer_state_storage=FSProducerStateStorage.load_from_root(
+                tmp_path, snapshot_interval=1
+            ),
+            group_coordinator=GroupCoordinator(),
+        ),
+        "127.0.0.1",
+        0,
+    )
+    host, port = server.sockets[0].getsockname()
+    yield host, port, log_storage
+    server.close()
+    await server.wait_closed()
+    log_storage.close()
+
+
+@pytest_asyncio.fixture
+async def fs_producer(
+    fs_broker: tuple[str, int, FSLogStorage], request: pytest.FixtureRequest
+) -> AsyncGenerator[KafkaProducer, None]:
+    host, port, _ = fs_broker
+    correlation_ids = itertools.count(1)
+    producer = KafkaProducer(
+        broker_host=host,
+        broker_port=port,
+        correlation_id_factory=lambda: next(correlation_ids),
+        linger_ms=60_000,
+        **request.param,
+    )
+    producer.run_loop()
+    while not producer.is_connected:
+        await asyncio.sleep(0.01)
+    yield producer
+    await producer.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fs_producer", [dict(enable_idempotence=True)], indirect=True)
+async def test_send_with_idempotence(fs_producer: KafkaProducer, tmp_path: Path):
+    """멱등 프로듀서는 브로커에서 발급한 프로듀서 ID 와 시퀀스를 배치에 담아 보낸다"""
+    producer = fs_producer
+    futures = []
+    for values in (["a", "b"], ["c"]):
+        futures.extend(
+            [
+                await producer.send(
+                    ProducerRecord(topic="topic01", partition=0, value=value)
+                )
+                for value in values
+            ]
+        )
+        await asyncio.wait_for(producer.flush(), timeout=1)
+
+    assert [future.result().offset for future in futures] == [0, 1, 2]
+    entry = FSProducerStateStorage.load_from_root(tmp_path).partition_entries(
+        "topic01", 0
+    )[0]
+    assert [(b.first_sequence, b.last_sequence) for b in entry.batches] == [
+        (0, 1),
+        (2, 2),
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "fs_producer", [dict(enable_idempotence=True, batch_size=300)], indirect=True
+)
+async def test_send_with_idempotence_across_batches(
+    fs_producer: KafkaProducer, fs_broker: tuple[str, int, FSLogStorage]
+):
+    """배치 크기를 넘겨 여러 배치로 나뉘어도 모든 레코드가 저장된다"""
+    _, _, log_storage = fs_broker
+    futures = [
+        await fs_producer.send(
+            ProducerRecord(topic="topic01", partition=0, value=str(idx))
+        )
+        for idx in range(20)
+    ]
+    await asyncio.wait_for(fs_producer.flush(), timeout=1)
+
+    assert [future.result().offset for future in futures] == list(range(20))
+    records = log_storage.list_logs(
+        Fetch(topic="topic01", partition=0, offset=0, max_bytes=100000)
+    )
+    assert [r.value for r in records] == [str(idx).encode() for idx in range(20)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fs_producer", [dict(enable_idempotence=True)], indirect=True)
+async def test_send_with_idempotence_after_failed_batch(
+    fs_producer: KafkaProducer, fs_broker: tuple[str, int, FSLogStorage]
+):
+    """배치가 최종 실패하면 새 프로듀서 ID 를 받아 이후 배치의 시퀀스를 0부터 다시 매긴다"""
+    _, _, log_storage = fs_broker
+    with mock.patch.object(log_storage, "append_log", side_effect=OSError("disk")):
+        failed = await fs_producer.send(
+            ProducerRecord(topic="topic01", partition=0, value="a")
+        )
+        await asyncio.wait_for(fs_producer.flush(), timeout=1)
+    futures = []
+    for value in ["b", "c"]:
+        futures.append(
+            await fs_producer.send(
+                ProducerRecord(topic="topic01", partition=0, value=value)
+            )
+        )
+        await asyncio.wait_for(fs_producer.flush(), timeout=1)
+
+    with pytest.raises(KafkaStorageError):
+        failed.result()
+    assert [future.result().offset for future in futures] == [0, 1]
+    assert fs_producer._accumulator.producer_id == 1
+
+
+def test_init_with_too_many_in_flight_requests_for_idempotence():
+    with pytest.raises(ValueError):
+        KafkaProducer(
+            broker_host="localhost",
+            broker_port=9092,
+            correlation_id_factory=lambda: 1,
+            enable_idempotence=True,
+            max_in_flight_requests_per_connection=6,
+        )
+
+
+@pytest.mark.asyncio
+async def test_send_with_exhausted_buffer_memory():
+    """응답이 오지 않아 버퍼 메모리가 반환되지 않으면 max_block_ms 후에 실패한다"""
+
+    async def handle_without_response(
+        reader: StreamReader, writer: StreamWriter
+    ) -> None:
+        await reader.read()
+        writer.close()
+
+    server = await asyncio.start_server(handle_without_response, "127.0.0.1", 0)
+    host, port = server.sockets[0].getsockname()
+    correlation_ids = itertools.count(1)
+    producer = KafkaProducer(
+        broker_host=host,
+        broker_port=port,
+        correlation_id_factory=lambda: next(correlation_ids),
+        batch_size=1024,
+        buffer_memory=1024,
+        max_block_ms=50,
+    )
+    producer.run_loop()
+    while not producer.is_connected:
+        await asyncio.sleep(0.01)
+
+    await producer.send(ProducerRecord(topic="topic01", partition=0, value="a"))
+    with pytest.raises(BufferExhaustedError):
+        await producer.send(ProducerRecord(topic="topic01", partition=1, value="b"))
+
+    producer._loop_task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await producer._loop_task
+    server.close()
+    await server.wait_closed()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fs_producer", [dict(compression_type="gzip")], indirect=True)
+async def test_send_with_compression(
+    fs_producer: KafkaProducer, fs_broker: tuple[str, int, FSLogStorage]
+):
+    """압축된 배치는 브로커에 하나의 엔트리로 저장되고 레코드 단위로 조회된다"""
+    _, _, log_storage = fs_broker
+    futures = [
+        await fs_producer.send(
+            ProducerRecord(topic="topic01", partition=0, value=f"value{i}")
+        )
+        for i in range(20)
+    ]
+
+    await asyncio.wait_for(fs_producer.flush(), timeout=1)
+    records = log_storage.list_logs(
+        Fetch(topic="topic01", partition=0, offset=5, max_bytes=10000)
+    )
+
+    assert [future.result().offset for future in futures] == list(range(20))
+    assert [(r.offset, r.value) for r in records] == [
+        (i, f"value{i}".encode()) for i in range(5, 20)
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "fs_producer",
+    [
+        dict(
+            key_serializer=lambda key: key.to_bytes(4, "big"),
+            value_serializer=lambda value: json.dumps(value).encode("utf-8"),
+        )
+    ],
+    indirect=True,
+)
+async def test_send_with_serializers(
+    fs_producer: KafkaProducer, fs_broker: tuple[str, int, FSLogStorage]
+):
+    """직렬화된 키, 값, 헤더는 바이트 그대로 저장된다"""
+    _, _, log_storage = fs_broker
+    future = await fs_producer.send(
+        ProducerRecord(
+            topic="topic01",
+            key=255,
+            value={"id": 1},
+            headers={"content-type": b"\x00\xff"},
+        )
+    )
+
+    await asyncio.wait_for(fs_producer.flush(), timeout=1)
+    (record,) = log_storage.list_logs(
+        Fetch(topic="topic01", partition=0, offset=0, max_bytes=10000)
+    )
+
+    assert future.result().offset == 0
+    assert (record.key, record.value, record.headers) == (
+        b"\x00\x00\x00\xff",
+        b'{"id": 1}',
+        {"content-type": b"\x00\xff"},
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fs_producer", [dict(acks=0)], indirect=True)
+async def test_send_without_ack(
+    fs_producer: KafkaProducer, fs_broker: tuple[str, int, FSLogStorage]
+):
+    """acks=0 프로듀서는 오프셋 없이 완료되고, 브로커는 응답 없이 기록만 한다"""
+    _, _, log_storage = fs_broker
+    futures = [
+        await fs_producer.send(
+            ProducerRecord(topic="topic01", partition=0, value=f"value{i}")
+        )
+        for i in range(3)
+    ]
+
+    await asyncio.wait_for(fs_producer.flush(), timeout=1)
+    while log_storage.partitions[("topic01", 0)].leo < 3:
+        await asyncio.sleep(0.01)
+
+    assert [future.result().offset for future in futures] == [-1, -1, -1]
+    assert fs_producer._dispatcher._pending_responses == {}
+
+
+@pytest.mark.parametrize(
+    "params", [dict(acks=2), dict(acks=0, enable_idempotence=True)]
+)
+def test_init_with_invalid_acks(params: dict[str, Any]):
+    with pytest.raises(ValueError):
+        KafkaProducer(
+            broker_host="localhost",
+            broker_port=9092,
+            correlation_id_factory=lambda: 1,
+            **params,
+        )
@@ -0,0 +1,93 @@
+from unittest import mock
+
+import pytest
+
+from kafka.producer.partitioner import (
+    DefaultPartitioner,
+    StickyPartitionCache,
+    murmur2,
+    to_positive,
+)
+
+
+@pytest.mark.parametrize(
+    "data, expected",
+    [
+        (b"21", -973932308),
+        (b"foobar", -790332482),
+        (b"a-little-bit-long-string", -985981536),
+        (b"a-little-bit-longer-string", -1486304829),
+        (b"lkjh234lh9fiuh90y23oiuhsafujhadof229phr9h19h89h8", -58897971),
+        (b"abc", 479470107),
+    ],
+)
+def test_murmur2(data: bytes, expected: int):
+    assert murmur2(data) == expected
+
+
+@pytest.mark.parametrize(
+    "key, expected",
+    [
+        (b"", 681),
+        (b"a", 524),
+        (b"ab", 434),
+        (b"abc", 107),
+        (b"123456789", 566),
+        (b"\x00 ", 742),
+    ],
+)
+def test_partition_with_key(key: bytes, expected: int):
+    """Java 클라이언트와 같은 파티션을 선택한다"""
+    partitioner = DefaultPartitioner()
+
+    assert partitioner.partition("test-topic", key, 1000) == expected
+    assert to_positive(murmur2(key)) % 1000 == expected
+
+
+def test_partition_without_key_sticks():
+    """키가 없는 레코드는 새 배치가 필요할 때까지 같은 파티션으로 간다"""
+    partitioner = DefaultPartitioner()
+
+    partitions = {partitioner.partition("test-topic", None, 10) for _ in range(100)}
+
+    assert len(partitions) == 1
+
+
+def test_on_new_batch_switches_partition():
+    partitioner = DefaultPartitioner()
+    prev_partition = partitioner.partition("test-topic", None, 10)
+
+    partitioner.on_new_batch("test-topic", 10, prev_partition)
+
+    assert partitioner.partition("test-topic", None, 10) != prev_partition
+
+
+def test_on_new_batch_for_other_partition_keeps_sticky_partition():
+    partitioner = DefaultPartitioner()
+    sticky_partition = partitioner.partition("test-topic", None, 10)
+
+    partitioner.on_new_batch("test-topic", 10, (sticky_partition + 1) % 10)
+
+    assert partitioner.partition("test-topic", None, 10) == sticky_partition
+
+
+@pytest.mark.parametrize(
+    "num_partitions, old_partition, random_value, expected",
+    [
+        (1, 0, 0, 0),
+        (3, 0, 0, 1),
+        (3, 1, 0, 0),
+        (3, 1, 1, 2),
+        (3, 2, 1, 1),
+    ],
+)
+def test_sticky_next_partition_skips_previous(
+    num_partitions: int, old_partition: int, random_value: int, expected: int
+):
+    cache = StickyPartitionCache()
+    cache.partitions["test-topic"] = old_partition
+
+    with mock.patch("random.randrange", return_value=random_value):
+        partition = cache.next_partition("test-topic", num_partitions, old_partition)
+
+    assert partition == expected
@@ -0,0 +1,145 @@
+import asyncio
+import base64
+import json
+
+import pytest
+
+from kafka import compression
+from kafka.broker.command import Produce, RecordContents
+from kafka.compression import CompressionType
+from kafka.producer.batch import ProducerBatch
+
+
+@pytest.mark.parametrize(
+    "topic, partition, records",
+    [
+        ("test-topic", 0, []),
+        (
+            "test-topic",
+            0,
+            [RecordContents(value=b"test-value", key=None, timestamp=None, headers={})],
+        ),
+        (
+            "다른-토픽",
+            3,
+            [
+                RecordContents(value=b"value1", key=b"key1", timestamp=1, headers={}),
+                RecordContents(
+                    value="값".encode("utf-8"),
+                    key=None,
+                    timestamp=None,
+                    headers={"h1": b"v1"},
+                ),
+            ],
+        ),
+    ],
+)
+def test_serialized(topic: str, partition: int, records: list[RecordContents]):
+    batch = ProducerBatch(topic=topic, partition=partition, created_at=0)
+    for contents in records:
+        batch.append(contents.serialized, asyncio.Future())
+
+    assert batch.record_count == len(records)
+    assert batch.size == len(batch.serialized)
+    if records:
+        assert (
+            batch.serialized
+            == Produce(topic=topic, partition=partition, records=records).serialized
+        )
+
+
+def test_size_with():
+    contents = RecordContents(value=b"test-value", key=None, timestamp=None, headers={})
+    batch = ProducerBatch(topic="test-topic", partition=0, created_at=0)
+
+    expected_size = batch.size_with(contents.serialized)
+    batch.append(contents.serialized, asyncio.Future())
+
+    assert batch.size == expected_size
+    assert batch.size_with(contents.serialized) == len(
+        Produce(
+            topic="test-topic", partition=0, records=[contents, contents]
+        ).serialized
+    )
+
+
+def test_serialized_with_producer_id():
+    contents = RecordContents(value=b"test-value", key=None, timestamp=None, headers={})
+    batch = ProducerBatch(
+        topic="test-topic",
+        partition=0,
+        created_at=0,
+        producer_id=7,
+        producer_epoch=0,
+        base_sequence=12,
+    )
+    batch.append(contents.serialized, asyncio.Future())
+
+    assert batch.size == len(batch.serialized)
+    assert (
+        batch.serialized
+        == Produce(
+            topic="test-topic",
+            partition=0,
+            producer_id=7,
+            producer_epoch=0,
+            base_sequence=12,
+            records=[contents],
+        ).serialized
+    )
+
+
+@pytest.mark.parametrize(
+    "compression_type",
+    [CompressionType.GZIP, CompressionType.LZMA, CompressionType.BZ2],
+)
+def test_compress(compression_type: CompressionType):
+    contents = RecordContents(value=b"value" * 10, key=None, timestamp=1, headers={})
+    batch = ProducerBatch(topic="test-topic", partition=0, created_at=0)
+    for _ in range(10):
+        batch.append(contents.serialized, asyncio.Future())
+
+    batch.compress(compression_type)
+    cmd = Produce.model_validate_json(batch.serialized)
+
+    assert len(batch.serialized) < batch.size
+    assert batch.serialized == cmd.serialized
+    assert (cmd.compression_type, cmd.record_count) == (compression_type, 10)
+    assert (
+        json.loads(
+            compression.decompress(
+                base64.b64decode(cmd.compressed_records), compression_type
+            )
+        )
+        == [contents.model_dump(mode="json")] * 10
+    )
+
+
+def test_compress_incompressible():
+    """압축해도 작아지지 않는 배치는 압축하지 않고 보낸다"""
+    contents = RecordContents(value=b"a", key=None, timestamp=None, headers={})
+    batch = ProducerBatch(topic="test-topic", partition=0, created_at=0)
+    batch.append(contents.serialized, asyncio.Future())
+
+    batch.compress(CompressionType.LZMA)
+
+    assert batch.compressed is None
+    assert len(batch.serialized) == batch.size
+
+
+def test_serialized_without_ack():
+    contents = RecordContents(value=b"test-value", key=None, timestamp=None, headers={})
+    batch = ProducerBatch(topic="test-topic", partition=0, created_at=0, acks=0)
+    future = asyncio.Future()
+    batch.append(contents.serialized, future)
+
+    batch.done_without_ack()
+
+    assert batch.size == len(batch.serialized)
+    assert (
+        batch.serialized
+        == Produce(
+            topic="test-topic", partition=0, acks=0, records=[contents]
+        ).serialized
+    )
+    assert (future.result().offset, future.result().timestamp) == (-1, -1)
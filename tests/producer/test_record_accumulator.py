@@ -1,21 +1,22 @@
 import asyncio
+import itertools
 from typing import Any
 from unittest import mock
 
 import pytest
 
-from kafka.producer.accumulator import RecordAccumulator
-from kafka.broker.command import RecordContents, Produce
+from kafka.producer.accumulator import AppendResult, RecordAccumulator
+from kafka.broker.command import RecordContents
+from kafka.error import RecordTooLargeError
 from kafka.record import ProducerRecord
 
 
 @pytest.fixture
 def record_accumulator(request: pytest.FixtureRequest) -> RecordAccumulator:
-    records: dict[tuple[str, int], list[tuple[RecordContents, asyncio.Future]]] = (
-        request.param
-    )
-    accumulator = RecordAccumulator()
-    accumulator.records |= records
+    batch_size, linger_ms, records = request.param
+    accumulator = RecordAccumulator(batch_size=batch_size, linger_ms=linger_ms)
+    for rec in records:
+        accumulator.add(rec=ProducerRecord.model_validate(rec), future=mock.Mock())
     return accumulator
 
 
@@ -27,70 +28,41 @@ def producer_record(
     return base_producer_record.model_copy(update=record)
 
 
-@pytest.fixture
-def contents(base_record_contents: RecordContents) -> RecordContents:
-    return base_record_contents.model_copy(update=dict(value="test-value", key=None))
-
-
 @pytest.mark.parametrize(
-    "record_accumulator, producer_record, expected",
+    "record_accumulator, producer_record, expected_records, expected_result",
     [
         (
-            {},
-            dict(
-                topic="test-topic",
-                partition=0,
-                key=None,
-                value="test-value",
-                timestamp=None,
-                headers={},
-            ),
-            {
-                ("test-topic", 0): [
-                    (
-                        RecordContents(
-                            value="test-value", key=None, timestamp=None, headers={}
-                        ),
-                        mock.ANY,
-                    ),
-                ],
-            },
+            (1000, None, []),
+            dict(topic="test-topic", partition=0, key=None, value=b"test-value"),
+            [
+                RecordContents(
+                    value=b"test-value",
+                    key=None,
+                    timestamp=None,
+                    headers={"header1": b"value1", "header2": b"value2"},
+                ),
+            ],
+            AppendResult(batch_is_full=False, new_batch_created=True),
         ),
         (
-            {
-                ("test-topic", 0): [
-                    (
-                        RecordContents(
-                            value="test-value", key=None, timestamp=None, headers={}
-                        ),
-                        mock.ANY,
-                    ),
-                ],
-            },
-            dict(
-                topic="test-topic",
-                partition=0,
-                key=None,
-                value="test-value",
-                timestamp=None,
-                headers={},
+            (
+                1000,
+                None,
+                [dict(topic="test-topic", partition=0, value=b"test-value")],
             ),
-            {
-                ("test-topic", 0): [
-                    (
-                        RecordContents(
-                            value="test-value", key=None, timestamp=None, headers={}
-                        ),
-                        mock.ANY,
-                    ),
-                    (
-                        RecordContents(
-                            value="test-value", key=None, timestamp=None, headers={}
-                        ),
-                        mock.ANY,
-                    ),
-                ],
-            },
+            dict(topic="test-topic", partition=0, key=None, value=b"test-value"),
+            [
+                RecordContents(
+                    value=b"test-value", key=None, timestamp=None, headers={}
+                ),
+                RecordContents(
+                    value=b"test-value",
+                    key=None,
+                    timestamp=None,
+                    headers={"header1": b"value1", "header2": b"value2"},
+                ),
+            ],
+            AppendResult(batch_is_full=False, new_batch_created=False),
         ),
     ],
     indirect=["record_accumulator", "producer_record"],
@@ -98,98 +70,366 @@ def contents(base_record_contents: RecordContents) -> RecordContents:
 def test_add(
     record_accumulator: RecordAccumulator,
     producer_record: ProducerRecord,
-    expected: dict[tuple[str, int], list[tuple[RecordContents, asyncio.Future]]],
+    expected_records: list[RecordContents],
+    expected_result: AppendResult,
 ) -> None:
     future = asyncio.Future()
 
-    record_accumulator.add(rec=producer_record, future=future)
+    result = record_accumulator.add(rec=producer_record, future=future)
 
-    assert record_accumulator.records == expected
+    batch = record_accumulator.open_batches[("test-topic", 0)]
+    assert result == expected_result
+    assert batch.records == [contents.serialized for contents in expected_records]
+    assert batch.futures[-1] is future
+    assert batch.size == len(batch.serialized)
 
 
-@pytest.fixture
-def expected_produces(
-    base_produce: Produce,
-    base_record_contents: RecordContents,
-    request: pytest.FixtureRequest,
-) -> list[Produce]:
-    produces: list[dict[str, Any]] = request.param
-    return [
-        base_produce.model_copy(
-            update=dict(
-                topic=produce["topic"],
-                partition=produce["partition"],
-                records=produce["records"],
-            )
-        )
-        for produce in produces
+@pytest.mark.parametrize(
+    "record_accumulator, value, expected_sealed, expected_open",
+    [
+        ((214, None, []), b"x" * 75, [1], []),
+        (
+            (200, None, [dict(topic="test-topic", partition=0, value=b"a")]),
+            b"a",
+            [],
+            [2],
+        ),
+        (
+            (150, None, [dict(topic="test-topic", partition=0, value=b"a")]),
+            b"a",
+            [1],
+            [1],
+        ),
+    ],
+    indirect=["record_accumulator"],
+)
+def test_add_never_overflows_batch(
+    record_accumulator: RecordAccumulator,
+    value: bytes,
+    expected_sealed: list[int],
+    expected_open: list[int],
+) -> None:
+    record_accumulator.add(
+        rec=ProducerRecord(topic="test-topic", partition=0, value=value),
+        future=asyncio.Future(),
+    )
+
+    batches = [
+        *record_accumulator.sealed_batches,
+        *record_accumulator.open_batches.values(),
     ]
+    assert [
+        b.record_count for b in record_accumulator.sealed_batches
+    ] == expected_sealed
+    assert [
+        b.record_count for b in record_accumulator.open_batches.values()
+    ] == expected_open
+    assert all(b.size <= record_accumulator.batch_size for b in batches)
+
+
+@pytest.mark.parametrize(
+    "record_accumulator, expected_open",
+    [
+        ((1000, None, []), []),
+        ((150, None, [dict(topic="test-topic", partition=0, value=b"a")]), [1]),
+    ],
+    indirect=["record_accumulator"],
+)
+def test_add_abort_on_new_batch(
+    record_accumulator: RecordAccumulator, expected_open: list[int]
+) -> None:
+    result = record_accumulator.add(
+        rec=ProducerRecord(topic="test-topic", partition=0, value=b"a"),
+        future=asyncio.Future(),
+        abort_on_new_batch=True,
+    )
+
+    assert result == AppendResult(
+        batch_is_full=False, new_batch_created=False, abort_for_new_batch=True
+    )
+    assert not record_accumulator.sealed_batches
+    assert [
+        b.record_count for b in record_accumulator.open_batches.values()
+    ] == expected_open
+
+
+@pytest.mark.parametrize(
+    "record_accumulator",
+    [(213, None, [dict(topic="test-topic", partition=0, value=b"a")])],
+    indirect=True,
+)
+def test_add_too_large_record(record_accumulator: RecordAccumulator) -> None:
+    with pytest.raises(RecordTooLargeError):
+        record_accumulator.add(
+            rec=ProducerRecord(topic="test-topic", partition=0, value=b"x" * 75),
+            future=asyncio.Future(),
+        )
+
+    assert not record_accumulator.sealed_batches
+    assert [b.record_count for b in record_accumulator.open_batches.values()] == [1]
 
 
 @pytest.mark.parametrize(
-    "record_accumulator, size, expected_produces",
+    "record_accumulator, expected_produces",
     [
-        ({}, 100, []),
+        ((100, None, []), []),
         (
-            {
-                ("test-topic", 0): [
-                    (
-                        RecordContents(
-                            value="short", key=None, timestamp=None, headers={}
-                        ),
-                        asyncio.Future(),
-                    ),
-                ],
-            },
-            1000,
+            (1000, None, [dict(topic="test-topic", partition=0, value=b"short")]),
             [],
         ),
         (
-            {
-                ("test-topic", 0): [
-                    (
-                        RecordContents(
-                            value="this is a long message that should meet the size requirement",
-                            key=None,
-                            timestamp=None,
-                            headers={},
-                        ),
-                        asyncio.Future(),
-                    ),
-                    (
-                        RecordContents(
-                            value="short", key=None, timestamp=None, headers={}
-                        ),
-                        asyncio.Future(),
+            (
+                200,
+                None,
+                [
+                    dict(
+                        topic="test-topic",
+                        partition=0,
+                        value=b"this is a long message that should meet the size requirement",
                     ),
+                    dict(topic="test-topic", partition=0, value=b"short"),
+                    dict(topic="test-topic", partition=1, value=b"short"),
                 ],
-            },
-            100,
+            ),
             [
-                dict(
-                    topic="test-topic",
-                    partition=0,
-                    records=[
-                        RecordContents(
-                            value="this is a long message that should meet the size requirement",
-                            key=None,
-                            timestamp=None,
-                            headers={},
-                        ),
-                        RecordContents(
-                            value="short", key=None, timestamp=None, headers={}
-                        ),
-                    ],
-                )
+                b'{"topic": "test-topic", "partition": 0, "records": [{"value": "dGhpcyBpcyBhIGxvbmcgbWVzc2FnZSB0aGF0IHNob3VsZCBtZWV0IHRoZSBzaXplIHJlcXVpcmVtZW50", "key": null, "timestamp": null, "headers": {}}]}',
             ],
         ),
     ],
-    indirect=["record_accumulator", "expected_produces"],
+    indirect=["record_accumulator"],
 )
 def test_ready_batches(
-    record_accumulator: RecordAccumulator,
-    size: int,
-    expected_produces: list[Produce],
+    record_accumulator: RecordAccumulator, expected_produces: list[bytes]
+) -> None:
+    batches = record_accumulator.ready_batches()
+
+    assert [batch.serialized for batch in batches] == expected_produces
+    assert not record_accumulator.sealed_batches
+
+
+@pytest.mark.parametrize(
+    "linger_ms, elapsed, expected_count",
+    [
+        (None, 10.0, 0),
+        (100, 0.05, 0),
+        (100, 0.1, 1),
+    ],
+)
+def test_ready_batches_with_linger(
+    linger_ms: int | None,
+    elapsed: float,
+    expected_count: int,
 ) -> None:
-    produces = record_accumulator.ready_batches(size=size)
-    assert [produce for produce, _ in produces] == expected_produces
+    accumulator = RecordAccumulator(batch_size=1000, linger_ms=linger_ms)
+    with mock.patch("time.monotonic", return_value=1000.0):
+        accumulator.add(
+            rec=ProducerRecord(topic="test-topic", partition=0, value=b"short"),
+            future=asyncio.Future(),
+        )
+    with mock.patch("time.monotonic", return_value=1000.0 + elapsed):
+        batches = accumulator.ready_batches()
+
+    assert len(batches) == expected_count
+    assert accumulator.is_empty is (expected_count == 1)
+
+
+def test_ready_batches_while_flushing() -> None:
+    accumulator = RecordAccumulator(batch_size=1000)
+    accumulator.add(
+        rec=ProducerRecord(topic="test-topic", partition=0, value=b"short"),
+        future=asyncio.Future(),
+    )
+
+    accumulator.begin_flush()
+    batches = accumulator.ready_batches()
+    accumulator.end_flush()
+
+    assert len(batches) == 1
+    assert accumulator.is_empty
+
+
+@pytest.mark.parametrize(
+    "record_accumulator, elapsed, expected",
+    [
+        ((1000, None, [dict(topic="test-topic", partition=0, value=b"a")]), 0, None),
+        ((1000, 100, []), 0, None),
+        ((1000, 100, [dict(topic="test-topic", partition=0, value=b"a")]), 0.03, 0.07),
+        ((1000, 100, [dict(topic="test-topic", partition=0, value=b"a")]), 0.5, 0),
+        (
+            (
+                150,
+                100,
+                [
+                    dict(topic="test-topic", partition=0, value=b"a"),
+                    dict(topic="test-topic", partition=0, value=b"a"),
+                ],
+            ),
+            0,
+            0,
+        ),
+    ],
+    indirect=["record_accumulator"],
+)
+def test_next_ready_delay(
+    record_accumulator: RecordAccumulator, elapsed: float, expected: float | None
+) -> None:
+    created_at = min(
+        (b.created_at for b in record_accumulator.open_batches.values()), default=0
+    )
+    with mock.patch("time.monotonic", return_value=created_at + elapsed):
+        delay = record_accumulator.next_ready_delay()
+
+    assert delay == pytest.approx(expected)
+
+
+def test_reenqueue_mutes_partition() -> None:
+    """재시도 배치는 같은 파티션의 더 새로운 배치보다 먼저 전송된다"""
+    accumulator = RecordAccumulator(batch_size=1000, retry_backoff_ms=100)
+    with mock.patch("time.monotonic", return_value=1000.0):
+        for partition in (0, 1):
+            accumulator.add(
+                rec=ProducerRecord(topic="test-topic", partition=partition, value=b"a"),
+                future=asyncio.Future(),
+            )
+        accumulator.begin_flush()
+        first, other = accumulator.ready_batches()
+        accumulator.end_flush()
+    with mock.patch("time.monotonic", return_value=1001.0):
+        accumulator.add(
+            rec=ProducerRecord(topic="test-topic", partition=0, value=b"b"),
+            future=asyncio.Future(),
+        )
+        accumulator.reenqueue(first)
+        accumulator.begin_flush()
+        muted = accumulator.ready_batches()
+        delay = accumulator.next_ready_delay()
+    with mock.patch("time.monotonic", return_value=1001.1):
+        retried = accumulator.ready_batches()
+        accumulator.end_flush()
+
+    assert muted == []
+    assert delay == pytest.approx(0.1)
+    assert first.attempts == 1
+    assert retried[0] is first
+    assert [b.records for b in retried[1:]] == [
+        [RecordContents(value=b"b", key=None, timestamp=None, headers={}).serialized]
+    ]
+    assert accumulator.is_empty
+
+
+def test_reenqueue_keeps_creation_order() -> None:
+    accumulator = RecordAccumulator(batch_size=1000, retry_backoff_ms=0)
+    batches = []
+    for created_at in (1000.0, 1001.0):
+        with mock.patch("time.monotonic", return_value=created_at):
+            accumulator.add(
+                rec=ProducerRecord(topic="test-topic", partition=0, value=b"a"),
+                future=asyncio.Future(),
+            )
+            accumulator.begin_flush()
+            batches.extend(accumulator.ready_batches())
+            accumulator.end_flush()
+
+    accumulator.reenqueue(batches[1])
+    accumulator.reenqueue(batches[0])
+
+    assert accumulator.ready_batches() == batches
+
+
+@pytest.mark.parametrize(
+    "record_accumulator, limit, expected_count",
+    [
+        (
+            (
+                214,
+                None,
+                [
+                    dict(topic="test-topic", partition=partition, value=b"x" * 75)
+                    for partition in range(3)
+                ],
+            ),
+            2,
+            2,
+        ),
+    ],
+    indirect=["record_accumulator"],
+)
+def test_ready_batches_with_limit(
+    record_accumulator: RecordAccumulator, limit: int, expected_count: int
+) -> None:
+    batches = record_accumulator.ready_batches(limit=limit)
+
+    assert len(batches) == expected_count
+    assert len(record_accumulator.sealed_batches) == 3 - expected_count
+
+
+def test_add_assigns_sequences() -> None:
+    """프로듀서 ID 가 있으면 파티션별로 레코드 수만큼 증가하는 시퀀스를 배치에 부여한다"""
+    accumulator = RecordAccumulator(batch_size=1000)
+    accumulator.producer_id, accumulator.producer_epoch = 7, 0
+    batches = []
+    for values in ([b"a", b"b"], [b"c"]):
+        for value in values:
+            accumulator.add(
+                rec=ProducerRecord(topic="test-topic", partition=0, value=value),
+                future=asyncio.Future(),
+            )
+        accumulator.begin_flush()
+        batches.extend(accumulator.ready_batches())
+        accumulator.end_flush()
+
+    assert [(b.producer_id, b.base_sequence) for b in batches] == [(7, 0), (7, 2)]
+
+
+def test_add_assigns_sequences_on_batch_rollover() -> None:
+    """크기 때문에 새 배치가 열려도 이전 배치의 레코드 수만큼 시퀀스가 이어진다"""
+    accumulator = RecordAccumulator(batch_size=300)
+    accumulator.producer_id, accumulator.producer_epoch = 7, 0
+    for value in range(20):
+        accumulator.add(
+            rec=ProducerRecord(topic="test-topic", partition=0, value=b"%d" % value),
+            future=asyncio.Future(),
+        )
+    accumulator.begin_flush()
+    batches = accumulator.ready_batches()
+    accumulator.end_flush()
+
+    assert len(batches) > 2
+    assert [b.base_sequence for b in batches] == list(
+        itertools.accumulate([0] + [b.record_count for b in batches[:-1]])
+    )
+
+
+def test_reset_producer_id_renumbers_queued_batches() -> None:
+    """새 프로듀서 ID 를 받으면 아직 보내지 않은 배치의 시퀀스를 파티션별로 0부터 다시 매긴다"""
+    accumulator = RecordAccumulator(batch_size=200)
+    accumulator.producer_id, accumulator.producer_epoch = 7, 0
+
+    def add(partition: int, value: bytes) -> None:
+        accumulator.add(
+            rec=ProducerRecord(topic="test-topic", partition=partition, value=value),
+            future=asyncio.Future(),
+        )
+
+    add(0, b"a")
+    accumulator.begin_flush()
+    accumulator.ready_batches()
+    accumulator.end_flush()
+    # one record per batch, so each add seals the previous batch of the partition
+    for partition, value in [(0, b"b"), (0, b"c"), (0, b"d"), (1, b"e")]:
+        add(partition, value)
+    retried = accumulator.ready_batches(limit=1)[0]
+    accumulator.reenqueue(retried)
+    sealed = list(accumulator.sealed_batches)
+    opened = list(accumulator.open_batches.values())
+
+    accumulator.reset_producer_id(8, 0)
+
+    assert [
+        (b.partition, b.producer_id, b.base_sequence)
+        for b in [retried, *sealed, *opened]
+    ] == [(0, 8, 0), (0, 8, 1), (0, 8, 2), (1, 8, 0)]
+    assert retried.serialized.startswith(
+        b'{"topic": "test-topic", "partition": 0, "producer_id": 8, '
+        b'"producer_epoch": 0, "base_sequence": 0, '
+    )
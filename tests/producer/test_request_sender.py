@@ -3,8 +3,10 @@ from unittest import mock
 
 import pytest
 
+from kafka.broker import ProduceResponse
 from kafka.connection import BrokerConnection
-from kafka.dispatcher import ResponseDispatcher
+from kafka.dispatcher import ProduceDispatcher
+from kafka.error import KafkaStorageError, PartitionNotFoundError, RequestTimedOutError
 from kafka.producer.accumulator import RecordAccumulator
 from kafka.producer.sender import RequestSender
 
@@ -23,7 +25,7 @@ def mock_correlation_id_factory() -> mock.Mock:
 
 @pytest.fixture
 def mock_response_dispatcher() -> mock.Mock:
-    return mock.Mock(spec=ResponseDispatcher)
+    return mock.Mock(spec=ProduceDispatcher)
 
 
 @pytest.fixture
@@ -31,25 +33,24 @@ def mock_record_accumulator() -> mock.Mock:
     return mock.Mock(spec=RecordAccumulator)
 
 
-@pytest.fixture
-def message_size_limit() -> int:
-    return 1024
-
-
 @pytest.fixture
 def request_sender(
     mock_conn: mock.Mock,
     mock_correlation_id_factory: mock.Mock,
     mock_response_dispatcher: mock.Mock,
     mock_record_accumulator: mock.Mock,
-    message_size_limit: int,
+    request: pytest.FixtureRequest,
 ) -> RequestSender:
+    max_in_flight_requests, retries = getattr(request, "param", (5, 0))
     return RequestSender(
         conn=mock_conn,
         correlation_id_factory=mock_correlation_id_factory,
         response_dispatcher=mock_response_dispatcher,
         record_accumulator=mock_record_accumulator,
-        message_size_limit=message_size_limit,
+        max_in_flight_requests=max_in_flight_requests,
+        retries=retries,
+        request_timeout_ms=50,
+        on_complete=mock.Mock(),
     )
 
 
@@ -60,7 +61,6 @@ async def test_send_with_no_batches(
     mock_conn: mock.Mock,
     mock_response_dispatcher: mock.Mock,
     mock_correlation_id_factory: mock.Mock,
-    message_size_limit: int,
 ):
     """전송할 레코드 배치가 없는 경우"""
     mock_record_accumulator.ready_batches.return_value = []
@@ -68,13 +68,10 @@ async def test_send_with_no_batches(
     with mock.patch("kafka.message.Message") as MessageMock:
         await request_sender.send()
 
-        expected_payload_size_limit = message_size_limit - 10
-        mock_record_accumulator.ready_batches.assert_called_once_with(
-            expected_payload_size_limit
-        )
+        mock_record_accumulator.ready_batches.assert_called_once_with(limit=5)
 
         assert mock_conn.send.call_count == 0
-        assert mock_response_dispatcher.link.call_count == 0
+        assert mock_response_dispatcher.link_response.call_count == 0
         assert mock_correlation_id_factory.call_count == 0
         assert MessageMock.produce.call_count == 0
 
@@ -86,15 +83,14 @@ async def test_send_with_single_batch(
     mock_conn: mock.Mock,
     mock_response_dispatcher: mock.Mock,
     mock_correlation_id_factory: mock.Mock,
-    message_size_limit: int,
 ):
     """전송할 레코드 배치가 하나인 경우"""
     future1 = asyncio.Future()
     future2 = asyncio.Future()
-    produce = mock.Mock(serialized=b"produce-payload-1")
+    batch = mock.Mock(serialized=b"produce-payload-1", futures=[future1, future2])
     correlation_id = 100
 
-    mock_record_accumulator.ready_batches.return_value = [(produce, [future1, future2])]
+    mock_record_accumulator.ready_batches.return_value = [batch]
     mock_correlation_id_factory.return_value = correlation_id
 
     with mock.patch("kafka.message.Message") as MessageMock:
@@ -103,18 +99,16 @@ async def test_send_with_single_batch(
 
         await request_sender.send()
 
-        expected_payload_size_limit = message_size_limit - 10
-        mock_record_accumulator.ready_batches.assert_called_once_with(
-            expected_payload_size_limit
-        )
+        mock_record_accumulator.ready_batches.assert_called_once_with(limit=5)
 
         MessageMock.produce.assert_called_once_with(
-            correlation_id=correlation_id, payload=produce.serialized
+            correlation_id=correlation_id, payload=batch.serialized
         )
         mock_conn.send.assert_called_once_with(mock_msg.serialized)
-        mock_response_dispatcher.link.assert_called_once_with(
-            correlation_id, [future1, future2]
+        mock_response_dispatcher.link_response.assert_called_once_with(
+            correlation_id, mock.ANY
         )
+        assert request_sender.in_flight == {correlation_id: batch}
 
 
 @pytest.mark.asyncio
@@ -124,20 +118,16 @@ async def test_send_with_multiple_batches(
     mock_conn: mock.Mock,
     mock_response_dispatcher: mock.Mock,
     mock_correlation_id_factory: mock.Mock,
-    message_size_limit: int,
 ):
     """전송할 레코드 배치가 여러 개인 경우"""
     future1 = asyncio.Future()
     future2 = asyncio.Future()
     future3 = asyncio.Future()
 
-    produce1 = mock.Mock(serialized=b"produce-payload-1")
-    produce2 = mock.Mock(serialized=b"produce-payload-2")
+    batch1 = mock.Mock(serialized=b"produce-payload-1", futures=[future1])
+    batch2 = mock.Mock(serialized=b"produce-payload-2", futures=[future2, future3])
 
-    mock_record_accumulator.ready_batches.return_value = [
-        (produce1, [future1]),
-        (produce2, [future2, future3]),
-    ]
+    mock_record_accumulator.ready_batches.return_value = [batch1, batch2]
     mock_correlation_id_factory.side_effect = [100, 200]
 
     with mock.patch("kafka.message.Message") as MessageMock:
@@ -147,20 +137,177 @@ async def test_send_with_multiple_batches(
 
         await request_sender.send()
 
-        expected_payload_size_limit = message_size_limit - 10
-        mock_record_accumulator.ready_batches.assert_called_once_with(
-            expected_payload_size_limit
-        )
+        mock_record_accumulator.ready_batches.assert_called_once_with(limit=5)
 
         assert MessageMock.produce.call_args_list == [
-            mock.call(correlation_id=100, payload=produce1.serialized),
-            mock.call(correlation_id=200, payload=produce2.serialized),
+            mock.call(correlation_id=100, payload=batch1.serialized),
+            mock.call(correlation_id=200, payload=batch2.serialized),
         ]
         assert mock_conn.send.call_args_list == [
             mock.call(mock_msg1.serialized),
             mock.call(mock_msg2.serialized),
         ]
-        assert mock_response_dispatcher.link.call_args_list == [
-            mock.call(100, [future1]),
-            mock.call(200, [future2, future3]),
-        ]
+        assert [
+            c.args[0] for c in mock_response_dispatcher.link_response.call_args_list
+        ] == [100, 200]
+        assert request_sender.in_flight == {100: batch1, 200: batch2}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("request_sender", [(1, 0)], indirect=True)
+async def test_send_with_full_in_flight(
+    request_sender: RequestSender,
+    mock_record_accumulator: mock.Mock,
+    mock_correlation_id_factory: mock.Mock,
+):
+    """전송 중인 요청이 max_in_flight_requests 에 도달하면 배치를 꺼내지 않는다"""
+    mock_record_accumulator.ready_batches.return_value = [
+        mock.Mock(serialized=b"produce-payload-1")
+    ]
+    mock_correlation_id_factory.return_value = 100
+
+    await request_sender.send()
+    await request_sender.send()
+
+    mock_record_accumulator.ready_batches.assert_called_once_with(limit=1)
+    assert request_sender.available_slots == 0
+
+
+async def _send_one(
+    request_sender: RequestSender,
+    mock_record_accumulator: mock.Mock,
+    mock_response_dispatcher: mock.Mock,
+    mock_correlation_id_factory: mock.Mock,
+) -> tuple[mock.Mock, asyncio.Future[bytes]]:
+    batch = mock.Mock(serialized=b"produce-payload-1", attempts=0)
+    mock_record_accumulator.ready_batches.return_value = [batch]
+    mock_correlation_id_factory.return_value = 100
+    await request_sender.send()
+    _, future = mock_response_dispatcher.link_response.call_args.args
+    return batch, future
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "request_sender, error_code, expected_retry",
+    [
+        ((5, 1), 56, True),
+        ((5, 0), 56, False),
+        ((5, 1), 11, False),
+    ],
+    indirect=["request_sender"],
+)
+async def test_complete_with_error(
+    request_sender: RequestSender,
+    mock_record_accumulator: mock.Mock,
+    mock_response_dispatcher: mock.Mock,
+    mock_correlation_id_factory: mock.Mock,
+    error_code: int,
+    expected_retry: bool,
+):
+    """재시도 가능한 오류는 retries 안에서 다시 큐에 넣고, 그 외에는 배치를 실패시킨다"""
+    batch, future = await _send_one(
+        request_sender,
+        mock_record_accumulator,
+        mock_response_dispatcher,
+        mock_correlation_id_factory,
+    )
+
+    future.set_result(
+        ProduceResponse.failure(
+            topic="test", partition=0, error_code=error_code, error_message="error"
+        )
+        .model_dump_json()
+        .encode("utf-8")
+    )
+    await asyncio.sleep(0)
+
+    assert request_sender.in_flight == {}
+    request_sender.on_complete.assert_called_once_with()
+    if expected_retry:
+        mock_record_accumulator.reenqueue.assert_called_once_with(batch)
+        batch.fail.assert_not_called()
+    else:
+        mock_record_accumulator.reenqueue.assert_not_called()
+        (exc,) = batch.fail.call_args.args
+        assert isinstance(
+            exc, KafkaStorageError if error_code == 56 else PartitionNotFoundError
+        )
+
+
+@pytest.mark.asyncio
+async def test_complete_with_success(
+    request_sender: RequestSender,
+    mock_record_accumulator: mock.Mock,
+    mock_response_dispatcher: mock.Mock,
+    mock_correlation_id_factory: mock.Mock,
+):
+    batch, future = await _send_one(
+        request_sender,
+        mock_record_accumulator,
+        mock_response_dispatcher,
+        mock_correlation_id_factory,
+    )
+
+    future.set_result(
+        ProduceResponse.success(topic="test", partition=0, base_offset=3)
+        .model_dump_json()
+        .encode("utf-8")
+    )
+    await asyncio.sleep(0)
+
+    (response,) = batch.done.call_args.args
+    assert response.base_offset == 3
+    assert request_sender.in_flight == {}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("request_sender", [(5, 1)], indirect=True)
+async def test_request_timeout(
+    request_sender: RequestSender,
+    mock_record_accumulator: mock.Mock,
+    mock_response_dispatcher: mock.Mock,
+    mock_correlation_id_factory: mock.Mock,
+):
+    """응답이 request_timeout_ms 안에 오지 않으면 요청을 해제하고 재시도한다"""
+    batch, future = await _send_one(
+        request_sender,
+        mock_record_accumulator,
+        mock_response_dispatcher,
+        mock_correlation_id_factory,
+    )
+
+    await asyncio.sleep(0.1)
+
+    with pytest.raises(RequestTimedOutError):
+        future.result()
+    mock_response_dispatcher.unlink.assert_called_once_with(100)
+    mock_record_accumulator.reenqueue.assert_called_once_with(batch)
+
+
+@pytest.mark.asyncio
+async def test_send_without_ack(
+    mock_conn: mock.Mock,
+    mock_correlation_id_factory: mock.Mock,
+    mock_response_dispatcher: mock.Mock,
+    mock_record_accumulator: mock.Mock,
+):
+    """acks=0 이면 응답을 기다리지 않고 소켓에 넘긴 즉시 배치를 완료한다"""
+    request_sender = RequestSender(
+        conn=mock_conn,
+        correlation_id_factory=mock_correlation_id_factory,
+        response_dispatcher=mock_response_dispatcher,
+        record_accumulator=mock_record_accumulator,
+        acks=0,
+    )
+    batch = mock.Mock(serialized=b"produce-payload-1", attempts=0)
+    mock_record_accumulator.ready_batches.return_value = [batch]
+    mock_correlation_id_factory.return_value = 100
+
+    await request_sender.send()
+
+    mock_conn.send.assert_called_once()
+    batch.done_without_ack.assert_called_once_with()
+    mock_record_accumulator.deallocate.assert_called_once_with()
+    assert mock_response_dispatcher.link_response.call_count == 0
+    assert request_sender.in_flight == {}
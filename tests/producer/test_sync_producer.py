@@ -0,0 +1,131 @@
+import asyncio
+import concurrent.futures
+import functools
+import itertools
+import threading
+from collections.abc import Generator
+from pathlib import Path
+
+import pytest
+
+from kafka import constants
+from kafka.broker.query import Fetch
+from kafka.broker.group import GroupCoordinator
+from kafka.broker.server import handle_client
+from kafka.broker.storage import (
+    FSCommittedOffsetStorage,
+    FSLogStorage,
+    FSProducerStateStorage,
+)
+from kafka.producer.sync import SyncProducer
+from kafka.record import ProducerRecord
+
+
+@pytest.fixture
+def threaded_broker(tmp_path: Path) -> Generator[tuple[str, int, FSLogStorage], None]:
+    log_storage = FSLogStorage.load_from_root(tmp_path, constants.LOG_FILE_SIZE_LIMIT)
+    log_storage.init_topic(topic_name="topic01", num_partitions=2)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    server = asyncio.run_coroutine_threadsafe(
+        asyncio.start_server(
+            functools.partial(
+                handle_client,
+                log_storage=log_storage,
+                committed_offset_storage=FSCommittedOffsetStorage.load_from_root(
+                    tmp_path
+                ),
+                producer_state_storage=FSProducerStateStorage.load_from_root(tmp_path),
+                group_coordinator=GroupCoordinator(),
+            ),
+            "127.0.0.1",
+            0,
+        ),
+        loop,
+    ).result()
+    host, port = server.sockets[0].getsockname()
+    yield host, port, log_storage
+
+    async def _shutdown() -> None:
+        server.close()
+        await server.wait_closed()
+
+    asyncio.run_coroutine_threadsafe(_shutdown(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+    log_storage.close()
+
+
+@pytest.fixture
+def sync_producer(
+    threaded_broker: tuple[str, int, FSLogStorage],
+) -> Generator[SyncProducer, None]:
+    host, port, _ = threaded_broker
+    correlation_ids = itertools.count(1)
+    with SyncProducer(
+        broker_host=host,
+        broker_port=port,
+        correlation_id_factory=lambda: next(correlation_ids),
+        linger_ms=60_000,
+    ) as producer:
+        yield producer
+
+
+def test_send_from_multiple_threads(
+    sync_producer: SyncProducer, threaded_broker: tuple[str, int, FSLogStorage]
+):
+    """여러 스레드에서 보낸 레코드는 스레드별 순서대로 저장된다"""
+    _, _, log_storage = threaded_broker
+
+    def _send(partition: int) -> list[concurrent.futures.Future]:
+        return [
+            sync_producer.send(
+                ProducerRecord(topic="topic01", partition=partition, value=f"value{i}")
+            )
+            for i in range(20)
+        ]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        futures = list(executor.map(_send, [0, 1]))
+    sync_producer.flush(timeout=5)
+
+    for partition, partition_futures in enumerate(futures):
+        assert all(future.done() for future in partition_futures)
+        assert [future.result().offset for future in partition_futures] == list(
+            range(20)
+        )
+        records = log_storage.list_logs(
+            Fetch(topic="topic01", partition=partition, offset=0, max_bytes=10000)
+        )
+        assert [(r.offset, r.value) for r in records] == [
+            (i, f"value{i}".encode()) for i in range(20)
+        ]
+
+
+def test_send_error_is_propagated(sync_producer: SyncProducer):
+    future = sync_producer.send(
+        ProducerRecord(topic="topic01", partition=5, value="value")
+    )
+    sync_producer.flush(timeout=5)
+
+    assert future.exception() is not None
+
+
+def test_send_after_close(threaded_broker: tuple[str, int, FSLogStorage]):
+    host, port, log_storage = threaded_broker
+    correlation_ids = itertools.count(1)
+    producer = SyncProducer(
+        broker_host=host,
+        broker_port=port,
+        correlation_id_factory=lambda: next(correlation_ids),
+        linger_ms=60_000,
+    )
+    future = producer.send(ProducerRecord(topic="topic01", partition=0, value="value"))
+
+    producer.close(timeout=5)
+
+    assert future.result().offset == 0
+    with pytest.raises(RuntimeError):
+        producer.send(ProducerRecord(topic="topic01", partition=0, value="value"))
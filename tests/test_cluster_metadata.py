@@ -0,0 +1,34 @@
+from unittest import mock
+
+import pytest
+
+from kafka.broker import MetadataResponse, TopicMetadata
+from kafka.metadata import ClusterMetadata
+
+
+@pytest.fixture
+def cluster_metadata() -> ClusterMetadata:
+    metadata = ClusterMetadata(max_age_ms=1000)
+    with mock.patch("time.monotonic", return_value=100.0):
+        metadata.update(
+            MetadataResponse(
+                topics=[TopicMetadata(name="topic01", num_partitions=3)],
+                error_code=0,
+            )
+        )
+    return metadata
+
+
+@pytest.mark.parametrize(
+    "topic, now, expected",
+    [
+        ("topic01", 100.5, 3),
+        ("topic01", 101.0, None),
+        ("topic02", 100.5, None),
+    ],
+)
+def test_partitions_for(
+    cluster_metadata: ClusterMetadata, topic: str, now: float, expected: int | None
+):
+    with mock.patch("time.monotonic", return_value=now):
+        assert cluster_metadata.partitions_for(topic) == expected
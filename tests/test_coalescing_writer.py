@@ -0,0 +1,103 @@
+import asyncio
+from unittest import mock
+
+import pytest
+
+from kafka.writer import CoalescingWriter
+
+
+@pytest.fixture
+def mock_stream_writer(request: pytest.FixtureRequest) -> mock.Mock:
+    transport_buffer_size: int = getattr(request, "param", 0)
+    writer = mock.Mock(spec=asyncio.StreamWriter)
+    writer.transport = mock.Mock(spec=asyncio.WriteTransport)
+    writer.transport.get_write_buffer_size.return_value = transport_buffer_size
+    writer.drain = mock.AsyncMock()
+    return writer
+
+
+@pytest.fixture
+def coalescing_writer(mock_stream_writer: mock.Mock) -> CoalescingWriter:
+    return CoalescingWriter(mock_stream_writer, high_water_mark=100)
+
+
+@pytest.mark.asyncio
+async def test_write_coalesces_same_iteration(
+    coalescing_writer: CoalescingWriter, mock_stream_writer: mock.Mock
+):
+    """같은 루프 반복에서 쓴 데이터는 한 번에 전송된다"""
+    coalescing_writer.write(b"first")
+    coalescing_writer.write(b"second")
+    coalescing_writer.write(b"third")
+
+    assert mock_stream_writer.writelines.call_count == 0
+
+    await asyncio.sleep(0)
+
+    mock_stream_writer.writelines.assert_called_once_with(
+        [b"first", b"second", b"third"]
+    )
+    mock_stream_writer.write.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_write_with_cork_window(mock_stream_writer: mock.Mock):
+    """cork 구간 동안 쓴 데이터는 구간이 끝날 때 한 번에 전송된다"""
+    coalescing_writer = CoalescingWriter(mock_stream_writer, cork_ms=10)
+    coalescing_writer.write(b"first")
+    await asyncio.sleep(0)
+    coalescing_writer.write(b"second")
+
+    assert mock_stream_writer.writelines.call_count == 0
+
+    await asyncio.sleep(0.02)
+
+    mock_stream_writer.writelines.assert_called_once_with([b"first", b"second"])
+
+
+@pytest.mark.asyncio
+async def test_drain_below_high_water_mark(
+    coalescing_writer: CoalescingWriter, mock_stream_writer: mock.Mock
+):
+    """버퍼 크기가 high-water mark 미만이면 drain 하지 않는다"""
+    coalescing_writer.write(b"x" * 99)
+
+    await coalescing_writer.drain()
+
+    mock_stream_writer.drain.assert_not_called()
+    assert mock_stream_writer.writelines.call_count == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "mock_stream_writer, data",
+    [
+        (0, b"x" * 100),
+        (90, b"x" * 10),
+    ],
+    indirect=["mock_stream_writer"],
+)
+async def test_drain_over_high_water_mark(
+    coalescing_writer: CoalescingWriter, mock_stream_writer: mock.Mock, data: bytes
+):
+    """버퍼 크기가 high-water mark 이상이면 즉시 전송하고 drain 한다"""
+    coalescing_writer.write(data)
+
+    await coalescing_writer.drain()
+
+    mock_stream_writer.writelines.assert_called_once_with([data])
+    mock_stream_writer.drain.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_close_flushes_pending_data(
+    coalescing_writer: CoalescingWriter, mock_stream_writer: mock.Mock
+):
+    """닫기 전에 남은 데이터를 전송한다"""
+    coalescing_writer.write(b"pending")
+
+    coalescing_writer.close()
+    await asyncio.sleep(0)
+
+    mock_stream_writer.writelines.assert_called_once_with([b"pending"])
+    mock_stream_writer.close.assert_called_once()
@@ -0,0 +1,22 @@
+import pytest
+
+from kafka import compression
+from kafka.compression import CompressionType
+
+
+@pytest.mark.parametrize("compression_type", list(CompressionType))
+def test_round_trip(compression_type: CompressionType):
+    data = (
+        b'[{"value": "dmFsdWU=", "key": null, "timestamp": null, "headers": {}}]' * 10
+    )
+
+    compressed = compression.compress(data, compression_type)
+
+    assert compression.decompress(compressed, compression_type) == data
+    if compression_type != CompressionType.NONE:
+        assert len(compressed) < len(data)
+
+
+def test_unknown_compression_type():
+    with pytest.raises(ValueError):
+        CompressionType("snappy")
@@ -169,3 +169,186 @@ def test_produce(correlation_id: int, payload: bytes, message: Message):
     msg = Message.produce(correlation_id=correlation_id, payload=payload)
 
     assert msg == message
+
+
+@pytest.mark.parametrize(
+    "correlation_id, payload, message",
+    [
+        (
+            1,
+            b'{"topics": ["topic-1"]}',
+            (1, MessageType.METADATA, b'{"topics": ["topic-1"]}'),
+        ),
+        (
+            2,
+            b'{"topics": null}',
+            (2, MessageType.METADATA, b'{"topics": null}'),
+        ),
+    ],
+    indirect=["message"],
+)
+def test_metadata(correlation_id: int, payload: bytes, message: Message):
+    msg = Message.metadata(correlation_id=correlation_id, payload=payload)
+
+    assert msg == message
+
+
+@pytest.mark.parametrize(
+    "correlation_id, message",
+    [
+        (1, (1, MessageType.INIT_PRODUCER_ID, b"")),
+        (2, (2, MessageType.INIT_PRODUCER_ID, b"")),
+    ],
+    indirect=["message"],
+)
+def test_init_producer_id(correlation_id: int, message: Message):
+    msg = Message.init_producer_id(correlation_id=correlation_id)
+
+    assert msg == message
+
+
+@pytest.mark.parametrize(
+    "correlation_id, payload, message",
+    [
+        (
+            1,
+            b'{"topic":"topic-1","partition":0,"offset":0,"max_bytes":4096}',
+            (
+                1,
+                MessageType.FETCH,
+                b'{"topic":"topic-1","partition":0,"offset":0,"max_bytes":4096}',
+            ),
+        ),
+    ],
+    indirect=["message"],
+)
+def test_fetch(correlation_id: int, payload: bytes, message: Message):
+    msg = Message.fetch(correlation_id=correlation_id, payload=payload)
+
+    assert msg == message
+
+
+@pytest.mark.parametrize(
+    "correlation_id, payload, message",
+    [
+        (
+            1,
+            b'{"group_id":"group01","topics":[{"topic":"topic-1","partition":0,"offset":3}]}',
+            (
+                1,
+                MessageType.OFFSET_COMMIT,
+                b'{"group_id":"group01","topics":[{"topic":"topic-1","partition":0,"offset":3}]}',
+            ),
+        ),
+    ],
+    indirect=["message"],
+)
+def test_offset_commit(correlation_id: int, payload: bytes, message: Message):
+    msg = Message.offset_commit(correlation_id=correlation_id, payload=payload)
+
+    assert msg == message
+
+
+@pytest.mark.parametrize(
+    "correlation_id, payload, message",
+    [
+        (
+            1,
+            b'{"group_id":"group01","partitions":[{"topic":"topic-1","partition":0}]}',
+            (
+                1,
+                MessageType.OFFSET_FETCH,
+                b'{"group_id":"group01","partitions":[{"topic":"topic-1","partition":0}]}',
+            ),
+        ),
+    ],
+    indirect=["message"],
+)
+def test_offset_fetch(correlation_id: int, payload: bytes, message: Message):
+    msg = Message.offset_fetch(correlation_id=correlation_id, payload=payload)
+
+    assert msg == message
+
+
+@pytest.mark.parametrize(
+    "correlation_id, payload, message",
+    [
+        (
+            1,
+            b'{"group_id":"group01","member_id":null,"session_timeout_ms":10000,"topics":["topic-1"],"assignors":["range"]}',
+            (
+                1,
+                MessageType.JOIN_GROUP,
+                b'{"group_id":"group01","member_id":null,"session_timeout_ms":10000,"topics":["topic-1"],"assignors":["range"]}',
+            ),
+        ),
+    ],
+    indirect=["message"],
+)
+def test_join_group(correlation_id: int, payload: bytes, message: Message):
+    msg = Message.join_group(correlation_id=correlation_id, payload=payload)
+
+    assert msg == message
+
+
+@pytest.mark.parametrize(
+    "correlation_id, payload, message",
+    [
+        (
+            1,
+            b'{"group_id":"group01","generation_id":0,"member_id":"m1","assignments":[]}',
+            (
+                1,
+                MessageType.SYNC_GROUP,
+                b'{"group_id":"group01","generation_id":0,"member_id":"m1","assignments":[]}',
+            ),
+        ),
+    ],
+    indirect=["message"],
+)
+def test_sync_group(correlation_id: int, payload: bytes, message: Message):
+    msg = Message.sync_group(correlation_id=correlation_id, payload=payload)
+
+    assert msg == message
+
+
+@pytest.mark.parametrize(
+    "correlation_id, payload, message",
+    [
+        (
+            1,
+            b'{"group_id":"group01","generation_id":0,"member_id":"m1"}',
+            (
+                1,
+                MessageType.HEARTBEAT,
+                b'{"group_id":"group01","generation_id":0,"member_id":"m1"}',
+            ),
+        ),
+    ],
+    indirect=["message"],
+)
+def test_heartbeat(correlation_id: int, payload: bytes, message: Message):
+    msg = Message.heartbeat(correlation_id=correlation_id, payload=payload)
+
+    assert msg == message
+
+
+@pytest.mark.parametrize(
+    "correlation_id, payload, message",
+    [
+        (
+            1,
+            b'{"group_id":"group01","member_id":"m1"}',
+            (
+                1,
+                MessageType.LEAVE_GROUP,
+                b'{"group_id":"group01","member_id":"m1"}',
+            ),
+        ),
+    ],
+    indirect=["message"],
+)
+def test_leave_group(correlation_id: int, payload: bytes, message: Message):
+    msg = Message.leave_group(correlation_id=correlation_id, payload=payload)
+
+    assert msg == message
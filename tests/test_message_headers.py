@@ -43,3 +43,120 @@ def test_produce(correlation_id: int, expected: MessageHeaders):
     headers = MessageHeaders.produce(correlation_id)
 
     assert headers == expected
+
+
+@pytest.mark.parametrize(
+    "correlation_id, expected",
+    [
+        (1, MessageHeaders(correlation_id=1, api_key=MessageType.METADATA)),
+        (2, MessageHeaders(correlation_id=2, api_key=MessageType.METADATA)),
+    ],
+)
+def test_metadata(correlation_id: int, expected: MessageHeaders):
+    headers = MessageHeaders.metadata(correlation_id)
+
+    assert headers == expected
+
+
+@pytest.mark.parametrize(
+    "correlation_id, expected",
+    [
+        (1, MessageHeaders(correlation_id=1, api_key=MessageType.INIT_PRODUCER_ID)),
+        (2, MessageHeaders(correlation_id=2, api_key=MessageType.INIT_PRODUCER_ID)),
+    ],
+)
+def test_init_producer_id(correlation_id: int, expected: MessageHeaders):
+    headers = MessageHeaders.init_producer_id(correlation_id)
+
+    assert headers == expected
+
+
+@pytest.mark.parametrize(
+    "correlation_id, expected",
+    [
+        (1, MessageHeaders(correlation_id=1, api_key=MessageType.FETCH)),
+        (2, MessageHeaders(correlation_id=2, api_key=MessageType.FETCH)),
+    ],
+)
+def test_fetch(correlation_id: int, expected: MessageHeaders):
+    headers = MessageHeaders.fetch(correlation_id)
+
+    assert headers == expected
+
+
+@pytest.mark.parametrize(
+    "correlation_id, expected",
+    [
+        (1, MessageHeaders(correlation_id=1, api_key=MessageType.OFFSET_COMMIT)),
+        (2, MessageHeaders(correlation_id=2, api_key=MessageType.OFFSET_COMMIT)),
+    ],
+)
+def test_offset_commit(correlation_id: int, expected: MessageHeaders):
+    headers = MessageHeaders.offset_commit(correlation_id)
+
+    assert headers == expected
+
+
+@pytest.mark.parametrize(
+    "correlation_id, expected",
+    [
+        (1, MessageHeaders(correlation_id=1, api_key=MessageType.OFFSET_FETCH)),
+        (2, MessageHeaders(correlation_id=2, api_key=MessageType.OFFSET_FETCH)),
+    ],
+)
+def test_offset_fetch(correlation_id: int, expected: MessageHeaders):
+    headers = MessageHeaders.offset_fetch(correlation_id)
+
+    assert headers == expected
+
+
+@pytest.mark.parametrize(
+    "correlation_id, expected",
+    [
+        (1, MessageHeaders(correlation_id=1, api_key=MessageType.JOIN_GROUP)),
+        (2, MessageHeaders(correlation_id=2, api_key=MessageType.JOIN_GROUP)),
+    ],
+)
+def test_join_group(correlation_id: int, expected: MessageHeaders):
+    headers = MessageHeaders.join_group(correlation_id)
+
+    assert headers == expected
+
+
+@pytest.mark.parametrize(
+    "correlation_id, expected",
+    [
+        (1, MessageHeaders(correlation_id=1, api_key=MessageType.SYNC_GROUP)),
+        (2, MessageHeaders(correlation_id=2, api_key=MessageType.SYNC_GROUP)),
+    ],
+)
+def test_sync_group(correlation_id: int, expected: MessageHeaders):
+    headers = MessageHeaders.sync_group(correlation_id)
+
+    assert headers == expected
+
+
+@pytest.mark.parametrize(
+    "correlation_id, expected",
+    [
+        (1, MessageHeaders(correlation_id=1, api_key=MessageType.HEARTBEAT)),
+        (2, MessageHeaders(correlation_id=2, api_key=MessageType.HEARTBEAT)),
+    ],
+)
+def test_heartbeat(correlation_id: int, expected: MessageHeaders):
+    headers = MessageHeaders.heartbeat(correlation_id)
+
+    assert headers == expected
+
+
+@pytest.mark.parametrize(
+    "correlation_id, expected",
+    [
+        (1, MessageHeaders(correlation_id=1, api_key=MessageType.LEAVE_GROUP)),
+        (2, MessageHeaders(correlation_id=2, api_key=MessageType.LEAVE_GROUP)),
+    ],
+)
+def test_leave_group(correlation_id: int, expected: MessageHeaders):
+    headers = MessageHeaders.leave_group(correlation_id)
+
+    assert headers == expected
@@ -6,7 +6,7 @@ import pytest
 
 from kafka.connection import BrokerConnection, BrokerConnectionError
 from kafka.dispatcher import ProduceDispatcher
-from kafka.error import InvalidCorrelationIdError
+from kafka.error import InvalidCorrelationIdError, KafkaError
 from kafka.record import RecordMetadata
 
 
@@ -50,6 +50,28 @@ async def test_dispatch_success(produce_dispatcher: ProduceDispatcher) -> None:
     assert correlation_id not in produce_dispatcher._pending_requests
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "produce_dispatcher",
+    [
+        b'0001000136{"topic":"test","partition":0,"base_offset":-1,"timestamp":1754556963,"error_code":11,"error_message":"Partition test-0 does not exist"}'
+    ],
+    indirect=True,
+)
+async def test_dispatch_failure(produce_dispatcher: ProduceDispatcher) -> None:
+    correlation_id = 1
+    future1 = asyncio.Future()
+    future2 = asyncio.Future()
+    produce_dispatcher._pending_requests[correlation_id] = [future1, future2]
+
+    await produce_dispatcher.dispatch()
+
+    for future in (future1, future2):
+        with pytest.raises(KafkaError, match="Partition test-0 does not exist"):
+            future.result()
+    assert correlation_id not in produce_dispatcher._pending_requests
+
+
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
     "produce_dispatcher",
@@ -103,3 +125,50 @@ def test_link_duplicate_correlation_id(
 
     with pytest.raises(InvalidCorrelationIdError):
         produce_dispatcher.link(correlation_id=correlation_id, futures=futures)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "produce_dispatcher",
+    [
+        b'0001000107{"topic":"test","partition":0,"base_offset":123,"timestamp":1754556963,"error_code":0,"error_message":null}'
+    ],
+    indirect=True,
+)
+async def test_dispatch_unlinked_response(
+    produce_dispatcher: ProduceDispatcher,
+) -> None:
+    """해제된 요청에 늦게 도착한 응답은 버린다"""
+    correlation_id = 1
+    future = asyncio.Future()
+    produce_dispatcher.link_response(correlation_id, future)
+
+    produce_dispatcher.unlink(correlation_id)
+    await produce_dispatcher.dispatch()
+
+    assert not future.done()
+    assert correlation_id not in produce_dispatcher._pending_responses
+    assert correlation_id not in produce_dispatcher._abandoned
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "produce_dispatcher",
+    [
+        b'0001000107{"topic":"test","partition":0,"base_offset":123,"timestamp":1754556963,"error_code":0,"error_message":null}'
+    ],
+    indirect=True,
+)
+async def test_dispatch_cancelled_request(
+    produce_dispatcher: ProduceDispatcher,
+) -> None:
+    """응답을 기다리던 요청이 취소되어도 디스패치는 계속된다"""
+    correlation_id = 1
+    future = asyncio.Future()
+    produce_dispatcher.link_response(correlation_id, future)
+    future.cancel()
+
+    await produce_dispatcher.dispatch()
+
+    assert future.cancelled()
+    assert correlation_id not in produce_dispatcher._pending_responses
@@ -40,6 +40,25 @@ async def test_dispatch_success(dispatcher: ResponseDispatcher):
     assert correlation_id not in dispatcher._pending_requests
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "dispatcher",
+    [b'0001000016{"topic":"test"}'],
+    indirect=True,
+)
+async def test_dispatch_cancelled_request(dispatcher: ResponseDispatcher):
+    """응답을 기다리던 요청이 취소되어도 디스패치는 계속된다"""
+    correlation_id = 1
+    future = asyncio.Future()
+    future.cancel()
+    dispatcher._pending_requests[correlation_id] = future
+
+    await dispatcher.dispatch()
+
+    assert future.cancelled()
+    assert correlation_id not in dispatcher._pending_requests
+
+
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
     "dispatcher",
@@ -0,0 +1,67 @@
+import pydantic
+import pytest
+
+from kafka import serialization
+from kafka.serialization import WireBytes
+
+
+class WireModel(pydantic.BaseModel):
+    value: WireBytes
+    key: WireBytes | None
+    headers: dict[str, WireBytes]
+
+
+@pytest.mark.parametrize(
+    "value, key, headers, expected",
+    [
+        (
+            b"\x00\xff\x10",
+            None,
+            {},
+            b'{"value":"AP8Q","key":null,"headers":{}}',
+        ),
+        (
+            "값".encode("utf-8"),
+            b"key",
+            {"h1": b"\x89PNG"},
+            b'{"value":"6rCS","key":"a2V5","headers":{"h1":"iVBORw=="}}',
+        ),
+    ],
+)
+def test_wire_bytes_round_trip(
+    value: bytes, key: bytes | None, headers: dict[str, bytes], expected: bytes
+):
+    """바이트 필드는 JSON 으로 보낼 때만 base64 로 인코딩된다"""
+    model = WireModel(value=value, key=key, headers=headers)
+
+    serialized = model.model_dump_json().encode("utf-8")
+
+    assert serialized == expected
+    assert model.model_dump()["value"] == value
+    assert WireModel.model_validate_json(serialized) == model
+    assert WireModel.model_validate(model.model_dump(mode="json")) == model
+
+
+def test_wire_bytes_with_invalid_base64():
+    with pytest.raises(pydantic.ValidationError):
+        WireModel(value="not base64!", key=None, headers={})
+
+
+@pytest.mark.parametrize(
+    "data, expected",
+    [(b"\x00\x01", b"\x00\x01"), ("값", "값".encode("utf-8"))],
+)
+def test_bytes_serializer(data: bytes | str, expected: bytes):
+    assert serialization.bytes_serializer(data) == expected
+
+
+def test_bytes_serializer_with_unsupported_type():
+    with pytest.raises(TypeError):
+        serialization.bytes_serializer(123)
+
+
+def test_string_serializer_round_trip():
+    serializer = serialization.string_serializer("utf-16")
+    deserializer = serialization.string_deserializer("utf-16")
+
+    assert deserializer(serializer("값")) == "값"